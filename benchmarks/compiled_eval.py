@@ -0,0 +1,89 @@
+"""Compiled evaluation versus the tree-walking evaluator on map/filter-heavy goals.
+
+Run from the repository root:
+
+    python3 benchmarks/compiled_eval.py --length 5000
+
+Each goal is a `Refl` check over a literal list of `--length` naturals; lambdas are applied
+once per element, which is where compilation pays off. Timings exclude parsing, and the
+compiled timings include compiling: the compile cache and the evaluation memo are cleared
+before every run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from researchproof import proof_checker  # noqa: E402
+from researchproof.proof_checker import TokenStream, _evaluate_tree, evaluate, parse_term  # noqa: E402
+from researchproof.values import values_equal  # noqa: E402
+
+GOALS: List[Tuple[str, str]] = [
+    ("map", "map (\\\\x => plus (mult x 3) 1) XS"),
+    ("filter", "filter (\\\\x => and (even x) (leq x 4000)) XS"),
+    ("map+filter", "map (\\\\x => ifThenElse (odd x) (double x) (pred x)) (filter (\\\\y => lt y 3000) XS)"),
+    ("nested", "map S (map (\\\\x => max x 7) (filter even (map double XS)))"),
+]
+
+
+def literal_list(length: int) -> str:
+    return "".join(f"(Cons {index} " for index in range(length)) + "Nil" + ")" * length
+
+
+@contextmanager
+def tree_walking() -> Iterator[None]:
+    """Evaluate every term, lambda bodies included, with the tree walker instead."""
+    compiled = proof_checker.compile_term
+
+    def interpret(term, params=()):
+        return lambda slots: _evaluate_tree(term, dict(zip(params, slots)))
+
+    proof_checker.compile_term = interpret
+    try:
+        yield
+    finally:
+        proof_checker.compile_term = compiled
+
+
+def best_of(repeat: int, action: Callable[[], object]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        began = time.perf_counter()
+        action()
+        best = min(best, time.perf_counter() - began)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--length", type=int, default=5000, help="Elements in the input list")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is kept)")
+    args = parser.parse_args()
+
+    items = literal_list(args.length)
+    print(f"{'goal':<12}{'tree s':>10}{'compiled s':>12}{'speedup':>9}")
+    for label, text in GOALS:
+        term = parse_term(TokenStream.from_text(text.replace("XS", f"({items})")))
+        # Comparing against a separately built value forces lazy map views element by element.
+        with tree_walking():
+            expected = evaluate(term, {})
+            tree = best_of(args.repeat, lambda: values_equal(evaluate(term, {}), expected))
+
+        def compiled_run() -> bool:
+            proof_checker.reset_evaluation_caches()
+            return values_equal(evaluate(term, {}), expected)
+
+        compiled = best_of(args.repeat, compiled_run)
+        print(f"{label:<12}{tree:>10.3f}{compiled:>12.3f}{tree / compiled:>8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
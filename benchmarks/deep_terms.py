@@ -0,0 +1,94 @@
+"""Throughput of the checker's tree passes on very deep terms.
+
+Run from the repository root:
+
+    python3 benchmarks/deep_terms.py --depth 20000
+
+Each case builds one deep term directly from AST nodes (so parsing cost is excluded) and
+times a `Refl` check of `term = term` (both sides evaluated and compared), `normalize_term`
+and `goal_key` on it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from researchproof.proof_checker import (  # noqa: E402
+    App,
+    Const,
+    Equality,
+    Lambda,
+    Signature,
+    Term,
+    Var,
+    check_refl,
+    goal_key,
+    normalize_term,
+)
+
+
+def s_chain(depth: int) -> Term:
+    term: Term = Const("Z")
+    for _ in range(depth):
+        term = App("S", (term,))
+    return term
+
+
+def nested_append(depth: int) -> Term:
+    one = App("Cons", (Const("Z"), Const("Nil")))
+    term: Term = Const("Nil")
+    for _ in range(depth):
+        term = App("append", (one, term))
+    return App("length", (term,))
+
+
+def nested_map(depth: int) -> Term:
+    items = App("Cons", (Const("Z"), App("Cons", (App("S", (Const("Z"),)), Const("Nil")))))
+    increment = Lambda("x", App("S", (Var("x"),)))
+    term: Term = items
+    for _ in range(depth):
+        term = App("map", (increment, term))
+    return term
+
+
+CASES: List[Tuple[str, Callable[[int], Term]]] = [
+    ("S chain", s_chain),
+    ("nested append", nested_append),
+    ("nested map", nested_map),
+]
+
+
+def timed(action: Callable[[], object]) -> float:
+    began = time.perf_counter()
+    action()
+    return time.perf_counter() - began
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=20_000, help="Nesting depth of each term")
+    args = parser.parse_args()
+
+    print(f"{'case':<16}{'pass':<12}{'seconds':>10}{'levels/s':>14}")
+    for label, build in CASES:
+        term = build(args.depth)
+        goal = Signature((), Equality(term, term))
+        passes = [
+            ("refl", lambda: check_refl(goal)),
+            ("normalize", lambda: normalize_term(term, {})),
+            ("goal_key", lambda: goal_key(goal)),
+        ]
+        for name, action in passes:
+            seconds = timed(action)
+            print(f"{label:<16}{name:<12}{seconds:>10.3f}{args.depth / seconds:>14,.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,48 @@
+"""Samples per second of the counterexample search on goals that hold.
+
+Run from the repository root:
+
+    python3 benchmarks/fuzz_throughput.py --samples 1000000
+
+Every goal is true, so the search draws all `--samples` assignments.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from researchproof.fuzz import find_counterexample  # noqa: E402
+from researchproof.proof_checker import parse_signature  # noqa: E402
+
+GOALS: List[Tuple[str, str]] = [
+    ("plus comm", "(x : Nat) -> (y : Nat) -> plus x y = plus y x"),
+    ("distrib", "(x : Nat) -> (y : Nat) -> (z : Nat) -> mult x (plus y z) = plus (mult x y) (mult x z)"),
+    ("if/max", "(x : Nat) -> (y : Nat) -> ifThenElse (leq x y) (max x y) y = y"),
+    ("hypothesis", "(x : Nat) -> (y : Nat) -> (p : leq x y = True) -> plus (sub y x) x = y"),
+    ("reverse", "(xs : List Nat) -> length (reverse xs) = length xs"),
+]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=1_000_000, help="Assignments drawn per goal")
+    args = parser.parse_args()
+
+    print(f"{'goal':<12}{'samples':>10}{'seconds':>10}{'samples/s':>14}")
+    for label, text in GOALS:
+        signature = parse_signature(text)
+        began = time.perf_counter()
+        result = find_counterexample(signature, args.samples)
+        elapsed = time.perf_counter() - began
+        print(f"{label:<12}{result.samples:>10}{elapsed:>10.3f}{result.samples / elapsed:>14,.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,84 @@
+"""Throughput of `Refl` checks on closed-arithmetic corpora that share subterms.
+
+Run from the repository root:
+
+    python3 benchmarks/shared_subterms.py --theorems 5000 --shared 50
+
+Each generated theorem equates a sum of a few subterms drawn from a pool of `--shared`
+closed terms (list pipelines and `mult`/`plus`/`pow` over literals) with its value. The corpus is
+checked with `check_refl` (parsing excluded) with the evaluation memo disabled and
+enabled; the speedup grows with the number of theorems each pooled subterm appears in.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from researchproof import proof_checker  # noqa: E402
+from researchproof.proof_checker import EvaluationMemo, Signature, check_refl, evaluate, parse_signature  # noqa: E402
+
+
+def subterm(rng: random.Random, depth: int) -> str:
+    if depth == 0:
+        count, offset = rng.randint(2000, 5000), rng.randint(1, 9)
+        return f"(length (filter even (map (\\x => plus x {offset}) (replicate {count} {offset}))))"
+    operator = rng.choice(["plus", "mult", "mult", "pow"])
+    if operator == "pow":
+        return f"(pow {subterm(rng, depth - 1)} {rng.randint(1, 3)})"
+    return f"({operator} {subterm(rng, depth - 1)} {subterm(rng, depth - 1)})"
+
+
+def corpus(theorems: int, shared: int, seed: int) -> List[Signature]:
+    rng = random.Random(seed)
+    pool = [subterm(rng, 2) for _ in range(shared)]
+    result = []
+    for _ in range(theorems):
+        left = "Z"
+        for piece in rng.sample(pool, 3):
+            left = f"(plus {piece} {left})"
+        value = evaluate(parse_signature(f"{left} = Z").result.left, {})
+        result.append(parse_signature(f"{left} = {value}"))
+    return result
+
+
+def timed(signatures: List[Signature], memo: EvaluationMemo) -> float:
+    proof_checker.EVALUATION_MEMO = memo
+    proof_checker.reset_evaluation_caches()
+    began = time.perf_counter()
+    for signature in signatures:
+        check_refl(signature)
+    return time.perf_counter() - began
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--theorems", type=int, default=5000, help="Theorems in the corpus")
+    parser.add_argument("--shared", type=int, default=50, help="Distinct subterms they draw from")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    theorems = corpus(args.theorems, args.shared, args.seed)
+    original = proof_checker.EVALUATION_MEMO
+    try:
+        unshared = timed(theorems, EvaluationMemo(maxsize=0))
+        memo = EvaluationMemo()
+        shared = timed(theorems, memo)
+    finally:
+        proof_checker.EVALUATION_MEMO = original
+    stats = memo.stats()
+    print(f"{'memo':<10}{'seconds':>10}{'theorems/s':>14}")
+    print(f"{'off':<10}{unshared:>10.3f}{len(theorems) / unshared:>14,.0f}")
+    print(f"{'on':<10}{shared:>10.3f}{len(theorems) / shared:>14,.0f}")
+    print(f"speedup {unshared / shared:.1f}x; {stats.hits:,} hit(s), {stats.misses:,} miss(es), hit rate {stats.hit_rate:.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,253 @@
+"""Decision procedure for `proof decide`, built on reduced ordered binary decision diagrams.
+
+Two kinds of goal are decided:
+
+- Bool equalities over `(b : Bool)` parameters built from `True`, `False`, `and`, `or`,
+  `xor`, `not` and `ifThenElse`, optionally under equality hypotheses, e.g.
+  `(a : Bool) -> (b : Bool) -> not (and a b) = or (not a) (not b)`.
+- Propositional signatures built from type variables with `And`, `Or`, `Iff` and `->`,
+  e.g. `And a (Or b c) -> Or (And a b) (And a c)`.
+
+Both are translated to one BDD that must be the constant true. Nodes are hash-consed in a
+unique table, so equivalent formulas share a node, and `ite` results are memoized in a
+computed table; goals over dozens of variables decide without enumerating assignments.
+Propositional goals are decided classically (by truth tables), so Peirce's law
+`((a -> b) -> a) -> a` is accepted.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Set, Tuple
+
+from researchproof import limits
+from researchproof.proof_checker import (
+    App,
+    Arrow,
+    Const,
+    Equality,
+    ProofCheckError,
+    Signature,
+    Term,
+    TypeApp,
+    TypeConst,
+    TypeExpr,
+    TypeVar,
+    Var,
+    flatten_arrow,
+)
+
+FALSE = 0
+TRUE = 1
+_TERMINAL_LEVEL = 1 << 30
+
+# Bool builtins accepted by `decide`, with their arity.
+BOOL_OPERATORS = {"not": 1, "and": 2, "or": 2, "xor": 2, "ifThenElse": 3}
+PROPOSITIONS = {"And", "Or", "Iff"}
+
+
+class BDD:
+    """A shared store of BDD nodes; nodes are ints and `FALSE`/`TRUE` are the terminals."""
+
+    def __init__(self) -> None:
+        self._level: List[int] = [_TERMINAL_LEVEL, _TERMINAL_LEVEL]
+        self._low: List[int] = [FALSE, TRUE]
+        self._high: List[int] = [FALSE, TRUE]
+        self._unique: Dict[Tuple[int, int, int], int] = {}
+        self._computed: Dict[Tuple[int, int, int], int] = {}
+
+    def __len__(self) -> int:
+        return len(self._level)
+
+    def _node(self, level: int, low: int, high: int) -> int:
+        if low == high:
+            return low
+        key = (level, low, high)
+        node = self._unique.get(key)
+        if node is None:
+            limits.charge()
+            node = len(self._level)
+            self._level.append(level)
+            self._low.append(low)
+            self._high.append(high)
+            self._unique[key] = node
+        return node
+
+    def variable(self, level: int) -> int:
+        """The node for the variable at position `level` of the ordering."""
+        return self._node(level, FALSE, TRUE)
+
+    def _cofactors(self, node: int, level: int) -> Tuple[int, int]:
+        if self._level[node] != level:
+            return node, node
+        return self._low[node], self._high[node]
+
+    def ite(self, f: int, g: int, h: int) -> int:
+        """If-then-else: the node for `(f and g) or (not f and h)`."""
+        if f == TRUE:
+            return g
+        if f == FALSE:
+            return h
+        if g == h:
+            return g
+        if g == TRUE and h == FALSE:
+            return f
+        key = (f, g, h)
+        result = self._computed.get(key)
+        if result is not None:
+            return result
+        # Recursion depth is bounded by the number of variables, not the formula size.
+        level = min(self._level[f], self._level[g], self._level[h])
+        f0, f1 = self._cofactors(f, level)
+        g0, g1 = self._cofactors(g, level)
+        h0, h1 = self._cofactors(h, level)
+        result = self._node(level, self.ite(f0, g0, h0), self.ite(f1, g1, h1))
+        self._computed[key] = result
+        return result
+
+    def negate(self, f: int) -> int:
+        return self.ite(f, FALSE, TRUE)
+
+    def conjoin(self, f: int, g: int) -> int:
+        return self.ite(f, g, FALSE)
+
+    def disjoin(self, f: int, g: int) -> int:
+        return self.ite(f, TRUE, g)
+
+    def exclusive(self, f: int, g: int) -> int:
+        return self.ite(f, self.negate(g), g)
+
+    def equivalent(self, f: int, g: int) -> int:
+        return self.ite(f, g, self.negate(g))
+
+    def implies(self, f: int, g: int) -> int:
+        return self.ite(f, g, TRUE)
+
+    def falsifying(self, f: int) -> Optional[Dict[int, bool]]:
+        """Return a partial assignment (level -> value) under which `f` is false, if any."""
+        if f == TRUE:
+            return None
+        assignment: Dict[int, bool] = {}
+        # Every non-terminal node reaches FALSE on some branch, since reduced nodes
+        # have distinct children and only the TRUE terminal has no path to FALSE.
+        while f != FALSE:
+            if self._low[f] != TRUE:
+                assignment[self._level[f]] = False
+                f = self._low[f]
+            else:
+                assignment[self._level[f]] = True
+                f = self._high[f]
+        return assignment
+
+
+def _term_node(bdd: BDD, term: Term, names: Set[str], levels: Dict[str, int]) -> int:
+    """Translate a Bool term, iteratively, into a BDD node."""
+    results: List[int] = []
+    stack: List[object] = [term]
+    while stack:
+        item = stack.pop()
+        if type(item) is tuple:
+            name, arity = item
+            start = len(results) - arity
+            args = results[start:]
+            del results[start:]
+            if name == "not":
+                results.append(bdd.negate(args[0]))
+            elif name == "and":
+                results.append(bdd.conjoin(args[0], args[1]))
+            elif name == "or":
+                results.append(bdd.disjoin(args[0], args[1]))
+            elif name == "xor":
+                results.append(bdd.exclusive(args[0], args[1]))
+            else:
+                results.append(bdd.ite(args[0], args[1], args[2]))
+            continue
+        if type(item) is Const and item.name in ("True", "False"):
+            results.append(TRUE if item.name == "True" else FALSE)
+        elif type(item) is Var and item.name in names:
+            # Variables are ordered by first occurrence, which keeps related ones adjacent.
+            results.append(bdd.variable(levels.setdefault(item.name, len(levels))))
+        elif type(item) is App and BOOL_OPERATORS.get(item.name) == len(item.args):
+            stack.append((item.name, len(item.args)))
+            stack.extend(reversed(item.args))
+        elif type(item) in (Var, App):
+            raise ProofCheckError(
+                f"decide only handles Bool parameters with and/or/xor/not/ifThenElse, not '{item.name}'"
+            )
+        else:
+            raise ProofCheckError("decide only handles Bool terms")
+    return results[0]
+
+
+def _type_node(bdd: BDD, type_expr: TypeExpr, levels: Dict[str, int]) -> int:
+    """Translate a proposition (type variables, And/Or/Iff and arrows) into a BDD node."""
+    results: List[int] = []
+    stack: List[object] = [type_expr]
+    while stack:
+        item = stack.pop()
+        if type(item) is str:
+            right = results.pop()
+            left = results.pop()
+            if item == "And":
+                results.append(bdd.conjoin(left, right))
+            elif item == "Or":
+                results.append(bdd.disjoin(left, right))
+            elif item == "Iff":
+                results.append(bdd.equivalent(left, right))
+            else:
+                results.append(bdd.implies(left, right))
+            continue
+        if type(item) is TypeVar:
+            level = levels.setdefault(item.name, len(levels))
+            results.append(bdd.variable(level))
+        elif type(item) is TypeApp and item.name in PROPOSITIONS and len(item.args) == 2:
+            stack.append(item.name)
+            stack.extend(reversed(item.args))
+        elif type(item) is Arrow:
+            stack.append("->")
+            stack.extend((item.right, item.left))
+        else:
+            found = f"'{item.name}'" if isinstance(item, (TypeConst, TypeApp)) else "an equality"
+            raise ProofCheckError(f"decide only handles propositions built from And/Or/Iff/->, not {found}")
+    return results[0]
+
+
+def _equation_node(bdd: BDD, equation: TypeExpr, names: Set[str], levels: Dict[str, int]) -> int:
+    if not isinstance(equation, Equality):
+        raise ProofCheckError("decide cannot mix Bool equalities with propositions")
+    left = _term_node(bdd, equation.left, names, levels)
+    return bdd.equivalent(left, _term_node(bdd, equation.right, names, levels))
+
+
+def _describe(assignment: Dict[int, bool], levels: Dict[str, int]) -> str:
+    names = sorted(levels, key=levels.__getitem__)
+    return ", ".join(f"{name} = {assignment.get(levels[name], False)}" for name in names)
+
+
+def decide(signature: Signature) -> None:
+    """Check a Bool or propositional goal, raising `ProofCheckError` with a counterexample."""
+    bdd = BDD()
+    levels: Dict[str, int] = {}
+    premises, conclusion = flatten_arrow(signature.result)
+    if isinstance(conclusion, Equality):
+        names: Set[str] = set()
+        hypotheses: List[TypeExpr] = []
+        for param in signature.params:
+            if param.type_expr is TypeConst("Bool"):
+                names.add(param.name)
+            elif isinstance(param.type_expr, Equality):
+                hypotheses.append(param.type_expr)
+            else:
+                raise ProofCheckError(f"decide only handles Bool parameters, not '{param.name}'")
+        hypotheses.extend(premises)
+        goal = _equation_node(bdd, conclusion, names, levels)
+        for hypothesis in reversed(hypotheses):
+            goal = bdd.implies(_equation_node(bdd, hypothesis, names, levels), goal)
+    else:
+        # `(a : Type)`-style binders only introduce variables; other parameters are premises.
+        assumptions = [param.type_expr for param in signature.params if not isinstance(param.type_expr, TypeConst)]
+        goal = _type_node(bdd, conclusion, levels)
+        for premise in reversed(assumptions + premises):
+            goal = bdd.implies(_type_node(bdd, premise, levels), goal)
+    assignment = bdd.falsifying(goal)
+    if assignment is not None:
+        raise ProofCheckError(f"decide failed: counterexample {_describe(assignment, levels) or 'found'}")
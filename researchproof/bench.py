@@ -0,0 +1,296 @@
+"""Throughput benchmarks behind `researchproof bench`.
+
+A seeded generator writes a synthetic `.rp` corpus whose shape is set by a `CorpusSpec`:
+how many theorems, how deep their `S` chains run, how many parameters each binds, how
+long their list literals are and what share are proved by a catalog lemma rather than
+`Refl`. Every generated theorem verifies. The corpus is then pushed through the
+checker's phases one at a time, `tokenize`, `parse_signature`, `normalize_signature`,
+`evaluate` and an end-to-end `verify_theorems`, each with cold caches.
+
+A phase's time is its best of `repeat` runs after one warm-up run. Its peak memory is measured with
+`tracemalloc` in a separate run, since tracing slows allocation down. A report saved as
+JSON serves as the baseline of a later run, which fails when a phase got slower or
+bigger than the configured thresholds allow. Only the standard library is used.
+"""
+
+from __future__ import annotations
+
+import gc
+import json
+import random
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, List, Mapping, Optional, Sequence, Tuple
+
+from researchproof.catalog import default_catalog
+from researchproof.matching import lemma_pattern
+from researchproof.proof_checker import (
+    Equality,
+    evaluate,
+    normalize_signature,
+    parse_normalized_signature,
+    parse_proof_term,
+    parse_signature,
+    reset_evaluation_caches,
+    tokenize,
+    verify_theorems,
+)
+from researchproof.proof_language import parse_text
+
+BASELINE_FORMAT = 1
+DEFAULT_REPEAT = 3
+DEFAULT_MAX_SLOWDOWN = 0.25
+DEFAULT_MAX_MEMORY_GROWTH = 0.25
+# Phases faster than this are too noisy to gate on time.
+MIN_GATED_SECONDS = 0.02
+PHASES = ("tokenize", "parse_signature", "normalize_signature", "evaluate", "verify_theorems")
+
+# Catalog lemmas the generator instantiates: name, conclusion with one `{i}` slot per
+# parameter, and the number of parameters.
+LEMMA_TEMPLATES: Tuple[Tuple[str, str, int], ...] = (
+    ("plusComm", "plus {0} {1} = plus {1} {0}", 2),
+    ("plusAssoc", "plus (plus {0} {1}) {2} = plus {0} (plus {1} {2})", 3),
+    ("plusSuccRight", "plus {0} (S {1}) = S (plus {0} {1})", 2),
+    ("multDistribLeft", "mult {0} (plus {1} {2}) = plus (mult {0} {1}) (mult {0} {2})", 3),
+    ("multAssoc", "mult (mult {0} {1}) {2} = mult {0} (mult {1} {2})", 3),
+)
+
+
+class BaselineError(ValueError):
+    """A baseline file that cannot be read or does not describe the same corpus."""
+
+
+@dataclass(frozen=True)
+class CorpusSpec:
+    theorems: int = 500
+    depth: int = 20
+    binders: int = 3
+    list_size: int = 10
+    lemma_ratio: float = 0.3
+    seed: int = 0
+
+
+@dataclass(frozen=True)
+class PhaseResult:
+    name: str
+    seconds: float
+    peak_bytes: int
+
+
+@dataclass(frozen=True)
+class Regression:
+    phase: str
+    metric: str
+    baseline: float
+    current: float
+    limit: float
+
+    def describe(self) -> str:
+        change = self.current / self.baseline - 1 if self.baseline else float("inf")
+        unit = "s" if self.metric == "seconds" else " bytes"
+        return (
+            f"{self.phase}: {self.metric} {self.baseline:g}{unit} -> {self.current:g}{unit} "
+            f"({change:+.1%}, limit {self.limit:+.0%})"
+        )
+
+
+# -----------------------------
+# Corpus generation
+# -----------------------------
+
+
+def _chain(count: int, base: str) -> str:
+    return "S (" * count + base + ")" * count
+
+
+def _operand(rng: random.Random, spec: CorpusSpec, names: Sequence[str]) -> str:
+    base = rng.choice(names) if names else "Z"
+    return _chain(rng.randint(0, spec.depth), base)
+
+
+def _nat_goal(rng: random.Random, spec: CorpusSpec, names: Sequence[str]) -> str:
+    # `plus` recurses on its closed first argument, so both sides reduce to S^(a+b) base.
+    base = "Z"
+    for name in reversed(names):
+        base = name if base == "Z" else f"(plus {name} {base})"
+    first, second = rng.randint(1, spec.depth), rng.randint(0, spec.depth)
+    return f"plus ({_chain(first, 'Z')}) ({_chain(second, base)}) = {_chain(first + second, base)}"
+
+
+def _list_goal(rng: random.Random, spec: CorpusSpec, names: Sequence[str]) -> str:
+    elements = [
+        rng.choice(names) if names and rng.random() < 0.5 else str(rng.randint(0, 9))
+        for _ in range(rng.randint(1, spec.list_size))
+    ]
+    items = mapped = "Nil"
+    for element in reversed(elements):
+        items = f"(Cons {element} {items})"
+        successor = str(int(element) + 1) if element.isdigit() else f"(S {element})"
+        mapped = f"(Cons {successor} {mapped})"
+    if rng.random() < 0.5:
+        return f"length (append {items} Nil) = {len(elements)}"
+    return f"map (\\y => S y) {items} = {mapped}"
+
+
+def _lemma_goal(rng: random.Random, spec: CorpusSpec, names: Sequence[str]) -> Tuple[str, str]:
+    lemma, conclusion, arity = rng.choice(LEMMA_TEMPLATES)
+    operands = [f"({_operand(rng, spec, names)})" for _ in range(arity)]
+    return conclusion.format(*operands), lemma
+
+
+def generate_corpus(spec: CorpusSpec) -> str:
+    """Return the text of a `.rp` script shaped by `spec`; equal specs give equal text."""
+    rng = random.Random(spec.seed)
+    names = [f"x{index}" for index in range(spec.binders)]
+    binders = "".join(f"({name} : Nat) -> " for name in names)
+    lines = [f"# Generated by `researchproof bench`: {json.dumps(asdict(spec), sort_keys=True)}", ""]
+    for index in range(spec.theorems):
+        if rng.random() < spec.lemma_ratio:
+            goal, proof = _lemma_goal(rng, spec, names)
+        elif spec.list_size and rng.random() < 0.5:
+            goal, proof = _list_goal(rng, spec, names), "Refl"
+        else:
+            goal, proof = _nat_goal(rng, spec, names), "Refl"
+        lines += [f"theorem t{index} : {binders}{goal}", f"proof {proof}", ""]
+    return "\n".join(lines)
+
+
+# -----------------------------
+# Measurement
+# -----------------------------
+
+
+def reset_caches() -> None:
+    """Drop every parse, compile and evaluation cache so a phase starts cold."""
+    parse_normalized_signature.cache_clear()
+    parse_proof_term.cache_clear()
+    lemma_pattern.cache_clear()
+    reset_evaluation_caches()
+
+
+def _measure(name: str, run: Callable[[], object], repeat: int) -> PhaseResult:
+    reset_caches()
+    run()  # Warm up the interpreter's own caches; not counted.
+    best = float("inf")
+    for _ in range(repeat):
+        reset_caches()
+        gc.collect()
+        # As in `timeit`, the collector is off while timing so its pauses do not add noise.
+        gc.disable()
+        try:
+            began = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - began)
+        finally:
+            gc.enable()
+    reset_caches()
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return PhaseResult(name, best, peak)
+
+
+def run_phases(text: str, repeat: int = DEFAULT_REPEAT) -> List[PhaseResult]:
+    """Time each checker phase over the script `text`, in `PHASES` order."""
+    repeat = max(1, repeat)
+    theorems = parse_text(text)
+    catalog = default_catalog()
+    signatures = [theorem.signature for theorem in theorems]
+    results = [
+        _measure("tokenize", lambda: [tokenize(signature) for signature in signatures], repeat),
+        # Measured before any parse result is kept alive, so node interning starts cold.
+        _measure("parse_signature", lambda: [parse_signature(signature) for signature in signatures], repeat),
+    ]
+    parsed = [parse_signature(signature) for signature in signatures]
+    sides = [
+        side
+        for theorem, signature in zip(theorems, parsed)
+        if theorem.proof == "Refl" and isinstance(signature.result, Equality)
+        for side in (signature.result.left, signature.result.right)
+    ]
+    results.append(_measure("normalize_signature", lambda: [normalize_signature(signature) for signature in parsed], repeat))
+    results.append(_measure("evaluate", lambda: [evaluate(side, {}) for side in sides], repeat))
+    del parsed, sides
+    results.append(_measure("verify_theorems", lambda: verify_theorems(parse_text(text), catalog), repeat))
+    return results
+
+
+# -----------------------------
+# Baselines
+# -----------------------------
+
+
+def report_json(spec: CorpusSpec, results: Sequence[PhaseResult]) -> dict:
+    return {
+        "format": BASELINE_FORMAT,
+        "corpus": asdict(spec),
+        "phases": {result.name: {"seconds": result.seconds, "peak_bytes": result.peak_bytes} for result in results},
+    }
+
+
+def load_baseline(path: Path) -> dict:
+    try:
+        baseline = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        raise BaselineError(f"cannot read baseline {path}: {exc}") from None
+    if not isinstance(baseline, dict) or baseline.get("format") != BASELINE_FORMAT:
+        raise BaselineError(f"{path} is not a format {BASELINE_FORMAT} benchmark baseline")
+    return baseline
+
+
+def compare(
+    spec: CorpusSpec,
+    results: Sequence[PhaseResult],
+    baseline: Mapping[str, object],
+    max_slowdown: float = DEFAULT_MAX_SLOWDOWN,
+    max_memory_growth: float = DEFAULT_MAX_MEMORY_GROWTH,
+) -> List[Regression]:
+    """Return the phases that exceed `baseline` by more than the allowed fractions.
+
+    A phase missing from the baseline is not gated; a baseline of another corpus raises
+    `BaselineError`, since its numbers are not comparable.
+    """
+    if baseline.get("corpus") != asdict(spec):
+        raise BaselineError(f"baseline was recorded for corpus {baseline.get('corpus')}, not {asdict(spec)}")
+    phases = baseline.get("phases")
+    if not isinstance(phases, dict):
+        raise BaselineError("baseline has no 'phases' object")
+    regressions = []
+    for result in results:
+        recorded = phases.get(result.name)
+        if not isinstance(recorded, dict):
+            continue
+        seconds, peak = recorded.get("seconds"), recorded.get("peak_bytes")
+        if isinstance(seconds, (int, float)) and max(seconds, result.seconds) >= MIN_GATED_SECONDS:
+            if result.seconds > seconds * (1 + max_slowdown):
+                regressions.append(Regression(result.name, "seconds", seconds, result.seconds, max_slowdown))
+        if isinstance(peak, int) and result.peak_bytes > peak * (1 + max_memory_growth):
+            regressions.append(Regression(result.name, "peak_bytes", peak, result.peak_bytes, max_memory_growth))
+    return regressions
+
+
+def format_table(results: Sequence[PhaseResult], baseline: Optional[Mapping[str, object]] = None) -> str:
+    phases = baseline.get("phases", {}) if baseline else {}
+    header = f"{'phase':<22}{'seconds':>10}{'peak KiB':>12}"
+    if baseline:
+        header += f"{'time vs base':>15}{'mem vs base':>13}"
+    lines = [header]
+    for result in results:
+        line = f"{result.name:<22}{result.seconds:>10.4f}{result.peak_bytes / 1024:>12,.0f}"
+        recorded = phases.get(result.name) if isinstance(phases, dict) else None
+        if isinstance(recorded, dict):
+            line += f"{_change(result.seconds, recorded.get('seconds')):>15}"
+            line += f"{_change(result.peak_bytes, recorded.get('peak_bytes')):>13}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _change(current: float, recorded: object) -> str:
+    if not isinstance(recorded, (int, float)) or not recorded:
+        return "-"
+    return f"{current / recorded - 1:+.1%}"
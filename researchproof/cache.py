@@ -0,0 +1,207 @@
+"""Persistent cache of theorems that already verified.
+
+A cache key combines the checker version, a fingerprint of the lemma catalog, the
+resource limits in force when the cache was opened, and the theorem's signature and proof
+text, so any change to one of those re-checks the theorem. The wall-clock timeout is left
+out: whether a theorem fits in it depends on the machine, not on the theorem.
+Only passing theorems are recorded. The cache is an append-only log with one
+`<key> <time verified>` line per entry, so saving a run costs what the run added: under a
+lock, a run reads only what other runs appended since it last looked and appends the keys
+no run has recorded yet. Concurrent runs therefore never clobber each other. Once the log
+holds more than `COMPACT_FACTOR` times the size cap, it is rewritten atomically with just
+the newest entries; past the cap, the oldest entries are ignored until then.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, Iterator, Optional, Tuple, Union
+
+from researchproof import __version__, limits
+from researchproof.proof_language import Theorem
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no flock; rely on atomic replace.
+    fcntl = None
+
+# Bump whenever a change to the checker could flip a theorem's verdict.
+CHECKER_VERSION = f"{__version__}+8"
+CACHE_FORMAT = 2
+CACHE_FILENAME = f"verified.v{CACHE_FORMAT}.log"
+DEFAULT_MAX_ENTRIES = 200_000
+# The log is compacted once it holds this many times `max_entries` lines.
+COMPACT_FACTOR = 2
+
+
+def default_cache_dir() -> Path:
+    configured = os.environ.get("RESEARCHPROOF_CACHE_DIR")
+    if configured:
+        return Path(configured)
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "researchproof"
+
+
+def theorem_key(prefix: str, theorem: Theorem) -> str:
+    payload = f"{prefix}\0{theorem.signature}\0{theorem.proof}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class CacheView:
+    """Read-only, picklable snapshot of a cache for worker processes."""
+
+    prefix: str
+    keys: FrozenSet[str]
+
+    def key(self, theorem: Theorem) -> str:
+        return theorem_key(self.prefix, theorem)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.keys
+
+    def salted(self, salt: str) -> "CacheView":
+        """The same entries keyed for theorems that also depend on `salt`, e.g. imported lemmas."""
+        return CacheView(f"{self.prefix}\0{salt}", self.keys)
+
+
+class VerificationCache:
+    """On-disk set of cache keys for theorems known to verify."""
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        catalog_fingerprint: str,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        active = limits.active_limits()
+        bounds = f"{active.steps},{active.int_bits},{active.list_length}"
+        self._prefix = f"{CHECKER_VERSION}\0{catalog_fingerprint}\0{bounds}"
+        self._entries: Dict[str, float] = {}
+        self._added: Dict[str, float] = {}
+        # How far `_entries` reflects the log: which file (it is replaced when compacted),
+        # the bytes read so far and the lines they held.
+        self._file_id: Optional[Tuple[int, int]] = None
+        self._offset = 0
+        self._lines = 0
+        self._read()
+
+    @property
+    def path(self) -> Path:
+        return self.directory / CACHE_FILENAME
+
+    def key(self, theorem: Theorem) -> str:
+        return theorem_key(self._prefix, theorem)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries or key in self._added
+
+    def __len__(self) -> int:
+        return len(self._entries.keys() | self._added.keys())
+
+    def view(self) -> CacheView:
+        return CacheView(self._prefix, frozenset(self._entries) | frozenset(self._added))
+
+    def record(self, keys: Iterable[str]) -> None:
+        now = time.time()
+        for key in keys:
+            if key not in self._entries:
+                self._added.setdefault(key, now)
+
+    def _read(self) -> None:
+        """Add the entries appended to the log since the last read, or all after a compaction."""
+        try:
+            with open(self.path, "rb") as handle:
+                stat = os.fstat(handle.fileno())
+                if (stat.st_dev, stat.st_ino) != self._file_id or stat.st_size < self._offset:
+                    self._file_id = (stat.st_dev, stat.st_ino)
+                    self._entries, self._offset, self._lines = {}, 0, 0
+                handle.seek(self._offset)
+                data = handle.read()
+        except OSError:
+            return
+        # A line without its newline is still being written; it is read next time.
+        data = data[: data.rfind(b"\n") + 1]
+        self._offset += len(data)
+        entries = self._entries
+        for line in data.decode("utf-8", "replace").splitlines():
+            key, _, stamp = line.partition(" ")
+            try:
+                entries[key] = float(stamp)
+            except ValueError:
+                continue
+            self._lines += 1
+        if len(entries) > self.max_entries:
+            self._entries = self._newest()
+
+    def _newest(self) -> Dict[str, float]:
+        # Sorting is stable and the log is in append order, so ties keep the later entry.
+        ordered = sorted(self._entries.items(), key=lambda item: item[1])
+        return dict(ordered[-self.max_entries :] if self.max_entries > 0 else ())
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        if fcntl is None:
+            yield
+            return
+        with open(self.directory / "cache.lock", "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def save(self) -> None:
+        """Append new entries to the on-disk log, compacting it once it has grown too long."""
+        if not self._added:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._locked():
+            self._read()
+            added = {key: stamp for key, stamp in self._added.items() if key not in self._entries}
+            if added:
+                with open(self.path, "ab") as handle:
+                    handle.write("".join(f"{key} {stamp!r}\n" for key, stamp in added.items()).encode("utf-8"))
+                    handle.flush()
+                    stat = os.fstat(handle.fileno())
+                self._file_id = (stat.st_dev, stat.st_ino)
+                self._offset = stat.st_size
+                self._lines += len(added)
+                self._entries.update(added)
+            if len(self._entries) > self.max_entries:
+                self._entries = self._newest()
+            if self._lines > COMPACT_FACTOR * max(self.max_entries, 1):
+                self._compact()
+        self._added = {}
+
+    def _compact(self) -> None:
+        fd, tmp_name = tempfile.mkstemp(prefix=CACHE_FILENAME, suffix=".tmp", dir=str(self.directory))
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write("".join(f"{key} {stamp!r}\n" for key, stamp in self._entries.items()).encode("utf-8"))
+                handle.flush()
+                stat = os.fstat(handle.fileno())
+            os.replace(tmp_name, self.path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+        self._file_id = (stat.st_dev, stat.st_ino)
+        self._offset = stat.st_size
+        self._lines = len(self._entries)
+
+
+def open_cache(
+    directory: Optional[Union[str, Path]],
+    catalog_fingerprint: str,
+    max_entries: int = DEFAULT_MAX_ENTRIES,
+) -> VerificationCache:
+    return VerificationCache(directory or default_cache_dir(), catalog_fingerprint, max_entries)
@@ -0,0 +1,238 @@
+"""Demand-driven lemma catalogs for the proof checker.
+
+A `LemmaCatalog` maps lemma names to parsed signatures, but only parses a lemma the first
+time a proof script references it. Normalized signatures are cached alongside, so a lemma
+cited by many theorems is normalized once.
+
+External catalogs are plain-text files with one `lemma <name> : <signature>` declaration
+per line. Each file gets an on-disk index (`<file>.idx`) that maps lemma names to byte
+ranges and structural fingerprints. The index is invalidated by the file's content hash,
+so once a catalog is indexed, loading it does not parse any of its signatures.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+from researchproof.errors import ParseError
+from researchproof.lemma_catalog import LEMMA_CATALOG, Lemma
+from researchproof.proof_checker import (
+    Signature,
+    fingerprint_normalized,
+    normalize_signature,
+    parse_signature,
+    signature_fingerprint,
+)
+
+INDEX_VERSION = 3
+INDEX_SUFFIX = ".idx"
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_json_atomic(path: Path, payload: object) -> None:
+    fd, tmp_name = tempfile.mkstemp(prefix=path.name, suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, separators=(",", ":"))
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def parse_catalog_line(line: str, line_number: int) -> Optional[Tuple[str, str]]:
+    """Parse one catalog line into `(name, signature)`, or `None` for blank/comment lines."""
+    normalized = line.split("#", 1)[0].strip()
+    if not normalized:
+        return None
+    if not normalized.startswith("lemma "):
+        raise ParseError(f"Expected 'lemma <name> : <type>' at line {line_number}, got: {line.strip()}")
+    name, sep, signature = normalized[len("lemma ") :].partition(":")
+    name = name.strip()
+    signature = signature.strip()
+    if not sep or not name or not signature:
+        raise ParseError(f"Malformed lemma declaration on line {line_number}: {line.strip()}")
+    return name, signature
+
+
+class CatalogFile:
+    """Indexed view over an external catalog file.
+
+    Only the index is loaded up front; signature text is read from disk on lookup.
+    """
+
+    def __init__(self, path: Union[str, Path], entries: Dict[str, Tuple[int, int, str]], content_hash: str):
+        self.path = Path(path)
+        self.entries = entries
+        self.content_hash = content_hash
+
+    @classmethod
+    def open(cls, path: Union[str, Path]) -> "CatalogFile":
+        path = Path(path)
+        content_hash = file_digest(path)
+        index_path = path.with_name(path.name + INDEX_SUFFIX)
+        try:
+            payload = json.loads(index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            payload = None
+        if (
+            isinstance(payload, dict)
+            and payload.get("version") == INDEX_VERSION
+            and payload.get("content_hash") == content_hash
+        ):
+            entries = {name: (entry[0], entry[1], entry[2]) for name, entry in payload["entries"].items()}
+            return cls(path, entries, content_hash)
+
+        entries = cls._scan(path)
+        try:
+            write_json_atomic(
+                index_path,
+                {"version": INDEX_VERSION, "content_hash": content_hash, "entries": entries},
+            )
+        except OSError:
+            # A read-only catalog location still works; it just re-indexes on every run.
+            pass
+        return cls(path, entries, content_hash)
+
+    @staticmethod
+    def _scan(path: Path) -> Dict[str, Tuple[int, int, str]]:
+        entries: Dict[str, Tuple[int, int, str]] = {}
+        offset = 0
+        with path.open("rb") as handle:
+            for line_number, raw in enumerate(handle, start=1):
+                parsed = parse_catalog_line(raw.decode("utf-8"), line_number)
+                if parsed is not None:
+                    name, signature = parsed
+                    if name in entries:
+                        raise ParseError(f"Duplicate lemma '{name}' on line {line_number} of {path}")
+                    entries[name] = (offset, len(raw), signature_fingerprint(parse_signature(signature)))
+                offset += len(raw)
+        return entries
+
+    def read_signature(self, name: str) -> str:
+        offset, length, _ = self.entries[name]
+        with self.path.open("rb") as handle:
+            handle.seek(offset)
+            raw = handle.read(length)
+        parsed = parse_catalog_line(raw.decode("utf-8"), 0)
+        if parsed is None or parsed[0] != name:
+            raise ParseError(f"Catalog index for {self.path} is stale; remove {self.path.name}{INDEX_SUFFIX}")
+        return parsed[1]
+
+
+class LemmaCatalog(Mapping[str, Signature]):
+    """Mapping from lemma names to signatures that parses entries on first use.
+
+    Later sources shadow earlier ones, so external catalogs can override built-in lemmas.
+    """
+
+    def __init__(self, lemmas: Iterable[Lemma] = (), files: Iterable[CatalogFile] = ()):
+        self._builtin: Dict[str, str] = {lemma.name: lemma.signature for lemma in lemmas}
+        self._files: List[CatalogFile] = list(files)
+        self._owner: Dict[str, CatalogFile] = {}
+        for catalog_file in self._files:
+            for name in catalog_file.entries:
+                self._owner[name] = catalog_file
+        self._parsed: Dict[str, Signature] = {}
+        self._normalized: Dict[str, Signature] = {}
+        self._by_fingerprint: Optional[Dict[str, List[str]]] = None
+        self._content_fingerprint: Optional[str] = None
+
+    @classmethod
+    def from_paths(cls, paths: Iterable[Union[str, Path]], include_builtin: bool = True) -> "LemmaCatalog":
+        files = [CatalogFile.open(path) for path in paths]
+        return cls(LEMMA_CATALOG if include_builtin else (), files)
+
+    def signature_text(self, name: str) -> str:
+        owner = self._owner.get(name)
+        if owner is not None:
+            return owner.read_signature(name)
+        return self._builtin[name]
+
+    def __getitem__(self, name: str) -> Signature:
+        parsed = self._parsed.get(name)
+        if parsed is None:
+            if name not in self:
+                raise KeyError(name)
+            parsed = parse_signature(self.signature_text(name))
+            self._parsed[name] = parsed
+        return parsed
+
+    def normalized(self, name: str) -> Signature:
+        """Return the alpha-normalized signature of `name`, computed at most once."""
+        normalized = self._normalized.get(name)
+        if normalized is None:
+            normalized = normalize_signature(self[name])
+            self._normalized[name] = normalized
+        return normalized
+
+    def content_fingerprint(self) -> str:
+        """Digest of every lemma source, used to invalidate caches when the catalog changes."""
+        if self._content_fingerprint is None:
+            digest = hashlib.sha256()
+            for name, signature in self._builtin.items():
+                digest.update(f"{name}\0{signature}\n".encode("utf-8"))
+            for catalog_file in self._files:
+                digest.update(f"file\0{catalog_file.content_hash}\n".encode("utf-8"))
+            self._content_fingerprint = digest.hexdigest()
+        return self._content_fingerprint
+
+    def fingerprint(self, name: str) -> str:
+        owner = self._owner.get(name)
+        if owner is not None:
+            return owner.entries[name][2]
+        return fingerprint_normalized(self.normalized(name))
+
+    def find(self, fingerprint: str) -> List[str]:
+        """Return lemma names whose normalized signature has `fingerprint`, in catalog order.
+
+        The hash index is built on first use; external catalogs contribute the fingerprints
+        stored in their on-disk index, so only built-in lemmas are normalized here.
+        """
+        if self._by_fingerprint is None:
+            index: Dict[str, List[str]] = {}
+            for name in self:
+                index.setdefault(self.fingerprint(name), []).append(name)
+            self._by_fingerprint = index
+        return self._by_fingerprint.get(fingerprint, [])
+
+    def search(self, signature: Signature) -> List[str]:
+        """Return lemma names whose signature is alpha-equivalent to `signature`."""
+        normalized = normalize_signature(signature)
+        return [name for name in self.find(fingerprint_normalized(normalized)) if self.normalized(name) == normalized]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._owner or name in self._builtin
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._builtin
+        for name in self._owner:
+            if name not in self._builtin:
+                yield name
+
+    def __len__(self) -> int:
+        return len(self._builtin) + sum(1 for name in self._owner if name not in self._builtin)
+
+
+_DEFAULT_CATALOG: Optional[LemmaCatalog] = None
+
+
+def default_catalog() -> LemmaCatalog:
+    """Return the process-wide catalog over the built-in `LEMMA_CATALOG`."""
+    global _DEFAULT_CATALOG
+    if _DEFAULT_CATALOG is None:
+        _DEFAULT_CATALOG = LemmaCatalog(LEMMA_CATALOG)
+    return _DEFAULT_CATALOG
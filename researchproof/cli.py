@@ -3,26 +3,297 @@
 from __future__ import annotations
 
 import argparse
+import json
+import sys
+from contextlib import ExitStack
 from pathlib import Path
+from typing import IO, List
 
-from researchproof.errors import ProofLanguageError
-from researchproof.proof_checker import verify_theorems
-from researchproof.proof_language import parse_text
+from researchproof.cache import DEFAULT_MAX_ENTRIES, open_cache
+from researchproof.catalog import LemmaCatalog, default_catalog
+from researchproof.errors import ParseError, ProofLanguageError
+from researchproof.limits import DEFAULT_INT_BITS, DEFAULT_LIST_LENGTH, DEFAULT_STEPS, Limits, set_limits
+from researchproof.proof_checker import EVALUATION_MEMO, parse_signature
+from researchproof.profiling import DEFAULT_TOP, profile
+from researchproof.proof_language import iter_theorems, parse_text
+from researchproof.runner import FAILED, collect_proof_files, iter_records, verify_paths
+
+
+def _or_default(value, default):
+    # Subcommand defaults live in modules imported only when that subcommand runs.
+    return default if value is None else value
 
 
 def _load_text(path: Path) -> str:
     return path.read_text(encoding="utf-8")
 
 
+def _load_catalog(args: argparse.Namespace) -> LemmaCatalog:
+    if args.catalog:
+        return LemmaCatalog.from_paths(args.catalog)
+    return default_catalog()
+
+
+def _add_limit_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--max-steps",
+        type=int,
+        default=DEFAULT_STEPS,
+        metavar="N",
+        help=f"Evaluation steps allowed per theorem (0 = unlimited; default: {DEFAULT_STEPS})",
+    )
+    parser.add_argument(
+        "--max-int-bits",
+        type=int,
+        default=DEFAULT_INT_BITS,
+        metavar="N",
+        help=f"Largest natural, in bits, a theorem may compute (0 = unlimited; default: {DEFAULT_INT_BITS})",
+    )
+    parser.add_argument(
+        "--max-list-length",
+        type=int,
+        default=DEFAULT_LIST_LENGTH,
+        metavar="N",
+        help=f"Longest list a theorem may build (0 = unlimited; default: {DEFAULT_LIST_LENGTH})",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Wall-clock time allowed per theorem (default: none)",
+    )
+    parser.add_argument(
+        "--counterexamples",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Sampled assignments a failed proof may try to find a counterexample (default: 0, no search)",
+    )
+
+
+def _set_limits(args: argparse.Namespace) -> None:
+    set_limits(
+        Limits(
+            steps=args.max_steps or None,
+            int_bits=args.max_int_bits or None,
+            list_length=args.max_list_length or None,
+            timeout=args.timeout or None,
+            counterexample_samples=args.counterexamples,
+        )
+    )
+
+
+def _open_report(stack: ExitStack, target: str) -> IO[str]:
+    if target == "-":
+        return sys.stdout
+    return stack.enter_context(open(target, "w", encoding="utf-8"))
+
+
+def _verify_keep_going(args: argparse.Namespace, catalog: LemmaCatalog, cache) -> int:
+    from researchproof.reports import JsonLinesReport, JUnitReport
+
+    # JSON Lines on stdout keeps stdout machine-readable; the human summary moves to stderr.
+    out = sys.stderr if args.report_jsonl == "-" else sys.stdout
+    files = set()
+    total = failed = 0
+    with ExitStack() as stack:
+        sinks: List = []
+        if args.report_jsonl:
+            sinks.append(JsonLinesReport(_open_report(stack, args.report_jsonl)))
+        if args.junit:
+            sinks.append(JUnitReport(_open_report(stack, args.junit)))
+        for record in iter_records(
+            args.proof_files, catalog, jobs=args.jobs, cache=cache, module_path=args.module_path
+        ):
+            files.add(record.path)
+            for sink in sinks:
+                sink.add(record)
+            if record.name is not None:
+                total += 1
+            if record.ok:
+                continue
+            failed += 1
+            if record.status == FAILED:
+                print(f"Error: {record.path}: theorem '{record.name}' (line {record.line_number}): {record.error}", file=out)
+            else:
+                print(f"Error: {record.path}: {record.error}", file=out)
+        for sink in sinks:
+            sink.close()
+    if not files:
+        print("Error: no .rp proof scripts found.", file=out)
+        return 1
+    print(f"Checked {total} theorem(s) in {len(files)} file(s); {failed} failure(s).", file=out)
+    return 1 if failed else 0
+
+
+def _print_memo_stats(out: IO[str]) -> None:
+    stats = EVALUATION_MEMO.stats()
+    print(
+        f"Evaluation memo: {stats.hits} hit(s), {stats.misses} miss(es) ({stats.hit_rate:.1%} hit rate), "
+        f"{stats.evictions} eviction(s), {stats.size} value(s) kept.",
+        file=out,
+    )
+
+
 def cmd_verify(args: argparse.Namespace) -> int:
-    proof_path = Path(args.proof_file)
-    text = _load_text(proof_path)
-    theorems = parse_text(text)
-    verify_theorems(theorems)
-    print(f"Verified {len(theorems)} theorem(s) from {proof_path}.")
+    out = sys.stderr if args.report_jsonl == "-" else sys.stdout
+    if args.profile or args.profile_trace or args.profile_metrics:
+        status = _verify_profiled(args, out)
+    else:
+        status = _verify(args)
+    if args.stats:
+        _print_memo_stats(out)
+    return status
+
+
+def _verify_profiled(args: argparse.Namespace, out: IO[str]) -> int:
+    # Every theorem is checked in this process, so none may be skipped by workers or the cache.
+    args.jobs = 1
+    args.no_cache = True
+    with profile(memory=not args.no_profile_memory) as profiler:
+        status = _verify(args)
+    print(profiler.format_top(args.profile_top), file=out)
+    if args.profile_trace:
+        with open(args.profile_trace, "w", encoding="utf-8") as handle:
+            profiler.write_chrome_trace(handle)
+        print(f"Wrote Chrome trace to {args.profile_trace}.", file=out)
+    if args.profile_metrics:
+        Path(args.profile_metrics).write_text(profiler.openmetrics(), encoding="utf-8")
+        print(f"Wrote OpenMetrics to {args.profile_metrics}.", file=out)
+    return status
+
+
+def _verify(args: argparse.Namespace) -> int:
+    _set_limits(args)
+    catalog = _load_catalog(args)
+    cache = None
+    if not args.no_cache:
+        cache = open_cache(args.cache_dir, catalog.content_fingerprint(), args.cache_size)
+    if args.keep_going or args.report_jsonl or args.junit:
+        return _verify_keep_going(args, catalog, cache)
+    reports = verify_paths(args.proof_files, catalog, jobs=args.jobs, cache=cache, module_path=args.module_path)
+    if not reports:
+        print("Error: no .rp proof scripts found.")
+        return 1
+    for report in reports:
+        if report.ok:
+            cached = f" ({report.cached} cached)" if report.cached else ""
+            print(f"Verified {report.theorem_count} theorem(s) from {report.path}{cached}.")
+        else:
+            print(f"Error: {report.path}: {report.error}")
+    failed = sum(1 for report in reports if not report.ok)
+    if len(reports) > 1:
+        total = sum(report.theorem_count for report in reports)
+        print(f"Checked {total} theorem(s) in {len(reports)} file(s); {failed} file(s) failed.")
+    return 1 if failed else 0
+
+
+def cmd_search(args: argparse.Namespace) -> int:
+    catalog = _load_catalog(args)
+    matches = catalog.search(parse_signature(args.signature))
+    if not matches:
+        print("No matching lemma found.")
+        return 1
+    for name in matches:
+        print(f"{name} : {catalog.signature_text(name)}")
+    return 0
+
+
+def cmd_fuzz(args: argparse.Namespace) -> int:
+    from researchproof.fuzz import DEFAULT_SAMPLES, UnsupportedGoal, find_counterexample
+
+    paths = collect_proof_files(args.proof_files)
+    if not paths:
+        print("Error: no .rp proof scripts found.")
+        return 1
+    total = samples = found = skipped = errors = 0
+    for path in paths:
+        for item in iter_theorems(path, recover=True):
+            if isinstance(item, ParseError):
+                print(f"Error: {path}: {item}")
+                errors += 1
+                continue
+            total += 1
+            label = f"{path}: theorem '{item.name}' (line {item.line_number})"
+            try:
+                signature = parse_signature(item.signature)
+                result = find_counterexample(signature, _or_default(args.samples, DEFAULT_SAMPLES), args.seed)
+            except UnsupportedGoal as exc:
+                skipped += 1
+                print(f"Skipped {label}: {exc}")
+                continue
+            samples += result.samples
+            if result.counterexample is not None:
+                found += 1
+                print(f"Counterexample for {label}: {result.counterexample.describe()}")
+    print(f"Sampled {total} theorem(s) with {samples} assignment(s); {found} counterexample(s), {skipped} skipped.")
+    return 1 if found or errors else 0
+
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    from researchproof.server import DEFAULT_WORKERS, VerificationServer, serve_stdio, serve_unix
+
+    _set_limits(args)
+    catalog = _load_catalog(args)
+    cache = None
+    if not args.no_cache:
+        cache = open_cache(args.cache_dir, catalog.content_fingerprint(), args.cache_size)
+    workers = _or_default(args.workers, DEFAULT_WORKERS)
+    server = VerificationServer(catalog, cache, workers=workers, module_path=args.module_path)
+    if args.socket:
+        print(f"Serving on {args.socket}", file=sys.stderr)
+        try:
+            serve_unix(server, args.socket)
+        except FileExistsError as exc:
+            server.close()
+            print(f"Error: {exc}", file=sys.stderr)
+            return 1
+    else:
+        serve_stdio(server)
     return 0
 
 
+def cmd_bench(args: argparse.Namespace) -> int:
+    from researchproof.bench import (
+        DEFAULT_MAX_MEMORY_GROWTH,
+        DEFAULT_MAX_SLOWDOWN,
+        DEFAULT_REPEAT,
+        BaselineError,
+        CorpusSpec,
+        compare,
+        format_table,
+        generate_corpus,
+        load_baseline,
+        report_json,
+        run_phases,
+    )
+
+    fields = ("theorems", "depth", "binders", "list_size", "lemma_ratio", "seed")
+    spec = CorpusSpec(**{name: getattr(args, name) for name in fields if getattr(args, name) is not None})
+    repeat = _or_default(args.repeat, DEFAULT_REPEAT)
+    max_slowdown = _or_default(args.max_slowdown, DEFAULT_MAX_SLOWDOWN)
+    max_memory_growth = _or_default(args.max_memory_growth, DEFAULT_MAX_MEMORY_GROWTH)
+    try:
+        baseline = load_baseline(Path(args.baseline)) if args.baseline else None
+        text = generate_corpus(spec)
+        if args.write_corpus:
+            Path(args.write_corpus).write_text(text, encoding="utf-8")
+        results = run_phases(text, repeat)
+        regressions = compare(spec, results, baseline, max_slowdown, max_memory_growth) if baseline else []
+    except BaselineError as exc:
+        print(f"Error: {exc}")
+        return 1
+    print(f"Benchmarked {spec.theorems} generated theorem(s), best of {repeat} run(s) per phase.")
+    print(format_table(results, baseline))
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(report_json(spec, results), indent=2) + "\n", encoding="utf-8")
+        print(f"Saved baseline to {args.save_baseline}.")
+    for regression in regressions:
+        print(f"Regression: {regression.describe()}")
+    return 1 if regressions else 0
+
+
 def cmd_render(args: argparse.Namespace) -> int:
     proof_path = Path(args.proof_file)
     text = _load_text(proof_path)
@@ -38,9 +309,192 @@ def build_parser() -> argparse.ArgumentParser:
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     verify_parser = subparsers.add_parser("verify", help="Verify proofs with the built-in checker")
-    verify_parser.add_argument("proof_file", help="Path to a .rp proof script")
+    verify_parser.add_argument(
+        "proof_files",
+        nargs="+",
+        metavar="proof_file",
+        help="Path to a .rp proof script or a directory of them",
+    )
+    verify_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes (0 = one per CPU)",
+    )
+    verify_parser.add_argument(
+        "--catalog",
+        action="append",
+        default=[],
+        help="Additional lemma catalog file (repeatable); indexed on first use",
+    )
+    verify_parser.add_argument(
+        "--module-path",
+        action="append",
+        default=[],
+        metavar="DIR",
+        help="Directory to look up imported modules in (repeatable), after the importing script's own",
+    )
+    verify_parser.add_argument("--no-cache", action="store_true", help="Re-check every theorem")
+    verify_parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Verification cache directory (default: $RESEARCHPROOF_CACHE_DIR or ~/.cache/researchproof)",
+    )
+    verify_parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_MAX_ENTRIES,
+        help="Maximum number of cached theorems before the oldest are evicted",
+    )
+    verify_parser.add_argument(
+        "-k",
+        "--keep-going",
+        action="store_true",
+        help="Check every theorem instead of stopping at the first failure in each file",
+    )
+    verify_parser.add_argument(
+        "--report-jsonl",
+        metavar="PATH",
+        default=None,
+        help="Stream one JSON record per theorem to PATH ('-' for stdout); implies --keep-going",
+    )
+    verify_parser.add_argument(
+        "--junit",
+        metavar="PATH",
+        default=None,
+        help="Write a JUnit XML report to PATH; implies --keep-going",
+    )
+    verify_parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print evaluation memo statistics (theorems checked in this process only, not -j workers)",
+    )
+    verify_parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time every theorem by phase and print the slowest; implies --jobs 1 and --no-cache",
+    )
+    verify_parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=DEFAULT_TOP,
+        metavar="N",
+        help=f"Slowest theorems listed by --profile (default: {DEFAULT_TOP})",
+    )
+    verify_parser.add_argument(
+        "--profile-trace",
+        metavar="PATH",
+        default=None,
+        help="Write a Chrome/Perfetto trace of the profiled run to PATH; implies --profile",
+    )
+    verify_parser.add_argument(
+        "--profile-metrics",
+        metavar="PATH",
+        default=None,
+        help="Write profile totals in OpenMetrics text format to PATH; implies --profile",
+    )
+    verify_parser.add_argument(
+        "--no-profile-memory",
+        action="store_true",
+        help="Do not trace allocation peaks while profiling (tracemalloc slows checking down)",
+    )
+    _add_limit_arguments(verify_parser)
     verify_parser.set_defaults(func=cmd_verify)
 
+    search_parser = subparsers.add_parser("search", help="Find catalog lemmas matching a signature")
+    search_parser.add_argument("signature", help="Signature to look up, e.g. \"(a : Nat) -> plus a Z = a\"")
+    search_parser.add_argument(
+        "--catalog",
+        action="append",
+        default=[],
+        help="Additional lemma catalog file (repeatable); indexed on first use",
+    )
+    search_parser.set_defaults(func=cmd_search)
+
+    fuzz_parser = subparsers.add_parser("fuzz", help="Search for counterexamples to theorems by sampling")
+    fuzz_parser.add_argument("proof_files", nargs="+", help="Proof scripts or directories to search")
+    fuzz_parser.add_argument(
+        "--samples",
+        type=int,
+        default=None,
+        help="Random assignments to try per theorem (default: 100000)",
+    )
+    fuzz_parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    fuzz_parser.set_defaults(func=cmd_fuzz)
+
+    serve_parser = subparsers.add_parser("serve", help="Answer JSON-lines verify requests from a warm process")
+    serve_parser.add_argument(
+        "--socket",
+        metavar="PATH",
+        default=None,
+        help="Listen on a Unix socket at PATH instead of reading stdin and writing stdout",
+    )
+    serve_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Requests handled concurrently (default: 4)",
+    )
+    serve_parser.add_argument(
+        "--catalog",
+        action="append",
+        default=[],
+        help="Additional lemma catalog file (repeatable); indexed on first use",
+    )
+    serve_parser.add_argument(
+        "--module-path",
+        action="append",
+        default=[],
+        metavar="DIR",
+        help="Directory to look up imported modules in (repeatable), after the importing script's own",
+    )
+    serve_parser.add_argument("--no-cache", action="store_true", help="Do not read or write the verification cache")
+    serve_parser.add_argument("--cache-dir", default=None, help="Verification cache directory")
+    serve_parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_MAX_ENTRIES,
+        help="Maximum number of cached theorems before the oldest are evicted",
+    )
+    _add_limit_arguments(serve_parser)
+    serve_parser.set_defaults(func=cmd_serve)
+
+    bench_parser = subparsers.add_parser("bench", help="Time the checker's phases on a generated corpus")
+    bench_parser.add_argument("--theorems", type=int, default=None, help="Theorems to generate")
+    bench_parser.add_argument("--depth", type=int, default=None, help="Longest S chain in a term")
+    bench_parser.add_argument("--binders", type=int, default=None, help="Parameters bound by each theorem")
+    bench_parser.add_argument("--list-size", type=int, default=None, help="Longest list literal")
+    bench_parser.add_argument(
+        "--lemma-ratio",
+        type=float,
+        default=None,
+        help="Share of theorems proved by a catalog lemma instead of Refl",
+    )
+    bench_parser.add_argument("--seed", type=int, default=None, help="Random seed for the corpus")
+    bench_parser.add_argument(
+        "--repeat",
+        type=int,
+        default=None,
+        help="Runs per phase; the fastest is reported (default: 3)",
+    )
+    bench_parser.add_argument("--baseline", metavar="PATH", default=None, help="Compare against a saved baseline")
+    bench_parser.add_argument("--save-baseline", metavar="PATH", default=None, help="Write this run's results as a baseline")
+    bench_parser.add_argument(
+        "--max-slowdown",
+        type=float,
+        default=None,
+        help="Allowed fractional time increase per phase (default: 0.25)",
+    )
+    bench_parser.add_argument(
+        "--max-memory-growth",
+        type=float,
+        default=None,
+        help="Allowed fractional peak-memory increase per phase (default: 0.25)",
+    )
+    bench_parser.add_argument("--write-corpus", metavar="PATH", default=None, help="Also write the generated .rp script")
+    bench_parser.set_defaults(func=cmd_bench)
+
     render_parser = subparsers.add_parser("render", help="Copy a proof script to a new location")
     render_parser.add_argument("proof_file", help="Path to a .rp proof script")
     render_parser.add_argument("output", help="Output proof script path")
@@ -8,6 +8,45 @@ class ProofLanguageError(Exception):
 class ParseError(ProofLanguageError):
     """Raised when a proof script cannot be parsed."""
 
+    def __init__(self, message: str, line_number: "int | None" = None):
+        super().__init__(message)
+        self.line_number = line_number
+
+    def __reduce__(self):
+        return type(self), (str(self), self.line_number)
+
+
+class ProofCheckError(ProofLanguageError):
+    """Raised when proof checking fails."""
+
+    def __init__(self, message: str, column: "int | None" = None):
+        if column is not None:
+            message = f"{message} at column {column}"
+        super().__init__(message)
+        self.column = column
+
+
+class ResourceLimitError(ProofCheckError):
+    """Raised when checking a theorem exceeds one of its `limits.Limits`.
+
+    `limit` names the exceeded limit: `steps`, `int_bits`, `list_length` or `timeout`.
+    """
+
+    def __init__(self, message: str, limit: str):
+        super().__init__(message)
+        self.limit = limit
+
+    def __reduce__(self):
+        return type(self), (str(self), self.limit)
+
+
+class CheckCancelled(Exception):
+    """Raised inside a check whose caller cancelled it (see `limits.cancel_on`).
+
+    Not a `ProofLanguageError`: a cancelled theorem has no verdict, so the error is not
+    reported as a failure but propagates to the caller.
+    """
+
 
 class IdrisInvocationError(ProofLanguageError):
     """Raised when Idris fails to typecheck generated proofs."""
@@ -0,0 +1,548 @@
+"""Randomized counterexample search for universally quantified goals.
+
+A goal such as `(x : Nat) -> (y : Nat) -> plus x y = plus y x` is checked on batches of
+sampled assignments to its parameters. Evaluation is column-wise: every subterm is
+evaluated once per batch into a column of values, and each builtin is applied to whole
+columns with `map`, so the cost per sample is a few C-level calls instead of one
+`evaluate` per sample. Parameters typed `Nat`, `Bool`, `List` of those, and `Nat -> Nat`
+or `Nat -> Bool` functions are sampled; equality hypotheses (`(p : leq x y = True) -> ...`)
+filter the samples. Sampling is seeded, so results are reproducible.
+
+Sampling is evidence, not proof, so `proof check` never verifies a theorem: it fails with
+the counterexample it finds, or with the number of samples that found none.
+"""
+
+from __future__ import annotations
+
+import operator
+import random
+from dataclasses import dataclass
+from itertools import product, repeat
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from researchproof import values
+from researchproof.proof_checker import (
+    BUILTINS,
+    CALLABLES,
+    LAZY_BUILTINS,
+    App,
+    Arrow,
+    Equality,
+    Lambda,
+    ProofCheckError,
+    Signature,
+    Term,
+    TokenStream,
+    TypeApp,
+    TypeConst,
+    TypeExpr,
+    TypeVar,
+    Value,
+    Var,
+    apply_callable,
+    evaluate,
+    flatten_arrow,
+    parse_term,
+)
+from researchproof.values import ListValue, values_equal
+
+DEFAULT_SAMPLES = 100_000
+CHECK_SAMPLES = 20_000
+BATCH_SIZE = 8192
+MAX_NAT = 1000
+# Goals that use `pow` sample tiny naturals so that nested powers stay computable.
+MAX_NAT_WITH_POW = 3
+POW_EXPONENT_LIMIT = 4096
+MAX_LIST_LENGTH = 8
+SHRINK_ROUNDS = 100
+
+NAT_FUNCTIONS = ("S", "double", "pred", "\\x => x", "\\x => Z", "\\x => plus x 3", "\\x => mult x x")
+PREDICATES = ("even", "odd", "isZero", "\\x => True", "\\x => False", "\\x => leq x 3")
+
+
+class UnsupportedGoal(ProofCheckError):
+    """Raised when a goal cannot be evaluated on sampled assignments."""
+
+
+@dataclass(frozen=True)
+class Counterexample:
+    bindings: Tuple[Tuple[str, str], ...]
+    left: str
+    right: str
+
+    def describe(self) -> str:
+        assignment = ", ".join(f"{name} = {value}" for name, value in self.bindings)
+        return f"{assignment or 'no parameters'} (left side is {self.left}, right side is {self.right})"
+
+
+@dataclass(frozen=True)
+class FuzzResult:
+    samples: int
+    counterexample: Optional[Counterexample] = None
+
+
+# -----------------------------
+# Samplers
+# -----------------------------
+
+
+class _Sampler:
+    """Draws columns of values of one parameter type, and proposes smaller values."""
+
+    def column(self, rng: random.Random, size: int) -> List[Value]:
+        raise NotImplementedError
+
+    def small(self) -> List[Value]:
+        raise NotImplementedError
+
+    def shrink(self, value: Value) -> List[Value]:
+        return []
+
+    def size(self, value: Value) -> int:
+        return 0
+
+    def render(self, value: Value) -> str:
+        return render_value(value)
+
+
+class _NatSampler(_Sampler):
+    def __init__(self, bound: int):
+        # Small values are over-represented: they are where most counterexamples live.
+        self._population = list(range(bound + 1)) + list(range(min(bound, 7) + 1)) * max(1, bound // 16)
+
+    def column(self, rng: random.Random, size: int) -> List[Value]:
+        return rng.choices(self._population, k=size)
+
+    def small(self) -> List[Value]:
+        return [0, 1, 2, 3][: len(set(self._population))]
+
+    def shrink(self, value: Value) -> List[Value]:
+        return sorted({0, value // 2, value - 1} - {value}) if value > 0 else []
+
+    def size(self, value: Value) -> int:
+        return value
+
+
+class _BoolSampler(_Sampler):
+    def column(self, rng: random.Random, size: int) -> List[Value]:
+        return rng.choices((False, True), k=size)
+
+    def small(self) -> List[Value]:
+        return [False, True]
+
+    def shrink(self, value: Value) -> List[Value]:
+        return [False] if value else []
+
+    def size(self, value: Value) -> int:
+        return int(value)
+
+
+class _ListSampler(_Sampler):
+    def __init__(self, element: _Sampler):
+        self._element = element
+
+    def column(self, rng: random.Random, size: int) -> List[Value]:
+        lengths = rng.choices(range(MAX_LIST_LENGTH + 1), k=size)
+        items = self._element.column(rng, sum(lengths))
+        column: List[Value] = []
+        start = 0
+        for length in lengths:
+            column.append(values.make_leaf(items[start : start + length]))
+            start += length
+        return column
+
+    def small(self) -> List[Value]:
+        element = self._element.small()[:2]
+        shapes = [[]] + [[item] for item in element] + [list(pair) for pair in product(element, repeat=2)]
+        return [values.make_leaf(shape) for shape in shapes]
+
+    def shrink(self, value: Value) -> List[Value]:
+        items = list(value)
+        candidates = [values.make_leaf(items[:index] + items[index + 1 :]) for index in range(len(items))]
+        for index, item in enumerate(items):
+            for smaller in self._element.shrink(item)[:1]:
+                candidates.append(values.make_leaf(items[:index] + [smaller] + items[index + 1 :]))
+        return candidates
+
+    def size(self, value: Value) -> int:
+        return sum(1 + self._element.size(item) for item in value)
+
+    def render(self, value: Value) -> str:
+        return "[" + ", ".join(self._element.render(item) for item in value) + "]"
+
+
+class _FunctionSampler(_Sampler):
+    def __init__(self, sources: Sequence[str]):
+        self._sources = list(sources)
+        self._pool = [evaluate(parse_term(TokenStream.from_text(source)), {}) for source in sources]
+        self._index = {id(value): index for index, value in enumerate(self._pool)}
+
+    def column(self, rng: random.Random, size: int) -> List[Value]:
+        return rng.choices(self._pool, k=size)
+
+    def small(self) -> List[Value]:
+        return list(self._pool)
+
+    def shrink(self, value: Value) -> List[Value]:
+        return self._pool[: self._index[id(value)]]
+
+    def size(self, value: Value) -> int:
+        return self._index[id(value)]
+
+    def render(self, value: Value) -> str:
+        source = self._sources[self._index[id(value)]]
+        return f"({source})" if " " in source else source
+
+
+def _is_nat(type_expr: TypeExpr) -> bool:
+    return type_expr is TypeConst("Nat") or isinstance(type_expr, TypeVar)
+
+
+def _sampler_for(type_expr: TypeExpr, nat_bound: int) -> _Sampler:
+    if _is_nat(type_expr):
+        return _NatSampler(nat_bound)
+    if type_expr is TypeConst("Bool"):
+        return _BoolSampler()
+    if isinstance(type_expr, TypeApp) and type_expr.name == "List" and len(type_expr.args) == 1:
+        return _ListSampler(_sampler_for(type_expr.args[0], nat_bound))
+    if isinstance(type_expr, Arrow) and _is_nat(type_expr.left):
+        if _is_nat(type_expr.right):
+            return _FunctionSampler(NAT_FUNCTIONS)
+        if type_expr.right is TypeConst("Bool"):
+            return _FunctionSampler(PREDICATES)
+    raise UnsupportedGoal("cannot sample values of this type")
+
+
+def render_value(value: Value) -> str:
+    if isinstance(value, ListValue):
+        return "[" + ", ".join(render_value(item) for item in value) + "]"
+    if isinstance(value, values.Builtin):
+        return value.name
+    return str(value)
+
+
+# -----------------------------
+# Goal analysis
+# -----------------------------
+
+
+@dataclass(frozen=True)
+class _Goal:
+    names: Tuple[str, ...]
+    samplers: Tuple[_Sampler, ...]
+    hypotheses: Tuple[Equality, ...]
+    conclusion: Equality
+
+
+def _mentions(term: Term, name: str) -> bool:
+    stack: List[Term] = [term]
+    while stack:
+        node = stack.pop()
+        if type(node) is App:
+            if node.name == name:
+                return True
+            stack.extend(node.args)
+        elif type(node) is Lambda:
+            stack.append(node.body)
+    return False
+
+
+def _check_names(term: Term, params: Sequence[str]) -> None:
+    """Reject free variables, and parameters used inside lambdas (which do not capture)."""
+    stack: List[Tuple[Term, Optional[str]]] = [(term, None)]
+    while stack:
+        node, lambda_param = stack.pop()
+        kind = type(node)
+        if kind is Var or kind is App:
+            name = node.name
+            if name != lambda_param and name not in CALLABLES and (kind is Var or name not in BUILTINS):
+                if name not in params:
+                    raise UnsupportedGoal(f"free variable '{name}' cannot be sampled")
+                if lambda_param is not None:
+                    raise UnsupportedGoal(f"parameter '{name}' is used inside a lambda")
+            if kind is App:
+                stack.extend((arg, lambda_param) for arg in node.args)
+        elif kind is Lambda:
+            stack.append((node.body, node.param))
+
+
+def analyse_goal(signature: Signature) -> _Goal:
+    """Split a signature into sampled parameters, equality hypotheses and a conclusion."""
+    premises, conclusion = flatten_arrow(signature.result)
+    if not isinstance(conclusion, Equality):
+        raise UnsupportedGoal("only equalities can be sampled")
+    equations = [conclusion]
+    uses_pow = False
+    typed: List[Tuple[str, TypeExpr]] = []
+    hypotheses: List[Equality] = []
+    for param in signature.params:
+        if isinstance(param.type_expr, Equality):
+            hypotheses.append(param.type_expr)
+        elif param.type_expr is not TypeConst("Type"):
+            typed.append((param.name, param.type_expr))
+    for premise in premises:
+        if not isinstance(premise, Equality):
+            raise UnsupportedGoal("only equality premises can be sampled")
+        hypotheses.append(premise)
+    equations.extend(hypotheses)
+    names = tuple(name for name, _ in typed)
+    for equation in equations:
+        for side in (equation.left, equation.right):
+            _check_names(side, names)
+            uses_pow = uses_pow or _mentions(side, "pow")
+    bound = MAX_NAT_WITH_POW if uses_pow else MAX_NAT
+    samplers = []
+    for name, type_expr in typed:
+        try:
+            samplers.append(_sampler_for(type_expr, bound))
+        except UnsupportedGoal:
+            raise UnsupportedGoal(f"cannot sample parameter '{name}'") from None
+    return _Goal(names, tuple(samplers), tuple(hypotheses), conclusion)
+
+
+# -----------------------------
+# Column-wise evaluation
+# -----------------------------
+
+
+def _bounded_pow(base: int, exponent: int) -> int:
+    if exponent > POW_EXPONENT_LIMIT and base > 1:
+        raise UnsupportedGoal("exponent too large to sample")
+    return base**exponent
+
+
+# Plain operator functions avoid a Python frame per element for the hottest builtins.
+_COLUMN_FUNCTIONS: Dict[str, Callable[..., Value]] = {
+    "plus": operator.add,
+    "mult": operator.mul,
+    "pow": _bounded_pow,
+    "eqNat": operator.eq,
+    "leq": operator.le,
+    "lt": operator.lt,
+    "min": min,
+    "max": max,
+}
+
+
+def _apply_column(name: str, columns: List[List[Value]]) -> List[Value]:
+    entry = BUILTINS.get(name)
+    if entry is None:
+        raise ProofCheckError(f"Unknown function '{name}' in evaluation")
+    arity, function = entry
+    if len(columns) != arity:
+        raise ProofCheckError(f"'{name}' expects {arity} argument(s), got {len(columns)}")
+    return list(map(_COLUMN_FUNCTIONS.get(name, function), *columns))
+
+
+def _gather(columns: Dict[str, List[Value]], indexes: List[int]) -> Dict[str, List[Value]]:
+    return {name: [column[index] for index in indexes] for name, column in columns.items()}
+
+
+def _scatter(size: int, parts: Sequence[Tuple[List[int], List[Value]]]) -> List[Value]:
+    result: List[Value] = [None] * size  # type: ignore[list-item]
+    for indexes, column in parts:
+        for index, value in zip(indexes, column):
+            result[index] = value
+    return result
+
+
+def evaluate_columns(term: Term, columns: Dict[str, List[Value]], size: int) -> List[Value]:
+    """Evaluate `term` for `size` samples at once; `columns` holds each parameter's values.
+
+    Lazy builtins evaluate each branch only on the samples that take it.
+    """
+    if size == 0:
+        return []
+    results: List[List[Value]] = []
+    stack: List[object] = [term]
+    while stack:
+        item = stack.pop()
+        if type(item) is tuple:
+            name, arity, head_is_param = item
+            start = len(results) - arity
+            args = results[start:]
+            del results[start:]
+            if head_is_param:
+                column = columns[name]
+                for arg in args:
+                    column = list(map(apply_callable, column, arg))
+                results.append(column)
+            elif name == "S":
+                results.append(list(map(operator.add, args[0], repeat(1, size))))
+            else:
+                results.append(_apply_column(name, args))
+            continue
+        kind = type(item)
+        if kind is App and item.name in LAZY_BUILTINS and len(item.args) == BUILTINS[item.name][0]:
+            results.append(_evaluate_lazy(item, columns, size))
+        elif kind is App:
+            stack.append((item.name, len(item.args), item.name in columns))
+            stack.extend(reversed(item.args))
+        elif kind is Var and item.name in columns:
+            results.append(columns[item.name])
+        else:
+            results.append([evaluate(item, {})] * size)
+    return results[0]
+
+
+def _evaluate_lazy(app: App, columns: Dict[str, List[Value]], size: int) -> List[Value]:
+    first = evaluate_columns(app.args[0], columns, size)
+    truth = [values.truthy(value) for value in first]
+    if app.name == "ifThenElse":
+        taken = [index for index in range(size) if truth[index]]
+        skipped = [index for index in range(size) if not truth[index]]
+        parts = []
+        for indexes, branch in ((taken, app.args[1]), (skipped, app.args[2])):
+            if indexes:
+                parts.append((indexes, evaluate_columns(branch, _gather(columns, indexes), len(indexes))))
+        return _scatter(size, parts)
+    # `and` needs its second argument where the first is true, `or` where it is false.
+    stop_on = app.name == "or"
+    pending = [index for index in range(size) if truth[index] != stop_on]
+    second = evaluate_columns(app.args[1], _gather(columns, pending), len(pending))
+    decided = [index for index in range(size) if truth[index] == stop_on]
+    return _scatter(size, [(decided, [stop_on] * len(decided)), (pending, [values.truthy(v) for v in second])])
+
+
+def _equal_column(left: List[Value], right: List[Value]) -> List[bool]:
+    return [
+        a == b if type(a) is int and type(b) is int else values_equal(a, b) for a, b in zip(left, right)
+    ]
+
+
+# -----------------------------
+# Search
+# -----------------------------
+
+
+def _evaluate_batch(
+    goal: _Goal, columns: Dict[str, List[Value]], size: int
+) -> Tuple[List[int], List[Value], List[Value], List[bool]]:
+    """Return the samples satisfying the hypotheses with both sides and their equality."""
+    indexes = list(range(size))
+    try:
+        for hypothesis in goal.hypotheses:
+            holds = _equal_column(
+                evaluate_columns(hypothesis.left, columns, len(indexes)),
+                evaluate_columns(hypothesis.right, columns, len(indexes)),
+            )
+            keep = [position for position, ok in enumerate(holds) if ok]
+            indexes = [indexes[position] for position in keep]
+            columns = _gather(columns, keep)
+        left = evaluate_columns(goal.conclusion.left, columns, len(indexes))
+        right = evaluate_columns(goal.conclusion.right, columns, len(indexes))
+    except UnsupportedGoal:
+        raise
+    except (ProofCheckError, TypeError, ValueError, OverflowError, RecursionError) as exc:
+        raise UnsupportedGoal(f"cannot evaluate the goal on samples: {exc}") from exc
+    return indexes, left, right, _equal_column(left, right)
+
+
+def _small_assignments(goal: _Goal) -> Iterator[Tuple[Value, ...]]:
+    yield from product(*(sampler.small() for sampler in goal.samplers))
+
+
+def _columns_of(goal: _Goal, rows: Sequence[Tuple[Value, ...]]) -> Dict[str, List[Value]]:
+    return {name: [row[position] for row in rows] for position, name in enumerate(goal.names)}
+
+
+def _size(goal: _Goal, row: Tuple[Value, ...]) -> Tuple[int, ...]:
+    sizes = tuple(sampler.size(value) for sampler, value in zip(goal.samplers, row))
+    return (sum(sizes),) + sizes
+
+
+def _first_failure(goal: _Goal, rows: Sequence[Tuple[Value, ...]]) -> Tuple[int, Optional[Tuple[Value, ...]]]:
+    """Evaluate `rows`; return how many satisfied the hypotheses and the smallest failure."""
+    indexes, _, _, equal = _evaluate_batch(goal, _columns_of(goal, rows), len(rows))
+    failures = [rows[index] for index, ok in zip(indexes, equal) if not ok]
+    if not failures:
+        return len(indexes), None
+    return len(indexes), min(failures, key=lambda row: _size(goal, row))
+
+
+def _shrink(goal: _Goal, row: Tuple[Value, ...]) -> Tuple[Value, ...]:
+    for _ in range(SHRINK_ROUNDS):
+        candidates = []
+        for position, sampler in enumerate(goal.samplers):
+            for smaller in sampler.shrink(row[position]):
+                candidates.append(row[:position] + (smaller,) + row[position + 1 :])
+        if not candidates:
+            break
+        _, failure = _first_failure(goal, candidates)
+        if failure is None or _size(goal, failure) >= _size(goal, row):
+            break
+        row = failure
+    return row
+
+
+def _describe(goal: _Goal, row: Tuple[Value, ...]) -> Counterexample:
+    columns = _columns_of(goal, [row])
+    _, left, right, _ = _evaluate_batch(goal, columns, 1)
+    bindings = tuple(
+        (name, sampler.render(value)) for name, sampler, value in zip(goal.names, goal.samplers, row)
+    )
+    return Counterexample(bindings, render_value(left[0]), render_value(right[0]))
+
+
+def find_counterexample(
+    signature: Signature, samples: int = DEFAULT_SAMPLES, seed: int = 0, batch_size: int = BATCH_SIZE
+) -> FuzzResult:
+    """Search for an assignment of the parameters that makes the goal's sides differ.
+
+    Small assignments are tried exhaustively first, then `samples` random ones in batches.
+    The smallest failing assignment found is shrunk further before being reported. Raises
+    `UnsupportedGoal` when the goal cannot be sampled.
+    """
+    goal = analyse_goal(signature)
+    rng = random.Random(seed)
+    checked = 0
+    small = list(_small_assignments(goal))
+    while small:
+        batch, small = small[:batch_size], small[batch_size:]
+        count, failure = _first_failure(goal, batch)
+        checked += count
+        if failure is not None:
+            return FuzzResult(checked, _describe(goal, _shrink(goal, failure)))
+    if not goal.names:
+        return FuzzResult(checked)
+
+    drawn = 0
+    while drawn < samples:
+        size = min(batch_size, samples - drawn)
+        columns = {name: sampler.column(rng, size) for name, sampler in zip(goal.names, goal.samplers)}
+        indexes, _, _, equal = _evaluate_batch(goal, columns, size)
+        drawn += size
+        checked += len(indexes)
+        failures = [
+            tuple(columns[name][index] for name in goal.names) for index, ok in zip(indexes, equal) if not ok
+        ]
+        if failures:
+            smallest = min(failures, key=lambda row: _size(goal, row))
+            return FuzzResult(checked, _describe(goal, _shrink(goal, smallest)))
+    return FuzzResult(checked)
+
+
+def check_by_sampling(signature: Signature, samples: int = CHECK_SAMPLES) -> None:
+    """Back `proof check`: always raise `ProofCheckError`, with a counterexample if found."""
+    try:
+        result = find_counterexample(signature, samples)
+    except UnsupportedGoal as exc:
+        raise UnsupportedGoal(f"check cannot sample this goal: {exc}") from None
+    if result.counterexample is not None:
+        raise ProofCheckError(f"check failed: counterexample {result.counterexample.describe()}")
+    if result.samples == 0:
+        raise ProofCheckError("check failed: no sampled assignment satisfies the hypotheses")
+    raise ProofCheckError(f"check failed: no counterexample in {result.samples} samples (not a proof)")
+
+
+def counterexample_hint(signature: Signature, samples: int) -> str:
+    """Return `"; counterexample: ..."` if a search of `samples` refutes the goal, else `""`."""
+    if not signature.params and not isinstance(signature.result, Arrow):
+        return ""
+    try:
+        result = find_counterexample(signature, samples)
+    except UnsupportedGoal:
+        return ""
+    if result.counterexample is None:
+        return ""
+    return f"; counterexample: {result.counterexample.describe()}"
@@ -0,0 +1,231 @@
+"""Per-theorem resource limits.
+
+Proof scripts are untrusted input: a goal like `pow 2 (pow 2 40)` or
+`length (filter p (replicate 1000000000000 x))` would otherwise stall or exhaust the
+memory of a whole batch run. `check_theorem` gives every theorem a fresh `Budget` built
+from the process-wide `Limits` (see `set_limits`), and a theorem that goes over one fails
+on its own with `ResourceLimitError`:
+
+- `steps` caps evaluation work: each closed subterm evaluated, each function applied to a
+  value (for example once per element by `map` and `filter`), each open-term unfolding
+  step, each `ring` monomial product and each `decide` BDD node. A memoized subterm is
+  charged what it cost to evaluate, so the count does not depend on which theorems ran
+  before; a lazily mapped list is charged to the theorem that first inspects it.
+- `int_bits` caps the size of naturals produced by `mult` and `pow`, checked before the
+  product is computed.
+- `list_length` caps the length of lists built by `append`, `concat` and `replicate`.
+  Lists are lazy, so a long list only costs time when it is traversed.
+- `timeout` caps wall-clock seconds per theorem. It is checked as steps are charged and,
+  in a process's main thread, also enforced with `SIGALRM`; the caller's own SIGALRM
+  handler and `ITIMER_REAL` timer are put back after each theorem (see `begin_theorem`).
+  A worker process stuck in one long native operation is killed by `pool.WorkerPool`.
+
+`Limits` also holds `counterexample_samples`, the sampled assignments a failed `Refl`,
+lemma or `auto` proof may spend looking for a counterexample to report (see
+`fuzz.counterexample_hint`). It is 0, no search, unless asked for, because every failure
+would pay for it.
+
+`None` disables a limit. Budgets are per thread, so concurrent checks do not share one.
+A thread can also make its checks cancellable from another thread with `cancel_on`.
+"""
+
+from __future__ import annotations
+
+import math
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, Optional, Tuple, Union
+
+from researchproof.errors import CheckCancelled, ResourceLimitError
+
+DEFAULT_STEPS = 10_000_000
+DEFAULT_INT_BITS = 1_000_000
+DEFAULT_LIST_LENGTH = 10**12
+# With a timeout or a cancellation event, the clock and the event are read once per this
+# many steps.
+CLOCK_INTERVAL = 1024
+# Windows has no interval timers; timeouts there are only checked as steps are charged.
+_HAS_ALARM = hasattr(signal, "setitimer")
+
+
+@dataclass(frozen=True)
+class Limits:
+    steps: Optional[int] = DEFAULT_STEPS
+    int_bits: Optional[int] = DEFAULT_INT_BITS
+    list_length: Optional[int] = DEFAULT_LIST_LENGTH
+    timeout: Optional[float] = None
+    counterexample_samples: int = 0
+
+
+UNLIMITED = Limits(steps=None, int_bits=None, list_length=None, timeout=None)
+
+Bound = Union[int, float]
+
+
+def _bound(limit: Optional[Union[int, float]]) -> Bound:
+    return math.inf if limit is None else limit
+
+
+class Budget:
+    """What the theorem being checked has spent against its `Limits`."""
+
+    __slots__ = (
+        "limits",
+        "steps",
+        "max_steps",
+        "max_int_bits",
+        "max_list_length",
+        "deadline",
+        "cancel",
+        "_checkpoint",
+    )
+
+    def __init__(self, limits: Limits, cancel: Optional[threading.Event] = None):
+        self.limits = limits
+        self.cancel = cancel
+        self.steps = 0
+        self.max_steps: Bound = _bound(limits.steps)
+        self.max_int_bits: Bound = _bound(limits.int_bits)
+        self.max_list_length: Bound = _bound(limits.list_length)
+        self.deadline: Optional[float] = None
+        if limits.timeout is not None:
+            self.deadline = time.monotonic() + limits.timeout
+        self._checkpoint: Bound = self._next_checkpoint()
+
+    def _next_checkpoint(self) -> Bound:
+        if self.deadline is None and self.cancel is None:
+            return self.max_steps
+        return min(self.max_steps, self.steps + CLOCK_INTERVAL)
+
+    def charge(self, steps: int = 1) -> None:
+        self.steps += steps
+        if self.steps > self._checkpoint:
+            if self.steps > self.max_steps:
+                raise ResourceLimitError(f"Exceeded the limit of {self.limits.steps} evaluation steps", "steps")
+            self.check_clock()
+            if self.cancel is not None and self.cancel.is_set():
+                raise CheckCancelled("The check was cancelled")
+            self._checkpoint = self._next_checkpoint()
+
+    def check_clock(self) -> None:
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise timeout_error(self.limits.timeout)
+
+    def check_int_bits(self, bits: int) -> None:
+        if bits > self.max_int_bits:
+            raise ResourceLimitError(
+                f"A natural of about {bits} bits exceeds the limit of {self.limits.int_bits} bits", "int_bits"
+            )
+
+    def check_list_length(self, length: int) -> None:
+        if length > self.max_list_length:
+            raise ResourceLimitError(
+                f"A list of length {length} exceeds the limit of {self.limits.list_length}", "list_length"
+            )
+
+
+def timeout_error(seconds: Optional[float]) -> ResourceLimitError:
+    return ResourceLimitError(f"Exceeded the time limit of {seconds:g} s", "timeout")
+
+
+class _State(threading.local):
+    # Outside `check_theorem` nothing is limited; the shared default only counts.
+    budget = Budget(UNLIMITED)
+    cancel: Optional[threading.Event] = None
+
+
+_STATE = _State()
+_LIMITS = Limits()
+
+
+def set_limits(limits: Limits) -> Limits:
+    """Use `limits` for every theorem checked from now on and return the previous ones."""
+    global _LIMITS
+    previous, _LIMITS = _LIMITS, limits
+    return previous
+
+
+def active_limits() -> Limits:
+    return _LIMITS
+
+
+def current_budget() -> Budget:
+    return _STATE.budget
+
+
+def charge(steps: int = 1) -> None:
+    _STATE.budget.charge(steps)
+
+
+def check_int_bits(bits: int) -> None:
+    _STATE.budget.check_int_bits(bits)
+
+
+def check_list_length(length: int) -> None:
+    _STATE.budget.check_list_length(length)
+
+
+@contextmanager
+def cancel_on(event: threading.Event) -> Iterator[None]:
+    """Make theorems checked by this thread inside the block stop once `event` is set.
+
+    The check then raises `CheckCancelled` at its next clock reading, i.e. within
+    `CLOCK_INTERVAL` steps.
+    """
+    previous, _STATE.cancel = _STATE.cancel, event
+    try:
+        yield
+    finally:
+        _STATE.cancel = previous
+
+
+def _on_alarm(signum: int, frame: object) -> None:
+    budget = _STATE.budget
+    if budget.deadline is not None:
+        raise timeout_error(budget.limits.timeout)
+
+
+def _uses_alarm(budget: Budget) -> bool:
+    return budget.deadline is not None and _HAS_ALARM and threading.current_thread() is threading.main_thread()
+
+
+# What `begin_theorem` displaced: the thread's budget and, if it armed its own alarm, the
+# previous SIGALRM handler, the previous interval timer's (delay, interval), and when the
+# timer was taken over.
+Saved = Tuple[Budget, Optional[Tuple[object, float, float, float]]]
+
+
+def begin_theorem() -> Saved:
+    """Give the current thread a fresh budget; returns what to restore with `end_theorem`.
+
+    With a timeout in the main thread, the theorem's alarm temporarily replaces the
+    process's SIGALRM handler and `ITIMER_REAL` timer. Both are restored afterwards, the
+    timer less the time the theorem took; a timer that would have expired meanwhile fires
+    as soon as the theorem ends.
+    """
+    previous = _STATE.budget
+    budget = _STATE.budget = Budget(_LIMITS, _STATE.cancel)
+    alarm = None
+    if _uses_alarm(budget):
+        handler = signal.signal(signal.SIGALRM, _on_alarm)
+        delay, interval = signal.setitimer(signal.ITIMER_REAL, budget.limits.timeout)
+        alarm = (handler, delay, interval, time.monotonic())
+    return previous, alarm
+
+
+def end_theorem(saved: Saved) -> None:
+    previous, alarm = saved
+    # Restored first, so that an alarm arriving now finds no deadline and is ignored.
+    _STATE.budget = previous
+    if alarm is None:
+        return
+    handler, delay, interval, began = alarm
+    signal.setitimer(signal.ITIMER_REAL, 0)
+    if handler is not None:  # None: installed outside Python, so it cannot be put back.
+        signal.signal(signal.SIGALRM, handler)
+    if delay > 0:
+        # `setitimer` treats 0 as "disarm", so an overdue timer gets the shortest delay.
+        signal.setitimer(signal.ITIMER_REAL, max(delay - (time.monotonic() - began), 1e-6), interval)
@@ -0,0 +1,193 @@
+"""Free-monoid normalization for `proof lists`.
+
+A list term built from `Nil`, `Cons`, `append`, `snoc`, `reverse` and `map` is flattened
+into its sequence of pieces: single elements and whole list variables, each carrying
+whether it is reversed and which functions are mapped over it. `append` is associative
+with `Nil` as its unit, `reverse` reverses the sequence and flips every piece, and `map`
+distributes over every piece, so two list terms are equal whenever their sequences are.
+`length` of a list becomes a linear sum: one per element plus `length xs` per variable
+(and `n` per `replicate n x`).
+
+Each side is flattened top-down in one pass with an explicit stack, so left- and
+right-nested appends of any depth cost the same. Other list-valued terms (`filter p xs`,
+`replicate n x`, ...) are kept as opaque pieces.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+from researchproof.proof_checker import (
+    App,
+    Const,
+    Equality,
+    Lambda,
+    NatLit,
+    ProofCheckError,
+    Signature,
+    Term,
+    TypeApp,
+    Var,
+    canonical_term,
+    flatten_arrow,
+)
+
+LIST_FORMS = {"Cons", "append", "snoc", "reverse", "map"}
+
+Piece = Tuple[Hashable, ...]
+Functions = Tuple[Hashable, ...]
+
+
+def _chain(term: Term) -> Tuple[Term, Functions]:
+    """Split `f (g x)` into `x` and the functions applied to it, innermost first."""
+    heads: List[str] = []
+    while type(term) is App and len(term.args) == 1:
+        heads.append(term.name)
+        term = term.args[0]
+    return term, tuple(reversed(heads))
+
+
+def _functions(func: Term) -> Functions:
+    """The functions a `map` argument applies, innermost first; `\\x => x` applies none."""
+    if type(func) is Var:
+        return (func.name,)
+    if type(func) is Lambda:
+        base, heads = _chain(func.body)
+        # A head named like the binder applies the argument itself, not a free function.
+        if type(base) is Var and base.name == func.param and func.param not in heads:
+            return heads
+    return (canonical_term(func),)
+
+
+def _pieces(term: Term, list_vars: Set[str]) -> List[Piece]:
+    """Flatten a list term into its sequence of pieces."""
+    pieces: List[Piece] = []
+    # Entries are (term, reversed, functions) to flatten, or ("element", term, functions).
+    stack: List[tuple] = [(term, False, ())]
+    while stack:
+        entry = stack.pop()
+        if type(entry[0]) is str:
+            base, heads = _chain(canonical_term(entry[1]))
+            pieces.append(("element", base, heads + entry[2]))
+            continue
+        item, flipped, functions = entry
+        kind = type(item)
+        if kind is Const and item.name == "Nil":
+            continue
+        if kind is App and item.name in LIST_FORMS and len(item.args) == (1 if item.name == "reverse" else 2):
+            name, args = item.name, item.args
+            if name == "reverse":
+                stack.append((args[0], not flipped, functions))
+            elif name == "map":
+                stack.append((args[1], flipped, _functions(args[0]) + functions))
+            else:
+                # Cons x xs, append xs ys and snoc xs x as their two parts, in order.
+                first = ("element", args[0], functions) if name == "Cons" else (args[0], flipped, functions)
+                second = ("element", args[1], functions) if name == "snoc" else (args[1], flipped, functions)
+                stack.extend((first, second) if flipped else (second, first))
+            continue
+        key = item if kind is Var and item.name in list_vars else canonical_term(item)
+        pieces.append(("list", key, flipped, functions))
+    return pieces
+
+
+def _is_list_term(term: Term, list_vars: Set[str]) -> bool:
+    if type(term) is Const:
+        return term.name == "Nil"
+    if type(term) is Var:
+        return term.name in list_vars
+    return type(term) is App and term.name in LIST_FORMS
+
+
+def _linear(term: Term, list_vars: Set[str]) -> Dict[Hashable, int]:
+    """Flatten a Nat term over `plus`, `S`, `double` and `length` into a linear sum.
+
+    Keys are `None` for the constant, `("length", xs)` and `("nat", term)` for other terms.
+    """
+    total: Dict[Hashable, int] = {}
+    stack: List[Tuple[Term, int]] = [(term, 1)]
+    while stack:
+        item, factor = stack.pop()
+        kind = type(item)
+        if kind is App and item.name == "plus" and len(item.args) == 2:
+            stack.extend((arg, factor) for arg in item.args)
+        elif kind is App and item.name in ("S", "double") and len(item.args) == 1:
+            if item.name == "S":
+                total[None] = total.get(None, 0) + factor
+                stack.append((item.args[0], factor))
+            else:
+                stack.append((item.args[0], 2 * factor))
+        elif kind is App and item.name == "length" and len(item.args) == 1:
+            for piece in _pieces(item.args[0], list_vars):
+                if piece[0] == "element":
+                    key: Hashable = None
+                elif type(piece[1]) is App and piece[1].name == "replicate" and len(piece[1].args) == 2:
+                    key = ("nat", piece[1].args[0])
+                else:
+                    key = ("length", piece[1])
+                total[key] = total.get(key, 0) + factor
+        elif kind is NatLit or (kind is Const and item.name == "Z"):
+            total[None] = total.get(None, 0) + factor * (item.value if kind is NatLit else 0)
+        else:
+            key = ("nat", canonical_term(item))
+            total[key] = total.get(key, 0) + factor
+    return {key: count for key, count in total.items() if count}
+
+
+def _describe(piece: Optional[Piece]) -> str:
+    if piece is None:
+        return "nothing"
+    if piece[0] == "element":
+        return "an element"
+    text = piece[1].name if type(piece[1]) is Var else "a list term"
+    for function in piece[3]:
+        text = f"map {function if isinstance(function, str) else '(...)'} ({text})"
+    return f"reverse ({text})" if piece[2] else text
+
+
+def _describe_key(key: Hashable) -> str:
+    if key is None:
+        return "the constant"
+    kind, term = key
+    if kind == "length":
+        return f"length {term.name}" if type(term) is Var else "the length of a list term"
+    return term.name if type(term) is Var else "a Nat term"
+
+
+def check_lists(signature: Signature) -> None:
+    """Check a list equality, or a Nat equality over lengths, raising `ProofCheckError` if it fails.
+
+    Hypotheses are not used: a goal that holds by normalization holds under any.
+    """
+    _, conclusion = flatten_arrow(signature.result)
+    if not isinstance(conclusion, Equality):
+        raise ProofCheckError("lists only proves equalities")
+    list_vars = {
+        param.name
+        for param in signature.params
+        if isinstance(param.type_expr, TypeApp) and param.type_expr.name == "List"
+    }
+    left, right = conclusion.left, conclusion.right
+    if _is_list_term(left, list_vars) or _is_list_term(right, list_vars):
+        left_pieces = _pieces(left, list_vars)
+        right_pieces = _pieces(right, list_vars)
+        if left_pieces == right_pieces:
+            return
+        index = next(
+            (i for i, (a, b) in enumerate(zip(left_pieces, right_pieces)) if a != b),
+            min(len(left_pieces), len(right_pieces)),
+        )
+        pieces = [p[index] if index < len(p) else None for p in (left_pieces, right_pieces)]
+        raise ProofCheckError(
+            f"lists failed: the sides first differ at piece {index + 1} "
+            f"({_describe(pieces[0])} on the left, {_describe(pieces[1])} on the right)"
+        )
+    left_sum = _linear(left, list_vars)
+    right_sum = _linear(right, list_vars)
+    if left_sum == right_sum:
+        return
+    key = next(key for key in list(left_sum) + list(right_sum) if left_sum.get(key, 0) != right_sum.get(key, 0))
+    raise ProofCheckError(
+        f"lists failed: {_describe_key(key)} counts {left_sum.get(key, 0)} time(s) on the left "
+        f"and {right_sum.get(key, 0)} on the right"
+    )
@@ -0,0 +1,205 @@
+"""Matching theorems against instances of catalog lemmas.
+
+`proof plusComm (S n) m` proves `plus (S n) m = plus m (S n)`: the arguments are
+substituted, in order, for the lemma's term parameters, and any parameters left over
+(all of them for a bare `proof plusComm`) are inferred by matching the lemma's
+conclusion against the theorem's. Type variables in the lemma (`a` in `And a b`) are
+inferred the same way. Each hypothesis of the lemma, instantiated, must then be one of
+the theorem's hypotheses.
+
+Both sides' equations are first put in `canonical_term` form (closed numerals folded,
+lambda binders numbered by depth). The theorem's terms never contain variables to solve
+for, so matching is one-way and needs no occurs check. A variable seen a second time is compared with its first binding by
+identity, since nodes are interned, so a match costs one walk over the theorem.
+"""
+
+from __future__ import annotations
+
+import functools
+from typing import Dict, List, Sequence, Set, Tuple
+
+from researchproof.proof_checker import (
+    App,
+    Arrow,
+    Equality,
+    Lambda,
+    NatLit,
+    Node,
+    PARSE_CACHE_SIZE,
+    ProofCheckError,
+    Signature,
+    Term,
+    TypeApp,
+    TypeExpr,
+    TypeVar,
+    Var,
+    flatten_arrow,
+    canonical_term,
+)
+
+# Parameter types that are hypotheses rather than values to instantiate.
+PROPOSITIONS = {"And", "Or", "Iff"}
+
+# Binder names in `canonical_term` form; see `_Renamer`.
+_BINDER_PREFIX = "#b"
+
+
+def _is_hypothesis(type_expr: TypeExpr) -> bool:
+    return isinstance(type_expr, Equality) or (isinstance(type_expr, TypeApp) and type_expr.name in PROPOSITIONS)
+
+
+def _canonical(type_expr: TypeExpr) -> TypeExpr:
+    if isinstance(type_expr, Equality):
+        return Equality(canonical_term(type_expr.left), canonical_term(type_expr.right))
+    return type_expr
+
+
+def _split(signature: Signature) -> Tuple[Tuple[str, ...], Tuple[TypeExpr, ...], TypeExpr]:
+    premises, conclusion = flatten_arrow(signature.result)
+    params = tuple(param.name for param in signature.params if not _is_hypothesis(param.type_expr))
+    hypotheses = [param.type_expr for param in signature.params if _is_hypothesis(param.type_expr)]
+    return params, tuple(_canonical(item) for item in hypotheses + premises), _canonical(conclusion)
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def lemma_pattern(signature: Signature) -> Tuple[Tuple[str, ...], Tuple[TypeExpr, ...], TypeExpr]:
+    """Return a lemma's term parameters, hypotheses and conclusion, in canonical form."""
+    return _split(signature)
+
+
+def _captures(value: Node, depth: int) -> bool:
+    """Whether `value` mentions a lambda binder from outside it (one of the `depth` enclosing ones)."""
+    stack: List[Node] = [value]
+    while stack:
+        node = stack.pop()
+        if type(node) is Var or type(node) is App:
+            name = node.name
+            if name.startswith(_BINDER_PREFIX) and int(name[len(_BINDER_PREFIX) :]) < depth:
+                return True
+            if type(node) is App:
+                stack.extend(node.args)
+        elif type(node) is Lambda:
+            stack.append(node.body)
+    return False
+
+
+class _Matcher:
+    """Bindings of a lemma's term parameters and type variables to parts of a theorem."""
+
+    __slots__ = ("params", "terms", "types")
+
+    def __init__(self, params: Set[str]):
+        self.params = params
+        self.terms: Dict[str, Node] = {}
+        self.types: Dict[str, TypeExpr] = {}
+
+    def copy(self) -> "_Matcher":
+        other = _Matcher(self.params)
+        other.terms = dict(self.terms)
+        other.types = dict(self.types)
+        return other
+
+    def bind(self, name: str, value: Node, depth: int) -> bool:
+        bound = self.terms.get(name)
+        if bound is not None:
+            return bound is value
+        if depth and _captures(value, depth):
+            return False
+        self.terms[name] = value
+        return True
+
+    def match(self, pattern: Node, target: Node) -> bool:
+        """Extend the bindings so that `pattern` becomes `target`; False if impossible."""
+        stack: List[Tuple[Node, Node, int]] = [(pattern, target, 0)]
+        params = self.params
+        while stack:
+            pattern, target, depth = stack.pop()
+            kind = type(pattern)
+            if kind is TypeVar:
+                if not isinstance(target, TypeExpr):
+                    return False
+                if self.types.setdefault(pattern.name, target) is not target:
+                    return False
+                continue
+            if kind is Var and pattern.name in params:
+                if not self.bind(pattern.name, target, depth):
+                    return False
+                continue
+            if kind is App and type(target) is NatLit:
+                # `S m` against the literal 3 binds `m` to 2.
+                if pattern.name != "S" or len(pattern.args) != 1 or not target.value:
+                    return False
+                stack.append((pattern.args[0], NatLit(target.value - 1), depth))
+                continue
+            if kind is not type(target):
+                return False
+            if kind is App:
+                if len(pattern.args) != len(target.args):
+                    return False
+                if pattern.name in params:
+                    if not self.bind(pattern.name, Var(target.name), depth):
+                        return False
+                elif pattern.name != target.name:
+                    return False
+                stack.extend((arg, other, depth) for arg, other in zip(pattern.args, target.args))
+            elif kind is Lambda:
+                # Binders are numbered by depth, so equal depths mean equal names.
+                if pattern.param != target.param:
+                    return False
+                stack.append((pattern.body, target.body, depth + 1))
+            elif kind is TypeApp:
+                if pattern.name != target.name or len(pattern.args) != len(target.args):
+                    return False
+                stack.extend((arg, other, depth) for arg, other in zip(pattern.args, target.args))
+            elif kind is Equality or kind is Arrow:
+                stack.append((pattern.left, target.left, depth))
+                stack.append((pattern.right, target.right, depth))
+            elif pattern is not target:
+                return False
+        return True
+
+
+def _discharge(matcher: _Matcher, hypotheses: Sequence[TypeExpr], available: Sequence[TypeExpr]) -> bool:
+    """Whether every lemma hypothesis matches some theorem hypothesis under one set of bindings."""
+    # Hypotheses are few; try them in order and backtrack on a dead end.
+    stack: List[Tuple[_Matcher, int]] = [(matcher, 0)]
+    while stack:
+        current, index = stack.pop()
+        if index == len(hypotheses):
+            return True
+        for candidate in reversed(available):
+            trial = current.copy()
+            if trial.match(hypotheses[index], candidate):
+                stack.append((trial, index + 1))
+    return False
+
+
+def match_lemma(
+    name: str,
+    signature: Signature,
+    lemma_signature: Signature,
+    args: Sequence[Term] = (),
+) -> None:
+    """Check that lemma `name`, applied to `args`, proves `signature`; raise `ProofCheckError` if not.
+
+    `args` are terms over the theorem's parameters; `_` leaves a parameter to be inferred.
+    """
+    params, hypotheses, conclusion = lemma_pattern(lemma_signature)
+    if len(args) > len(params):
+        raise ProofCheckError(f"Lemma '{name}' takes {len(params)} argument(s), got {len(args)}")
+    matcher = _Matcher(set(params))
+    for param, arg in zip(params, args):
+        if not (type(arg) is Var and arg.name == "_"):
+            matcher.bind(param, canonical_term(arg), 0)
+    _, premises, goal = _split(signature)
+    # Any parameter type of the theorem may serve as a hypothesis; non-propositions never match one.
+    available = list(premises) + [_canonical(param.type_expr) for param in signature.params]
+    if not matcher.match(conclusion, goal) or not _discharge(matcher, hypotheses, available):
+        raise ProofCheckError(_mismatch(name, args))
+
+
+def _mismatch(name: str, args: Sequence[Term]) -> str:
+    if args:
+        return f"Theorem signature does not match lemma '{name}' applied to {len(args)} argument(s)"
+    return "Theorem signature does not match lemma signature"
+
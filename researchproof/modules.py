@@ -0,0 +1,269 @@
+"""Imports between proof scripts, and the interface files that make them cheap.
+
+A script may start with import directives:
+
+    import Nat.Basics
+
+`Nat.Basics` names `Nat/Basics.rp`, looked up next to the importing script first and then
+in each directory of the module search path (`verify --module-path`). Every theorem of an
+imported script is a lemma in the importing one, shadowing catalog lemmas of the same
+name; imports are not re-exported.
+
+Once an imported script verifies, an interface file is written next to it
+(`Nat/Basics.rpi`): its theorems' signatures and normalized fingerprints, stamped with the
+script's content hash, the checker version, the catalog fingerprint and the content
+hashes of its own imports' interfaces. While all of those still match, importers load the
+interface instead of reading, parsing or checking the script, and a signature is parsed
+only when a proof cites it. The content hash covers just the exported signatures, so
+editing a proof does not invalidate the modules that import it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple, Union
+
+from researchproof.cache import CHECKER_VERSION
+from researchproof.catalog import file_digest, write_json_atomic
+from researchproof.errors import ParseError
+from researchproof.proof_checker import (
+    Signature,
+    fingerprint_normalized,
+    normalize_signature,
+    parse_normalized_signature,
+)
+from researchproof.proof_language import iter_theorems, read_imports
+
+INTERFACE_FORMAT = 1
+INTERFACE_SUFFIX = ".rpi"
+MODULE_SUFFIX = ".rp"
+
+PathLike = Union[str, Path]
+
+
+@dataclass(frozen=True)
+class Interface:
+    """The exported theorems of a verified script: `(name, signature, fingerprint)` triples."""
+
+    content_hash: str
+    lemmas: Tuple[Tuple[str, str, str], ...]
+
+
+# The interfaces a script imports, by module name, in import order.
+Imports = Tuple[Tuple[str, Interface], ...]
+
+
+def interface_path(script: Path) -> Path:
+    return script.with_suffix(INTERFACE_SUFFIX)
+
+
+def imports_salt(imports: Imports) -> str:
+    """A digest of what `imports` export, for keying cached results that depend on them."""
+    return ",".join(f"{module}={interface.content_hash}" for module, interface in imports)
+
+
+def catalog_fingerprint(lemma_map: Mapping[str, Signature]) -> str:
+    fingerprint = getattr(lemma_map, "content_fingerprint", None)
+    return fingerprint() if fingerprint is not None else ""
+
+
+def _stamp(script: Path, imports: Imports, catalog: str) -> dict:
+    return {
+        "format": INTERFACE_FORMAT,
+        "checker": CHECKER_VERSION,
+        "catalog": catalog,
+        "source_hash": file_digest(script),
+        "imports": {module: interface.content_hash for module, interface in imports},
+    }
+
+
+def load_interface(script: Path, imports: Imports, catalog: str) -> Optional[Interface]:
+    """Return the interface of `script` if one exists and is still valid, else None."""
+    try:
+        payload = json.loads(interface_path(script).read_text(encoding="utf-8"))
+        stamp = _stamp(script, imports, catalog)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(payload, dict) or any(payload.get(field) != value for field, value in stamp.items()):
+        return None
+    try:
+        lemmas = tuple((name, signature, fingerprint) for name, signature, fingerprint in payload["lemmas"])
+        return Interface(str(payload["content_hash"]), lemmas)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def write_interface(script: Path, imports: Imports, catalog: str) -> Interface:
+    """Build the interface of a script that just verified and store it next to the script."""
+    lemmas = tuple(
+        (theorem.name, theorem.signature, fingerprint_normalized(parse_normalized_signature(theorem.signature)[1]))
+        for theorem in iter_theorems(script)
+    )
+    content_hash = hashlib.sha256(json.dumps(lemmas).encode("utf-8")).hexdigest()
+    payload = _stamp(script, imports, catalog)
+    payload.update(content_hash=content_hash, lemmas=lemmas)
+    try:
+        write_json_atomic(interface_path(script), payload)
+    except OSError:
+        # A read-only location still works; the script is just re-checked on every run.
+        pass
+    return Interface(content_hash, lemmas)
+
+
+class ImportedCatalog(Mapping[str, Signature]):
+    """A lemma map extended with the theorems of imported modules.
+
+    Offers the same lookups as `LemmaCatalog`; imported lemmas are parsed (through the
+    shared signature cache) only when cited, and everything else is delegated to `base`.
+    """
+
+    def __init__(self, base: Mapping[str, Signature], imports: Imports):
+        self.base = base
+        self._lemmas: Dict[str, Tuple[str, str]] = {}
+        owners: Dict[str, str] = {}
+        for module, interface in imports:
+            for name, signature, fingerprint in interface.lemmas:
+                owner = owners.setdefault(name, module)
+                if owner != module:
+                    raise ParseError(f"Lemma '{name}' is exported by both '{owner}' and '{module}'")
+                self._lemmas[name] = (signature, fingerprint)
+        self._by_fingerprint: Optional[Dict[str, List[str]]] = None
+
+    def signature_text(self, name: str) -> str:
+        entry = self._lemmas.get(name)
+        if entry is not None:
+            return entry[0]
+        return self.base.signature_text(name)
+
+    def __getitem__(self, name: str) -> Signature:
+        entry = self._lemmas.get(name)
+        if entry is not None:
+            return parse_normalized_signature(entry[0])[0]
+        return self.base[name]
+
+    def normalized(self, name: str) -> Signature:
+        entry = self._lemmas.get(name)
+        if entry is not None:
+            return parse_normalized_signature(entry[0])[1]
+        normalized = getattr(self.base, "normalized", None)
+        return normalized(name) if normalized is not None else normalize_signature(self.base[name])
+
+    def content_fingerprint(self) -> str:
+        return catalog_fingerprint(self.base)
+
+    def fingerprint(self, name: str) -> str:
+        entry = self._lemmas.get(name)
+        if entry is not None:
+            return entry[1]
+        fingerprint = getattr(self.base, "fingerprint", None)
+        return fingerprint(name) if fingerprint is not None else fingerprint_normalized(self.normalized(name))
+
+    def find(self, fingerprint: str) -> List[str]:
+        """Lemma names with normalized signature `fingerprint`: imported ones first."""
+        if self._by_fingerprint is None:
+            index: Dict[str, List[str]] = {}
+            for name, (_, known) in self._lemmas.items():
+                index.setdefault(known, []).append(name)
+            self._by_fingerprint = index
+        find = getattr(self.base, "find", None)
+        inherited = find(fingerprint) if find is not None else []
+        return self._by_fingerprint.get(fingerprint, []) + [name for name in inherited if name not in self._lemmas]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._lemmas or name in self.base
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._lemmas
+        for name in self.base:
+            if name not in self._lemmas:
+                yield name
+
+    def __len__(self) -> int:
+        return len(self._lemmas) + sum(1 for name in self.base if name not in self._lemmas)
+
+
+class ModuleGraph:
+    """Import DAG of a set of scripts and everything they import, transitively.
+
+    Scripts are keyed by resolved path. A script importing a module that cannot be found,
+    or closing an import cycle, gets an entry in `errors` and is never checked; nor is
+    anything that imports it.
+    """
+
+    def __init__(self, search_path: Iterable[PathLike] = ()):
+        self.search_path = [Path(directory) for directory in search_path]
+        self.imports: Dict[Path, List[Tuple[str, Path]]] = {}
+        self.errors: Dict[Path, str] = {}
+        # Every script added, each after everything it imports.
+        self.order: List[Path] = []
+        self._done: Set[Path] = set()
+        # Scripts imported by another script; only these get interface files.
+        self.modules: Set[Path] = set()
+
+    def resolve(self, module: str, importer: Path) -> Path:
+        """Path of the script `module` names, as imported from `importer`."""
+        relative = Path(*module.split(".")).with_suffix(MODULE_SUFFIX)
+        for directory in [importer.parent, *self.search_path]:
+            candidate = directory / relative
+            if candidate.is_file():
+                return candidate.resolve()
+        raise ParseError(f"Cannot find module '{module}': no {relative} next to {importer.name} or on the module path")
+
+    def _load(self, script: Path) -> None:
+        try:
+            directives = read_imports(script)
+        except (OSError, UnicodeDecodeError, ParseError):
+            # Reported as usual when the script itself is checked.
+            directives = []
+        edges: List[Tuple[str, Path]] = []
+        for directive in directives:
+            try:
+                edges.append((directive.module, self.resolve(directive.module, script)))
+            except ParseError as exc:
+                self.errors.setdefault(script, f"line {directive.line_number}: {exc}")
+        self.imports[script] = edges
+
+    def add(self, root: PathLike) -> Path:
+        """Add `root` and its imports; return its key."""
+        root = Path(root).resolve()
+        if root in self.imports:
+            return root
+        self._load(root)
+        # Depth-first with an explicit stack of (script, next import index).
+        stack: List[Tuple[Path, int]] = [(root, 0)]
+        while stack:
+            script, index = stack.pop()
+            edges = self.imports[script]
+            if index == len(edges):
+                self.order.append(script)
+                self._done.add(script)
+                continue
+            stack.append((script, index + 1))
+            module, dependency = edges[index]
+            self.modules.add(dependency)
+            if dependency in self.imports:
+                chain = [entry[0] for entry in stack]
+                if dependency not in self._done and dependency in chain:
+                    cycle = chain[chain.index(dependency) :] + [dependency]
+                    self.errors.setdefault(script, "Import cycle: " + " -> ".join(path.name for path in cycle))
+                continue
+            self._load(dependency)
+            stack.append((dependency, 0))
+        return root
+
+    def failure(self, script: Path, failed: Mapping[Path, str]) -> Optional[str]:
+        """Why `script` cannot be checked, given the scripts in `failed`; None if it can."""
+        error = self.errors.get(script)
+        if error is not None:
+            return error
+        for module, dependency in self.imports.get(script, ()):
+            if dependency in failed:
+                return f"imported module '{module}' did not verify: {failed[dependency]}"
+        return None
+
+    def imported_by(self, script: Path, interfaces: Mapping[Path, Interface]) -> Imports:
+        return tuple((module, interfaces[dependency]) for module, dependency in self.imports.get(script, ()))
+
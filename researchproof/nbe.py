@@ -0,0 +1,467 @@
+"""Normalization by evaluation of open terms.
+
+A free variable evaluates to a neutral value (`values.Neutral`) that holds its own normal
+form, so `Refl` can check goals such as `(n : Nat) -> plus Z n = n` by computation. A
+builtin given a neutral argument unfolds by its defining equations as far as the known
+arguments allow, and otherwise becomes a neutral application of its arguments' normal
+forms. The equations follow the usual recursive definitions:
+
+- `plus` and `mult` recurse on their first argument, `pow` on its exponent:
+  `plus (S k) m = S (plus k m)`, `mult (S k) m = plus m (mult k m)`,
+  `pow b (S e) = mult b (pow b e)`.
+- `pred`, `double`, `isZero`, `even`/`odd`, `leq`/`lt`, `eqNat`, `min`, `max` and `sub`
+  peel successors off their arguments.
+- `and`, `or`, `xor` and `ifThenElse` decide on their first argument.
+- `append`, `length`, `reverse`, `map`, `filter` and `concat` recurse on their list;
+  `snoc xs x = append xs (Cons x Nil)` and `replicate` recurses on its count.
+
+So `plus 2 n` normalizes to `S (S n)` while `plus n 2` stays as it is, exactly as in
+Idris. Two terms are definitionally equal when their normal forms are identical; normal
+forms are interned terms, so that is an identity check.
+"""
+
+from __future__ import annotations
+
+import itertools
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from researchproof import limits, values
+from researchproof.proof_checker import (
+    BUILTINS,
+    App,
+    Const,
+    Lambda,
+    NatLit,
+    ProofCheckError,
+    Term,
+    Value,
+    Var,
+    apply_callable,
+    canonical_term,
+)
+from researchproof.values import OPEN_TYPES, Builtin, Closure, ListValue, Neutral, OpenList, Stuck
+
+# Unfolding `mult k n` or `pow n k` takes k steps; larger constants are refused.
+UNFOLD_LIMIT = 100_000
+
+# Numbers the variables closures are read back with; see `_quote_closure`.
+_FRESH = itertools.count()
+_FRESH_LOCK = threading.Lock()
+
+# Arguments a builtin passes through without inspecting; open values there do not block
+# the ordinary closed implementation.
+ELEMENT_ARGS: Dict[str, Tuple[int, ...]] = {
+    "Cons": (0,),
+    "snoc": (1,),
+    "replicate": (1,),
+    "map": (0,),
+    "filter": (0,),
+    "ifThenElse": (1, 2),
+    "and": (1,),
+    "or": (1,),
+    "xor": (1,),
+}
+
+
+def quote(value: Value) -> Term:
+    """Read a value back as its normal-form term."""
+    kind = type(value)
+    if kind is bool:
+        return Const("True" if value else "False")
+    if kind is int:
+        return NatLit(value)
+    if kind is Neutral:
+        term = value.term
+        for _ in range(value.successors):
+            term = App("S", (term,))
+        return term
+    if kind is OpenList or isinstance(value, ListValue):
+        items, rest = (value.items, quote(value.rest)) if kind is OpenList else (list(value), Const("Nil"))
+        term = rest
+        for item in reversed(items):
+            term = App("Cons", (quote(item), term))
+        return term
+    if kind is Builtin:
+        return Var(value.name)
+    if kind is Closure:
+        return _quote_closure(value) if value.captured else canonical_term(value.term)
+    raise ProofCheckError(f"Cannot read back value {value!r}")
+
+
+def _quote_closure(closure: Closure) -> Term:
+    """Read back a closure that captured values as `\\v => body`, its body applied to `v`.
+
+    `v` is a name no source term or other read-back can use, so the captured values are
+    never confused with it; `canonical_term` then renames it like any other binder.
+    """
+    with _FRESH_LOCK:
+        name = f"#q{next(_FRESH)}"
+    return canonical_term(Lambda(name, quote(apply_callable(closure, Neutral(Var(name))))))
+
+
+def stuck(name: str, args: Sequence[Value]) -> Neutral:
+    """The neutral application of `name` to the normal forms of `args`."""
+    return Neutral(App(name, tuple(quote(arg) for arg in args)))
+
+
+def apply_neutral(func: Neutral, arg: Value) -> Neutral:
+    """Apply a neutral function, e.g. a function-typed parameter `f`, to `arg`."""
+    term = func.term
+    if func.successors == 0 and type(term) is Var:
+        return Neutral(App(term.name, (quote(arg),)))
+    if func.successors == 0 and type(term) is App and term.name not in BUILTINS:
+        return Neutral(App(term.name, term.args + (quote(arg),)))
+    raise ProofCheckError("Non-callable value used as function")
+
+
+# -----------------------------
+# Views of partially known values
+# -----------------------------
+
+
+def _nat(value: Value) -> Optional[Tuple[int, Optional[Term]]]:
+    """`(k, t)` for `S^k t`, with `t` None for the closed number k; None if not a Nat."""
+    if type(value) is Neutral:
+        return value.successors, value.term
+    if type(value) is int:
+        return value, None
+    return None
+
+
+def _from_nat(count: int, term: Optional[Term]) -> Value:
+    return count if term is None else Neutral(term, count)
+
+
+def successors(value: Value, count: int) -> Value:
+    """`S^count value`."""
+    if type(value) is Neutral:
+        return Neutral(value.term, value.successors + count)
+    if type(value) is int:
+        return value + count
+    return stuck("S", (value,)) if count == 1 else successors(stuck("S", (value,)), count - 1)
+
+
+def _list(value: Value) -> Optional[Tuple[Sequence[Value], Optional[Neutral]]]:
+    """`(items, rest)` for a list that is `items` followed by `rest` (None when closed)."""
+    if type(value) is OpenList:
+        return value.items, value.rest
+    if type(value) is Neutral:
+        return (), value
+    if isinstance(value, ListValue):
+        return tuple(value), None
+    return None
+
+
+def _make_list(items: Sequence[Value], rest: Optional[Value]) -> Value:
+    if rest is None:
+        return values.make_leaf(list(items))
+    if type(rest) is OpenList:
+        items, rest = tuple(items) + rest.items, rest.rest
+    elif isinstance(rest, ListValue):
+        return values.make_leaf(list(items) + list(rest))
+    return OpenList(tuple(items), rest) if items else rest
+
+
+def _check_unfold(name: str, count: int) -> None:
+    if count > UNFOLD_LIMIT:
+        raise ProofCheckError(f"Unfolding '{name}' on an open term takes {count} steps; the limit is {UNFOLD_LIMIT}")
+    limits.charge(count)
+
+
+# -----------------------------
+# Definitional unfolding, one rule per builtin
+# -----------------------------
+
+
+def _plus(a: Value, b: Value) -> Optional[Value]:
+    view = _nat(a)
+    if view is None or _nat(b) is None:
+        return None
+    count, term = view
+    if term is None:
+        return successors(b, count)
+    return Neutral(App("plus", (term, quote(b))), count)
+
+
+def _mult(a: Value, b: Value) -> Optional[Value]:
+    view = _nat(a)
+    if view is None or _nat(b) is None:
+        return None
+    count, term = view
+    _check_unfold("mult", count)
+    result: Value = 0 if term is None else Neutral(App("mult", (term, quote(b))))
+    for _ in range(count):
+        result = b + result if type(b) is int and type(result) is int else _plus(b, result)
+    return result
+
+
+def _pow(base: Value, exponent: Value) -> Optional[Value]:
+    view = _nat(exponent)
+    if view is None or _nat(base) is None:
+        return None
+    count, term = view
+    _check_unfold("pow", count)
+    result: Value = 1 if term is None else Neutral(App("pow", (quote(base), term)))
+    for _ in range(count):
+        result = base * result if type(base) is int and type(result) is int else _mult(base, result)
+    return result
+
+
+def _pred(a: Value) -> Optional[Value]:
+    view = _nat(a)
+    if view is None or view[0] == 0:
+        return None
+    return _from_nat(view[0] - 1, view[1])
+
+
+def _double(a: Value) -> Optional[Value]:
+    view = _nat(a)
+    if view is None or view[1] is None:
+        return None
+    return Neutral(App("double", (view[1],)), 2 * view[0])
+
+
+def _is_zero(a: Value) -> Optional[Value]:
+    view = _nat(a)
+    return False if view is not None and view[0] > 0 else None
+
+
+def _parity(name: str) -> Callable[[Value], Optional[Value]]:
+    def rule(a: Value) -> Optional[Value]:
+        view = _nat(a)
+        if view is None or view[1] is None:
+            return None
+        # even (S k) = odd k and odd (S k) = even k.
+        flipped = {"even": "odd", "odd": "even"}[name] if view[0] % 2 else name
+        return Neutral(App(flipped, (view[1],)))
+
+    return rule
+
+
+def _peel(a: Value, b: Value) -> Optional[Tuple[int, Tuple[int, Optional[Term]], Tuple[int, Optional[Term]]]]:
+    """Strip the successors both Nats share: `(shared, view_a, view_b)`."""
+    left, right = _nat(a), _nat(b)
+    if left is None or right is None:
+        return None
+    shared = min(left[0], right[0])
+    return shared, (left[0] - shared, left[1]), (right[0] - shared, right[1])
+
+
+def _is_closed_zero(view: Tuple[int, Optional[Term]]) -> bool:
+    return view == (0, None)
+
+
+def _leq(a: Value, b: Value) -> Optional[Value]:
+    peeled = _peel(a, b)
+    if peeled is None:
+        return None
+    _, left, right = peeled
+    if _is_closed_zero(left):
+        return True
+    if left[0] > 0 and _is_closed_zero(right):
+        return False
+    return stuck("leq", (_from_nat(*left), _from_nat(*right)))
+
+
+def _lt(a: Value, b: Value) -> Optional[Value]:
+    return _leq(successors(a, 1), b) if _nat(a) is not None else None
+
+
+def _eq_nat(a: Value, b: Value) -> Optional[Value]:
+    peeled = _peel(a, b)
+    if peeled is None:
+        return None
+    _, left, right = peeled
+    if (_is_closed_zero(left) and right[0] > 0) or (_is_closed_zero(right) and left[0] > 0):
+        return False
+    return stuck("eqNat", (_from_nat(*left), _from_nat(*right)))
+
+
+def _min(a: Value, b: Value) -> Optional[Value]:
+    peeled = _peel(a, b)
+    if peeled is None:
+        return None
+    shared, left, right = peeled
+    if _is_closed_zero(left) or _is_closed_zero(right):
+        return shared
+    return successors(stuck("min", (_from_nat(*left), _from_nat(*right))), shared) if shared else None
+
+
+def _max(a: Value, b: Value) -> Optional[Value]:
+    peeled = _peel(a, b)
+    if peeled is None:
+        return None
+    shared, left, right = peeled
+    if _is_closed_zero(left):
+        return successors(_from_nat(*right), shared) if shared else b
+    if _is_closed_zero(right):
+        return successors(_from_nat(*left), shared) if shared else a
+    return successors(stuck("max", (_from_nat(*left), _from_nat(*right))), shared) if shared else None
+
+
+def _sub(a: Value, b: Value) -> Optional[Value]:
+    peeled = _peel(a, b)
+    if peeled is None:
+        return None
+    _, left, right = peeled
+    if _is_closed_zero(right):
+        return _from_nat(*left)
+    if _is_closed_zero(left):
+        return 0
+    return stuck("sub", (_from_nat(*left), _from_nat(*right)))
+
+
+def _not(a: Value) -> Optional[Value]:
+    return (not a) if type(a) is bool else None
+
+
+def _and(a: Value, b: Value) -> Optional[Value]:
+    return (b if a else False) if type(a) is bool else None
+
+
+def _or(a: Value, b: Value) -> Optional[Value]:
+    return (True if a else b) if type(a) is bool else None
+
+
+def _xor(a: Value, b: Value) -> Optional[Value]:
+    if type(a) is not bool:
+        return None
+    return reduce_open("not", (b,)) if a else b
+
+
+def _if_then_else(condition: Value, then: Value, otherwise: Value) -> Optional[Value]:
+    return (then if condition else otherwise) if type(condition) is bool else None
+
+
+def _cons(head: Value, tail: Value) -> Optional[Value]:
+    view = _list(tail)
+    return None if view is None else _make_list((head,) + tuple(view[0]), view[1])
+
+
+def _append(left: Value, right: Value) -> Optional[Value]:
+    view = _list(left)
+    if view is None or _list(right) is None:
+        return None
+    items, rest = view
+    if rest is None:
+        return _make_list(items, right)
+    return _make_list(items, stuck("append", (rest, right)))
+
+
+def _snoc(items: Value, item: Value) -> Optional[Value]:
+    return _append(items, values.make_leaf([item]))
+
+
+def _length(items: Value) -> Optional[Value]:
+    view = _list(items)
+    if view is None:
+        return None
+    prefix, rest = view
+    return len(prefix) if rest is None else Neutral(App("length", (quote(rest),)), len(prefix))
+
+
+def _reverse(items: Value) -> Optional[Value]:
+    view = _list(items)
+    if view is None or view[1] is None:
+        return None
+    prefix, rest = view
+    # reverse (Cons x xs) = append (reverse xs) (Cons x Nil)
+    result: Value = stuck("reverse", (rest,))
+    for item in reversed(prefix):
+        result = stuck("append", (result, values.make_leaf([item])))
+    return result
+
+
+def _map(func: Value, items: Value) -> Optional[Value]:
+    view = _list(items)
+    if view is None:
+        return None
+    prefix, rest = view
+    mapped = [apply_callable(func, item) for item in prefix]
+    return _make_list(mapped, None if rest is None else stuck("map", (func, rest)))
+
+
+def _filter(predicate: Value, items: Value) -> Optional[Value]:
+    view = _list(items)
+    if view is None:
+        return None
+    prefix, rest = view
+    kept: List[Value] = []
+    for index, item in enumerate(prefix):
+        verdict = apply_callable(predicate, item)
+        if type(verdict) in OPEN_TYPES:
+            # Undecided element: the rest of the list stays a neutral `filter`.
+            return _make_list(kept, stuck("filter", (predicate, _make_list(prefix[index:], rest))))
+        if values.truthy(verdict):
+            kept.append(item)
+    return _make_list(kept, None if rest is None else stuck("filter", (predicate, rest)))
+
+
+def _concat(lists: Value) -> Optional[Value]:
+    view = _list(lists)
+    if view is None:
+        return None
+    prefix, rest = view
+    result: Optional[Value] = values.NIL if rest is None else stuck("concat", (rest,))
+    for items in reversed(prefix):
+        result = reduce_open("append", (items, result))
+    return result
+
+
+def _replicate(count: Value, item: Value) -> Optional[Value]:
+    view = _nat(count)
+    if view is None:
+        return None
+    known, term = view
+    _check_unfold("replicate", known)
+    return _make_list((item,) * known, None if term is None else stuck("replicate", (Neutral(term), item)))
+
+
+RULES: Dict[str, Callable[..., Optional[Value]]] = {
+    "S": lambda a: successors(a, 1),
+    "plus": _plus,
+    "mult": _mult,
+    "pow": _pow,
+    "pred": _pred,
+    "double": _double,
+    "isZero": _is_zero,
+    "even": _parity("even"),
+    "odd": _parity("odd"),
+    "leq": _leq,
+    "lt": _lt,
+    "eqNat": _eq_nat,
+    "min": _min,
+    "max": _max,
+    "sub": _sub,
+    "not": _not,
+    "and": _and,
+    "or": _or,
+    "xor": _xor,
+    "ifThenElse": _if_then_else,
+    "Cons": _cons,
+    "append": _append,
+    "snoc": _snoc,
+    "length": _length,
+    "reverse": _reverse,
+    "map": _map,
+    "filter": _filter,
+    "concat": _concat,
+    "replicate": _replicate,
+}
+
+
+def reduce_open(name: str, args: Sequence[Value]) -> Value:
+    """Apply builtin `name` to arguments of which some are not fully known."""
+    entry = BUILTINS.get(name)
+    if entry is None:
+        # Not a builtin: an application of a function-typed parameter.
+        return stuck(name, args)
+    elements = ELEMENT_ARGS.get(name, ())
+    if not any(type(arg) in OPEN_TYPES for index, arg in enumerate(args) if index not in elements):
+        try:
+            return entry[1](*args)
+        except Stuck:
+            pass
+    result = RULES[name](*args)
+    return stuck(name, args) if result is None else result
@@ -0,0 +1,237 @@
+"""A process pool that survives stuck workers.
+
+`WorkerPool` wraps `ProcessPoolExecutor`. Every worker claims a slot in shared memory and
+records there which task it is running and when it started that task's current theorem
+(see `heartbeat`). With `kill_after` set, a monitor thread kills any worker that has spent
+longer than that on one theorem, normally because it is stuck in a single native
+operation that neither the step budget nor `SIGALRM` can interrupt. The executor is then
+replaced and every unfinished task is submitted again. The killed task is re-run with
+the stuck theorem's index added to its `timed_out` keyword argument, so that it reports
+the theorem as timed out instead of checking it again; every other result is kept.
+
+Tasks are therefore run at least once, must be safe to run again, and must accept
+`timed_out`, a frozen set of theorem indexes within the task. Cancelling a returned future
+drops its task if no worker has started it; a running task is left to finish.
+"""
+
+from __future__ import annotations
+
+import itertools
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Optional, Sequence
+
+# Seconds between two looks of the monitor at the workers' heartbeats.
+MONITOR_INTERVAL = 0.05
+# Pool restarts after workers died by themselves, rather than being killed, before giving up.
+MAX_CRASH_RESTARTS = 3
+
+# Per slot: the running task's id (or `_IDLE`), the index of its current theorem, and
+# the `time.monotonic()` at which that theorem started (0 before the first).
+_FIELDS = 3
+_IDLE = -1.0
+_KILL = getattr(signal, "SIGKILL", signal.SIGTERM)
+
+# -----------------------------
+# Worker side
+# -----------------------------
+
+_SLOTS: Optional[Sequence[float]] = None
+_SLOT: Optional[int] = None
+
+
+def _init_slot(slots, pids, claimed, initializer: Optional[Callable[..., None]], initargs: tuple) -> None:
+    global _SLOTS, _SLOT
+    with claimed.get_lock():
+        _SLOT = claimed.value
+        claimed.value += 1
+    _SLOTS = slots
+    pids[_SLOT] = os.getpid()
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def heartbeat(index: int) -> None:
+    """Record that the current task has started its `index`-th theorem.
+
+    Does nothing outside a `WorkerPool` worker, so checking code may call it anywhere.
+    """
+    slot = _SLOT
+    if slot is not None:
+        base = slot * _FIELDS
+        _SLOTS[base + 1] = index
+        _SLOTS[base + 2] = time.monotonic()
+
+
+def _run(task_id: int, fn: Callable[..., Any], args: tuple, timed_out: FrozenSet[int]) -> Any:
+    base = _SLOT * _FIELDS
+    _SLOTS[base + 2] = 0.0
+    _SLOTS[base] = task_id
+    try:
+        return fn(*args, timed_out=timed_out)
+    finally:
+        _SLOTS[base] = _IDLE
+
+
+# -----------------------------
+# Parent side
+# -----------------------------
+
+
+@dataclass
+class _Task:
+    id: int
+    fn: Callable[..., Any]
+    args: tuple
+    future: Future
+    timed_out: FrozenSet[int] = frozenset()
+    inner: Optional[Future] = None
+
+
+class WorkerPool:
+    """`submit`-compatible process pool whose stuck workers are killed and replaced."""
+
+    def __init__(
+        self,
+        jobs: int,
+        mp_context: Optional[multiprocessing.context.BaseContext] = None,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: tuple = (),
+        kill_after: Optional[float] = None,
+    ):
+        self.jobs = jobs
+        self.kill_after = kill_after
+        self._context = mp_context or multiprocessing.get_context()
+        self._initializer = initializer
+        self._initargs = initargs
+        # Reentrant: a callback may run inside `submit` when its future is already done.
+        self._lock = threading.RLock()
+        self._tasks: Dict[int, _Task] = {}
+        self._ids = itertools.count()
+        self._generation = 0
+        self._killing = False
+        self._crashes = 0
+        self._closed = threading.Event()
+        self._start()
+        self._monitor: Optional[threading.Thread] = None
+        if kill_after is not None:
+            self._monitor = threading.Thread(target=self._watch, name="researchproof-pool-monitor", daemon=True)
+            self._monitor.start()
+
+    def _start(self) -> None:
+        context = self._context
+        self._slots = context.RawArray("d", [_IDLE, 0.0, 0.0] * self.jobs)
+        self._pids = context.RawArray("q", self.jobs)
+        claimed = context.Value("i", 0)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.jobs,
+            mp_context=context,
+            initializer=_init_slot,
+            initargs=(self._slots, self._pids, claimed, self._initializer, self._initargs),
+        )
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        with self._lock:
+            task = _Task(next(self._ids), fn, args, Future())
+            self._tasks[task.id] = task
+            self._dispatch(task)
+        task.future.add_done_callback(lambda done: done.cancelled() and self._cancel(task))
+        return task.future
+
+    def _cancel(self, task: _Task) -> None:
+        with self._lock:
+            if task.inner is not None:
+                task.inner.cancel()
+
+    def _dispatch(self, task: _Task) -> None:
+        generation = self._generation
+        try:
+            inner = self._executor.submit(_run, task.id, task.fn, task.args, task.timed_out)
+        except BrokenProcessPool as exc:
+            self._broken(exc)
+            return
+        task.inner = inner
+        inner.add_done_callback(lambda done: self._finished(task, generation, done))
+
+    def _finished(self, task: _Task, generation: int, inner: Future) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return  # Superseded by a resubmission after a restart.
+            if task.future.cancelled() or inner.cancelled():
+                self._tasks.pop(task.id, None)
+                return
+            exc = inner.exception()
+            if isinstance(exc, BrokenProcessPool):
+                self._broken(exc)
+                return
+            del self._tasks[task.id]
+        try:
+            if exc is None:
+                task.future.set_result(inner.result())
+            else:
+                task.future.set_exception(exc)
+        except InvalidStateError:
+            pass  # Cancelled in the meantime.
+
+    def _broken(self, exc: BrokenProcessPool) -> None:
+        # A worker died: killed by the monitor, or by itself (e.g. out of memory).
+        if not self._killing:
+            self._crashes += 1
+        if self._closed.is_set() or self._crashes > MAX_CRASH_RESTARTS:
+            tasks = list(self._tasks.values())
+            self._tasks.clear()
+            for task in tasks:
+                task.future.set_exception(exc)
+            return
+        old = self._executor
+        self._generation += 1
+        self._killing = False
+        self._start()
+        old.shutdown(wait=False, cancel_futures=True)
+        for task in sorted(self._tasks.values(), key=lambda task: task.id):
+            self._dispatch(task)
+
+    def _watch(self) -> None:
+        while not self._closed.wait(MONITOR_INTERVAL):
+            with self._lock:
+                if not self._killing:
+                    self._kill_stuck(time.monotonic())
+
+    def _kill_stuck(self, now: float) -> None:
+        slots = self._slots
+        for slot in range(self.jobs):
+            base = slot * _FIELDS
+            task_id, index, started = slots[base], slots[base + 1], slots[base + 2]
+            if task_id == _IDLE or not started or now - started <= self.kill_after:
+                continue
+            task = self._tasks.get(int(task_id))
+            if task is None:
+                continue
+            task.timed_out = task.timed_out | {int(index)}
+            self._killing = True
+            try:
+                os.kill(self._pids[slot], _KILL)
+            except OSError:
+                self._killing = False  # Exited in the meantime.
+                continue
+            return
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._closed.set()
+        if self._monitor is not None:
+            self._monitor.join()
+        with self._lock:
+            executor = self._executor
+        executor.shutdown(wait=wait)
+
+    def __enter__(self) -> "WorkerPool":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.shutdown()
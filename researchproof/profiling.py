@@ -0,0 +1,292 @@
+"""Per-theorem, per-phase profiling of proof checking.
+
+    with profile() as profiler:
+        verify_theorems(theorems)
+    print(profiler.format_top(10))
+
+While a profiler is active, `check_theorem` checks each theorem one phase at a time:
+`tokenize`, `parse`, `normalize` and then the proof itself, reported as `evaluate`
+(`Refl`, `check`), `lemma` (lemma names, `auto`) or `decide` (`decide`, `ring`,
+`lists`). For every phase it records wall time, the subterms evaluated (misses of the
+evaluation memo) and, with `memory`, the `tracemalloc` peak above the memory in use when
+the phase began; for every theorem also its token and AST-node counts. When no profiler
+is active the checker pays a single global lookup per theorem.
+
+The profiler is process-wide and not thread-safe; profile from one thread, without
+worker processes. Results export as a slowest-theorems table, Chrome trace JSON (for
+`chrome://tracing` or Perfetto) and OpenMetrics text.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Dict, Iterator, List, Optional, Union
+
+from researchproof.proof_checker import EVALUATION_MEMO, Node, Signature, active_profiler, set_profiler
+from researchproof.proof_language import Theorem
+
+DEFAULT_TOP = 10
+# Upper bounds of the theorem-duration histogram in the OpenMetrics dump, in seconds.
+HISTOGRAM_BOUNDS = (0.001, 0.01, 0.1, 1.0, 10.0)
+
+
+@dataclass
+class PhaseProfile:
+    name: str
+    # Seconds since the profiler was created.
+    start: float
+    seconds: float
+    evaluations: int
+    peak_bytes: Optional[int]
+
+
+@dataclass
+class TheoremProfile:
+    path: Optional[str]
+    name: str
+    line_number: int
+    proof: str
+    start: float
+    seconds: float = 0.0
+    tokens: int = 0
+    nodes: int = 0
+    peak_bytes: Optional[int] = None
+    error: Optional[str] = None
+    phases: List[PhaseProfile] = field(default_factory=list)
+
+    @property
+    def evaluations(self) -> int:
+        return sum(phase.evaluations for phase in self.phases)
+
+    @property
+    def slowest_phase(self) -> Optional[PhaseProfile]:
+        return max(self.phases, key=lambda phase: phase.seconds, default=None)
+
+    @property
+    def location(self) -> str:
+        return f"{self.path}:{self.line_number}" if self.path else f"line {self.line_number}"
+
+
+def count_nodes(root: Node) -> int:
+    """Number of AST nodes in `root`, counting a shared subtree once per occurrence."""
+    count = 0
+    stack: List[object] = [root]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, tuple):
+            stack.extend(item)
+        elif isinstance(item, Node):
+            count += 1
+            stack.extend(getattr(item, name) for name in item._fields)
+    return count
+
+
+class Profiler:
+    """Collects a `TheoremProfile` for every theorem checked while it is installed."""
+
+    def __init__(self, memory: bool = True):
+        self.memory = memory
+        self.theorems: List[TheoremProfile] = []
+        # Script the theorems being checked come from; set by the runner.
+        self.path: Optional[str] = None
+        self._origin = time.perf_counter()
+        self._current: Optional[TheoremProfile] = None
+        self._theorem_base = 0
+
+    # -- hooks called by `proof_checker.check_theorem` --------------------------------------
+
+    @contextmanager
+    def theorem(self, theorem: Theorem) -> Iterator[TheoremProfile]:
+        began = time.perf_counter()
+        record = TheoremProfile(self.path, theorem.name, theorem.line_number, theorem.proof, began - self._origin)
+        if self.memory:
+            self._theorem_base = tracemalloc.get_traced_memory()[0]
+            record.peak_bytes = 0
+        self._current = record
+        try:
+            yield record
+        except Exception as exc:
+            record.error = str(exc)
+            raise
+        finally:
+            record.seconds = time.perf_counter() - began
+            self._current = None
+            self.theorems.append(record)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        record = self._current
+        if self.memory:
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        misses = EVALUATION_MEMO.misses
+        began = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - began
+            peak = None
+            if self.memory:
+                top = tracemalloc.get_traced_memory()[1]
+                peak = top - base
+                record.peak_bytes = max(record.peak_bytes or 0, top - self._theorem_base)
+            evaluations = EVALUATION_MEMO.misses - misses
+            record.phases.append(PhaseProfile(name, began - self._origin, elapsed, evaluations, peak))
+
+    def sizes(self, tokens: int, signature: Signature) -> None:
+        self._current.tokens = tokens
+        self._current.nodes = count_nodes(signature)
+
+    # -- reports ----------------------------------------------------------------------------
+
+    def phase_totals(self) -> Dict[str, float]:
+        totals: Dict[str, float] = {}
+        for theorem in self.theorems:
+            for phase in theorem.phases:
+                totals[phase.name] = totals.get(phase.name, 0.0) + phase.seconds
+        return totals
+
+    def slowest(self, count: int = DEFAULT_TOP) -> List[TheoremProfile]:
+        return sorted(self.theorems, key=lambda theorem: theorem.seconds, reverse=True)[:count]
+
+    def format_top(self, count: int = DEFAULT_TOP) -> str:
+        """A table of the `count` slowest theorems followed by the time spent per phase."""
+        total = sum(theorem.seconds for theorem in self.theorems)
+        shown = min(count, len(self.theorems))
+        lines = [
+            f"Slowest {shown} of {len(self.theorems)} theorem(s) ({total:.3f} s checked):",
+            f"{'seconds':>9}  {'slowest phase':<15}{'tokens':>7}{'nodes':>7}{'evals':>7}{'peak KiB':>10}  theorem",
+        ]
+        for theorem in self.slowest(count):
+            phase = theorem.slowest_phase
+            peak = f"{theorem.peak_bytes / 1024:,.1f}" if theorem.peak_bytes is not None else "-"
+            status = " (failed)" if theorem.error else ""
+            lines.append(
+                f"{theorem.seconds:>9.4f}  {phase.name if phase else '-':<15}{theorem.tokens:>7}{theorem.nodes:>7}"
+                f"{theorem.evaluations:>7}{peak:>10}  {theorem.location} {theorem.name}{status}"
+            )
+        totals = self.phase_totals()
+        spent = sum(totals.values()) or 1.0
+        summary = ", ".join(f"{name} {seconds:.3f} s ({seconds / spent:.0%})" for name, seconds in totals.items())
+        lines.append(f"Time by phase: {summary or 'none'}")
+        return "\n".join(lines)
+
+    def chrome_trace(self) -> dict:
+        """Trace Event Format: one complete event per theorem, with its phases nested inside."""
+        events: List[dict] = []
+        for theorem in self.theorems:
+            args = {"proof": theorem.proof, "tokens": theorem.tokens, "nodes": theorem.nodes}
+            if theorem.path:
+                args["file"] = theorem.path
+            args["line"] = theorem.line_number
+            if theorem.peak_bytes is not None:
+                args["peak_bytes"] = theorem.peak_bytes
+            if theorem.error:
+                args["error"] = theorem.error
+            events.append(_complete_event(theorem.name, "theorem", theorem.start, theorem.seconds, args))
+            for phase in theorem.phases:
+                args = {"evaluations": phase.evaluations}
+                if phase.peak_bytes is not None:
+                    args["peak_bytes"] = phase.peak_bytes
+                events.append(_complete_event(phase.name, "phase", phase.start, phase.seconds, args))
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, out: IO[str]) -> None:
+        json.dump(self.chrome_trace(), out)
+        out.write("\n")
+
+    def openmetrics(self) -> str:
+        """Totals per phase and a theorem-duration histogram in OpenMetrics text format."""
+        lines: List[str] = []
+        failed = sum(1 for theorem in self.theorems if theorem.error)
+        _family(lines, "researchproof_theorems", "counter", "Theorems checked while profiling.")
+        lines.append(f'researchproof_theorems_total{{status="passed"}} {len(self.theorems) - failed}')
+        lines.append(f'researchproof_theorems_total{{status="failed"}} {failed}')
+        _family(lines, "researchproof_tokens", "counter", "Signature tokens read.")
+        lines.append(f"researchproof_tokens_total {sum(theorem.tokens for theorem in self.theorems)}")
+        _family(lines, "researchproof_ast_nodes", "counter", "Signature AST nodes built.")
+        lines.append(f"researchproof_ast_nodes_total {sum(theorem.nodes for theorem in self.theorems)}")
+
+        seconds: Dict[str, float] = {}
+        evaluations: Dict[str, int] = {}
+        peaks: Dict[str, int] = {}
+        for theorem in self.theorems:
+            for phase in theorem.phases:
+                seconds[phase.name] = seconds.get(phase.name, 0.0) + phase.seconds
+                evaluations[phase.name] = evaluations.get(phase.name, 0) + phase.evaluations
+                if phase.peak_bytes is not None:
+                    peaks[phase.name] = max(peaks.get(phase.name, 0), phase.peak_bytes)
+        _family(lines, "researchproof_phase_seconds", "counter", "Wall time per checker phase.", unit="seconds")
+        for name, value in seconds.items():
+            lines.append(f'researchproof_phase_seconds_total{{phase="{name}"}} {value:.9f}')
+        _family(lines, "researchproof_phase_evaluations", "counter", "Subterms evaluated per checker phase.")
+        for name, count in evaluations.items():
+            lines.append(f'researchproof_phase_evaluations_total{{phase="{name}"}} {count}')
+        if peaks:
+            _family(lines, "researchproof_phase_peak_bytes", "gauge", "Largest traced peak of one phase.", unit="bytes")
+            for name, count in peaks.items():
+                lines.append(f'researchproof_phase_peak_bytes{{phase="{name}"}} {count}')
+
+        _family(lines, "researchproof_theorem_seconds", "histogram", "Wall time per theorem.", unit="seconds")
+        durations = [theorem.seconds for theorem in self.theorems]
+        for bound in HISTOGRAM_BOUNDS:
+            below = sum(1 for duration in durations if duration <= bound)
+            lines.append(f'researchproof_theorem_seconds_bucket{{le="{bound}"}} {below}')
+        lines.append(f'researchproof_theorem_seconds_bucket{{le="+Inf"}} {len(durations)}')
+        lines.append(f"researchproof_theorem_seconds_count {len(durations)}")
+        lines.append(f"researchproof_theorem_seconds_sum {sum(durations):.9f}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+def _complete_event(name: str, category: str, start: float, seconds: float, args: dict) -> dict:
+    # Timestamps and durations are in microseconds.
+    return {
+        "name": name,
+        "cat": category,
+        "ph": "X",
+        "ts": round(start * 1e6, 3),
+        "dur": round(seconds * 1e6, 3),
+        "pid": 1,
+        "tid": 1,
+        "args": args,
+    }
+
+
+def _family(lines: List[str], name: str, kind: str, help_text: str, unit: Optional[str] = None) -> None:
+    lines.append(f"# TYPE {name} {kind}")
+    if unit:
+        lines.append(f"# UNIT {name} {unit}")
+    lines.append(f"# HELP {name} {help_text}")
+
+
+@contextmanager
+def profile(memory: bool = True) -> Iterator[Profiler]:
+    """Profile every theorem checked inside the block.
+
+    With `memory`, `tracemalloc` is started for the block if it is not already tracing;
+    it slows allocation down, so disable it when only timings matter.
+    """
+    profiler = Profiler(memory)
+    started = memory and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    previous = set_profiler(profiler)
+    try:
+        yield profiler
+    finally:
+        set_profiler(previous)
+        if started:
+            tracemalloc.stop()
+
+
+def note_file(path: Union[str, Path]) -> None:
+    """Attribute theorems checked from now on to `path`, if a profiler is active."""
+    profiler = active_profiler()
+    if profiler is not None:
+        profiler.path = str(path)
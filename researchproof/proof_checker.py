@@ -8,160 +8,298 @@ use `Refl`.
 
 from __future__ import annotations
 
+import functools
+import hashlib
+import re
+import threading
+import weakref
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from typing import Callable, Dict, FrozenSet, Hashable, Iterable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
 
-from researchproof.errors import ProofLanguageError
+from researchproof import limits, values
+from researchproof.errors import ProofCheckError, ProofLanguageError, ResourceLimitError
 from researchproof.lemma_catalog import LEMMA_CATALOG
 from researchproof.proof_language import Theorem
-
-
-class ProofCheckError(ProofLanguageError):
-    """Raised when proof checking fails."""
+from researchproof.values import NIL, OPEN_TYPES, Builtin, Closure, ListValue, Neutral, RuntimeValue, Stuck, values_equal
 
 
 # -----------------------------
 # Tokenization
 # -----------------------------
 
+# One alternation scanned left to right: whitespace is skipped, `\\` is an escaped
+# lambda backslash, and anything unmatched falls through to `bad`.
+_TOKEN_PATTERN = re.compile(r"(?P<ws>\s+)|(?P<punct>->|=>|\\\\?|[():=,])|(?P<word>\w+)|(?P<bad>.)", re.DOTALL)
 
-def tokenize(text: str) -> List[str]:
+
+def scan(text: str) -> Tuple[List[str], List[int]]:
+    """Tokenize `text` in one pass, returning tokens and their 0-based start offsets."""
     tokens: List[str] = []
-    i = 0
-    while i < len(text):
-        char = text[i]
-        if char.isspace():
-            i += 1
-            continue
-        if text.startswith("->", i):
-            tokens.append("->")
-            i += 2
-            continue
-        if text.startswith("=>", i):
-            tokens.append("=>")
-            i += 2
+    starts: List[int] = []
+    for match in _TOKEN_PATTERN.finditer(text):
+        kind = match.lastgroup
+        if kind == "ws":
             continue
-        if text.startswith("\\\\", i):
-            tokens.append("\\")
-            i += 2
-            continue
-        if char == "\\":
-            tokens.append("\\")
-            i += 1
-            continue
-        if char in "():=,":
-            tokens.append(char)
-            i += 1
-            continue
-        if char == "=":
-            tokens.append("=")
-            i += 1
-            continue
-        if char.isalnum() or char == "_":
-            start = i
-            while i < len(text) and (text[i].isalnum() or text[i] == "_"):
-                i += 1
-            tokens.append(text[start:i])
-            continue
-        raise ProofCheckError(f"Unexpected character '{char}' in: {text}")
-    return tokens
+        if kind == "bad":
+            raise ProofCheckError(f"Unexpected character '{match.group()}' in: {text}", match.start() + 1)
+        token = match.group()
+        tokens.append("\\" if token.startswith("\\") else token)
+        starts.append(match.start())
+    return tokens, starts
+
+
+def tokenize(text: str) -> List[str]:
+    return scan(text)[0]
 
 
-@dataclass(frozen=True)
 class TokenStream:
-    tokens: List[str]
-    index: int = 0
+    """Cursor over a token list, with source offsets for error columns."""
 
-    def peek(self) -> Optional[str]:
-        if self.index >= len(self.tokens):
+    __slots__ = ("tokens", "index", "starts", "text", "_separators")
+
+    def __init__(self, tokens: List[str], index: int = 0, starts: Optional[List[int]] = None, text: str = ""):
+        self.tokens = tokens
+        self.index = index
+        self.starts = starts
+        self.text = text
+        self._separators: Optional[List[Optional[str]]] = None
+
+    @classmethod
+    def from_text(cls, text: str) -> "TokenStream":
+        tokens, starts = scan(text)
+        return cls(tokens, 0, starts, text)
+
+    def peek(self, offset: int = 0) -> Optional[str]:
+        index = self.index + offset
+        if index >= len(self.tokens):
+            return None
+        return self.tokens[index]
+
+    def column(self) -> Optional[int]:
+        """1-based source column of the next token (or end of input), if spans are known."""
+        if self.starts is None:
             return None
-        return self.tokens[self.index]
+        if self.index < len(self.starts):
+            return self.starts[self.index] + 1
+        return len(self.text) + 1
+
+    def error(self, message: str) -> ProofCheckError:
+        return ProofCheckError(message, self.column())
 
     def consume(self, expected: Optional[str] = None) -> str:
         if self.index >= len(self.tokens):
-            raise ProofCheckError("Unexpected end of input while parsing")
+            raise self.error("Unexpected end of input while parsing")
         token = self.tokens[self.index]
         if expected and token != expected:
-            raise ProofCheckError(f"Expected '{expected}', got '{token}'")
-        object.__setattr__(self, "index", self.index + 1)
+            raise self.error(f"Expected '{expected}', got '{token}'")
+        self.index += 1
         return token
 
+    def next_separator(self) -> Optional[str]:
+        """Return the first `=` or `->` at the current nesting level, before it closes.
+
+        Computed for every position in one right-to-left pass, so repeated queries while
+        parsing long arrow chains stay linear overall.
+        """
+        if self._separators is None:
+            separators: List[Optional[str]] = [None] * len(self.tokens)
+            levels: List[Optional[str]] = [None]
+            for position in range(len(self.tokens) - 1, -1, -1):
+                token = self.tokens[position]
+                if token == ")":
+                    levels.append(None)
+                elif token == "(":
+                    if len(levels) > 1:
+                        levels.pop()
+                elif token == "=" or token == "->":
+                    levels[-1] = token
+                separators[position] = levels[-1] if token != ")" else None
+            self._separators = separators
+        if self.index >= len(self.tokens):
+            return None
+        return self._separators[self.index]
+
 
 # -----------------------------
 # AST definitions
 # -----------------------------
 
 
-@dataclass(frozen=True)
-class TypeExpr:
-    pass
+class Node:
+    """Base class for hash-consed AST nodes.
+
+    Nodes are interned: constructing a node whose fields equal those of a live node returns
+    that same object. Structural equality is therefore object identity, and comparing two
+    trees costs O(1) no matter how large they are.
+    """
+
+    __slots__ = ("__weakref__",)
+    _fields: Tuple[str, ...] = ()
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError(f"{type(self).__name__} nodes are immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} nodes are immutable")
+
+    def __reduce__(self):
+        return (type(self), tuple(getattr(self, field) for field in self._fields))
+
+    def __repr__(self) -> str:
+        # Rendered with an explicit stack so that arbitrarily deep trees can be printed.
+        parts: List[str] = []
+        stack: List[object] = [self]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                parts.append(item)
+                continue
+            pieces: List[object] = [f"{type(item).__name__}("]
+            for index, field in enumerate(item._fields):
+                if index:
+                    pieces.append(", ")
+                pieces.append(f"{field}=")
+                value = getattr(item, field)
+                if isinstance(value, Node):
+                    pieces.append(value)
+                elif isinstance(value, tuple) and all(isinstance(element, Node) for element in value):
+                    pieces.append("(")
+                    for position, element in enumerate(value):
+                        if position:
+                            pieces.append(", ")
+                        pieces.append(element)
+                    pieces.append(",)" if len(value) == 1 else ")")
+                else:
+                    pieces.append(repr(value))
+            pieces.append(")")
+            stack.extend(reversed(pieces))
+        return "".join(parts)
+
+
+_INTERN_TABLE: "weakref.WeakValueDictionary[tuple, Node]" = weakref.WeakValueDictionary()
+_INTERN_LOCK = threading.Lock()
+
+
+def _intern(cls: type, values: tuple) -> Node:
+    key = (cls, values)
+    node = _INTERN_TABLE.get(key)
+    if node is not None:
+        return node
+    with _INTERN_LOCK:
+        node = _INTERN_TABLE.get(key)
+        if node is None:
+            node = object.__new__(cls)
+            for field, value in zip(cls._fields, values):
+                object.__setattr__(node, field, value)
+            _INTERN_TABLE[key] = node
+    return node
+
+
+class TypeExpr(Node):
+    __slots__ = ()
 
 
-@dataclass(frozen=True)
 class TypeConst(TypeExpr):
-    name: str
+    __slots__ = ("name",)
+    _fields = ("name",)
+
+    def __new__(cls, name: str) -> "TypeConst":
+        return _intern(cls, (name,))
 
 
-@dataclass(frozen=True)
 class TypeVar(TypeExpr):
-    name: str
+    __slots__ = ("name",)
+    _fields = ("name",)
+
+    def __new__(cls, name: str) -> "TypeVar":
+        return _intern(cls, (name,))
 
 
-@dataclass(frozen=True)
 class TypeApp(TypeExpr):
-    name: str
-    args: Tuple[TypeExpr, ...]
+    __slots__ = ("name", "args")
+    _fields = ("name", "args")
+
+    def __new__(cls, name: str, args: Tuple[TypeExpr, ...]) -> "TypeApp":
+        return _intern(cls, (name, tuple(args)))
 
 
-@dataclass(frozen=True)
 class Equality(TypeExpr):
-    left: "Term"
-    right: "Term"
+    __slots__ = ("left", "right")
+    _fields = ("left", "right")
+
+    def __new__(cls, left: "Term", right: "Term") -> "Equality":
+        return _intern(cls, (left, right))
 
 
-@dataclass(frozen=True)
 class Arrow(TypeExpr):
-    left: TypeExpr
-    right: TypeExpr
+    __slots__ = ("left", "right")
+    _fields = ("left", "right")
 
+    def __new__(cls, left: TypeExpr, right: TypeExpr) -> "Arrow":
+        return _intern(cls, (left, right))
 
-@dataclass(frozen=True)
-class Param:
-    name: str
-    type_expr: TypeExpr
 
+class Param(Node):
+    __slots__ = ("name", "type_expr")
+    _fields = ("name", "type_expr")
 
-@dataclass(frozen=True)
-class Signature:
-    params: Tuple[Param, ...]
-    result: TypeExpr
+    def __new__(cls, name: str, type_expr: TypeExpr) -> "Param":
+        return _intern(cls, (name, type_expr))
 
 
-@dataclass(frozen=True)
-class Term:
-    pass
+class Signature(Node):
+    __slots__ = ("params", "result")
+    _fields = ("params", "result")
+
+    def __new__(cls, params: Tuple[Param, ...], result: TypeExpr) -> "Signature":
+        return _intern(cls, (tuple(params), result))
+
+
+class Term(Node):
+    __slots__ = ()
 
 
-@dataclass(frozen=True)
 class Var(Term):
-    name: str
+    __slots__ = ("name",)
+    _fields = ("name",)
+
+    def __new__(cls, name: str) -> "Var":
+        return _intern(cls, (name,))
 
 
-@dataclass(frozen=True)
 class Const(Term):
-    name: str
+    __slots__ = ("name",)
+    _fields = ("name",)
+
+    def __new__(cls, name: str) -> "Const":
+        return _intern(cls, (name,))
 
 
-@dataclass(frozen=True)
 class App(Term):
-    name: str
-    args: Tuple[Term, ...]
+    __slots__ = ("name", "args")
+    _fields = ("name", "args")
+
+    def __new__(cls, name: str, args: Tuple[Term, ...]) -> "App":
+        return _intern(cls, (name, tuple(args)))
+
+
+class NatLit(Term):
+    """A decimal natural number literal; `3` denotes the same value as `S (S (S Z))`."""
+
+    __slots__ = ("value",)
+    _fields = ("value",)
+
+    def __new__(cls, value: int) -> "NatLit":
+        return _intern(cls, (value,))
 
 
-@dataclass(frozen=True)
 class Lambda(Term):
-    param: str
-    body: Term
+    __slots__ = ("param", "body")
+    _fields = ("param", "body")
+
+    def __new__(cls, param: str, body: Term) -> "Lambda":
+        return _intern(cls, (param, body))
 
 
 # -----------------------------
@@ -182,11 +320,19 @@ CALLABLES = {
 }
 
 
+def is_nat_literal(token: str) -> bool:
+    return token.isascii() and token.isdigit()
+
+
 def parse_signature(text: str) -> Signature:
-    stream = TokenStream(tokenize(text))
+    return _parse_signature_stream(TokenStream.from_text(text))
+
+
+def _parse_signature_stream(stream: TokenStream) -> Signature:
+    text = stream.text
     params: List[Param] = []
 
-    while stream.peek() == "(":
+    while stream.peek() == "(" and stream.peek(2) == ":":
         stream.consume("(")
         name = stream.consume()
         stream.consume(":")
@@ -197,7 +343,7 @@ def parse_signature(text: str) -> Signature:
 
     remaining_type = parse_type_expr(stream)
     if stream.peek() is not None:
-        raise ProofCheckError(f"Unexpected token '{stream.peek()}' in signature '{text}'")
+        raise stream.error(f"Unexpected token '{stream.peek()}' in signature '{text}'")
 
     flat_params, result = flatten_arrow(remaining_type)
     params.extend([Param(name=f"_param_{idx}", type_expr=param) for idx, param in enumerate(flat_params)])
@@ -205,103 +351,165 @@ def parse_signature(text: str) -> Signature:
     return Signature(params=tuple(params), result=result)
 
 
-def parse_type_expr(stream: TokenStream) -> TypeExpr:
-    if has_top_level_equals(stream):
-        return parse_equality_type(stream)
-    left = parse_type_application(stream)
-    if stream.peek() == "->":
-        stream.consume("->")
-        right = parse_type_expr(stream)
-        return Arrow(left=left, right=right)
-    return left
+PARSE_CACHE_SIZE = 4096
 
 
-def parse_type_atom(stream: TokenStream) -> TypeExpr:
-    token = stream.peek()
-    if token is None:
-        raise ProofCheckError("Unexpected end of input while parsing type")
-    if token == "(":
-        stream.consume("(")
-        inner = parse_type_expr(stream)
-        stream.consume(")")
-        return inner
-    if token.isidentifier():
-        name = stream.consume()
-        if name in TYPE_CONSTS:
-            return TypeConst(name=name)
-        if name[0].isupper():
-            return TypeConst(name=name)
-        return TypeVar(name=name)
-    if token == "=":
-        raise ProofCheckError("Unexpected '=' while parsing type")
-    raise ProofCheckError(f"Unexpected token '{token}' while parsing type")
-
-
-def parse_type_application(stream: TokenStream) -> TypeExpr:
-    base = parse_type_atom(stream)
-    args: List[TypeExpr] = []
-    while True:
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_normalized_signature(text: str) -> Tuple[Signature, Signature]:
+    """Parse and normalize `text`, returning `(signature, normalized)`.
+
+    Results are kept in a bounded LRU cache keyed by the signature text, so generated
+    corpora that repeat a signature parse it once.
+    """
+    signature = parse_signature(text)
+    return signature, normalize_signature(signature)
+
+
+# The parsers below keep explicit frame stacks instead of recursing per parenthesis,
+# arrow or lambda, so nesting depth is limited only by memory.
+
+
+class _TypeFrame:
+    __slots__ = ("paren", "lefts", "atoms", "segment_start", "equality")
+
+    def __init__(self, paren: bool):
+        self.paren = paren
+        self.lefts: List[TypeExpr] = []
+        self.atoms: List[TypeExpr] = []
+        self.segment_start = True
+        self.equality: Optional[TypeExpr] = None
+
+
+def _type_application(stream: TokenStream, atoms: List[TypeExpr]) -> TypeExpr:
+    if not atoms:
         token = stream.peek()
-        if token is None or token in {")", "->", "="}:
-            break
-        args.append(parse_type_atom(stream))
-    if not args:
+        if token is None:
+            raise stream.error("Unexpected end of input while parsing type")
+        if token == "=":
+            raise stream.error("Unexpected '=' while parsing type")
+        raise stream.error(f"Unexpected token '{token}' while parsing type")
+    base = atoms[0]
+    if len(atoms) == 1:
         return base
     if isinstance(base, (TypeConst, TypeVar)):
-        return TypeApp(name=base.name, args=tuple(args))
-    raise ProofCheckError("Unexpected type application")
+        return TypeApp(name=base.name, args=tuple(atoms[1:]))
+    raise stream.error("Unexpected type application")
+
+
+def _close_type_frame(stream: TokenStream, frame: _TypeFrame) -> TypeExpr:
+    if frame.equality is not None:
+        return frame.equality
+    result = _type_application(stream, frame.atoms)
+    for left in reversed(frame.lefts):
+        result = Arrow(left=left, right=result)
+    return result
+
+
+def parse_type_expr(stream: TokenStream) -> TypeExpr:
+    frames = [_TypeFrame(paren=False)]
+    while True:
+        frame = frames[-1]
+        if frame.segment_start:
+            frame.segment_start = False
+            if stream.next_separator() == "=":
+                frame.equality = parse_equality_type(stream)
+        token = stream.peek()
+        if frame.equality is None and token == "(":
+            stream.consume("(")
+            frames.append(_TypeFrame(paren=True))
+            continue
+        if frame.equality is None and token == "->":
+            frame.lefts.append(_type_application(stream, frame.atoms))
+            frame.atoms = []
+            frame.segment_start = True
+            stream.consume("->")
+            continue
+        if frame.equality is not None or token is None or token in (")", "="):
+            value = _close_type_frame(stream, frame)
+            if not frame.paren:
+                return value
+            stream.consume(")")
+            frames.pop()
+            frames[-1].atoms.append(value)
+            continue
+        if token.isidentifier():
+            name = stream.consume()
+            if name in TYPE_CONSTS or name[0].isupper():
+                frame.atoms.append(TypeConst(name=name))
+            else:
+                frame.atoms.append(TypeVar(name=name))
+            continue
+        raise stream.error(f"Unexpected token '{token}' while parsing type")
 
 
 def has_top_level_equals(stream: TokenStream) -> bool:
-    depth = 0
-    for token in stream.tokens[stream.index :]:
-        if token == "(":
-            depth += 1
-        elif token == ")":
-            depth -= 1
-        elif token == "=" and depth == 0:
-            return True
-        elif token == "->" and depth == 0:
-            return False
-    return False
+    return stream.next_separator() == "="
 
 
 def parse_equality_type(stream: TokenStream) -> TypeExpr:
     left = parse_term(stream)
     if stream.peek() != "=":
-        raise ProofCheckError("Expected '=' in equality type")
+        raise stream.error("Expected '=' in equality type")
     stream.consume("=")
     right = parse_term(stream)
     return Equality(left=left, right=right)
 
 
+TERM_TERMINATORS = {")", "=", "->", ","}
+
+
+def _term_application(stream: TokenStream, atoms: List[Term]) -> Term:
+    if not atoms:
+        token = stream.peek()
+        if token is None:
+            raise stream.error("Unexpected end of input while parsing term")
+        raise stream.error(f"Unexpected token '{token}' in term")
+    head = atoms[0]
+    if len(atoms) == 1:
+        return head
+    if isinstance(head, (Var, Const)):
+        return App(name=head.name, args=tuple(atoms[1:]))
+    raise stream.error("Unexpected term application")
+
+
 def parse_term(stream: TokenStream) -> Term:
-    term = parse_term_atom(stream)
-    args: List[Term] = []
+    # Each frame is (kind, lambda parameter, atoms); kinds are "top", "paren" and "lambda".
+    frames: List[Tuple[str, Optional[str], List[Term]]] = [("top", None, [])]
     while True:
+        kind, param, atoms = frames[-1]
         token = stream.peek()
-        if token is None:
-            break
-        if token in {")",
-            "=",
-            "->",
-            ",",
-        }:
-            break
-        args.append(parse_term_atom(stream))
-    if args:
-        if isinstance(term, Var):
-            return App(name=term.name, args=tuple(args))
-        if isinstance(term, Const):
-            return App(name=term.name, args=tuple(args))
-        raise ProofCheckError("Unexpected term application")
-    return term
+        if token is None or token in TERM_TERMINATORS:
+            term = _term_application(stream, atoms)
+            if kind == "top":
+                return term
+            frames.pop()
+            if kind == "lambda":
+                frames[-1][2].append(Lambda(param=param, body=term))
+            else:
+                stream.consume(")")
+                frames[-1][2].append(term)
+            continue
+        if token == "(":
+            stream.consume("(")
+            frames.append(("paren", None, []))
+        elif token == "\\":
+            stream.consume("\\")
+            lambda_param = stream.consume()
+            stream.consume("=>")
+            frames.append(("lambda", lambda_param, []))
+        elif token in TERM_CONSTS:
+            atoms.append(Const(name=stream.consume()))
+        elif is_nat_literal(token):
+            atoms.append(NatLit(int(stream.consume())))
+        elif token.isidentifier():
+            atoms.append(Var(name=stream.consume()))
+        else:
+            raise stream.error(f"Unexpected token '{token}' in term")
 
 
 def parse_term_atom(stream: TokenStream) -> Term:
+    """Parse a single term atom: a name, constant, lambda, or parenthesized term."""
     token = stream.peek()
-    if token is None:
-        raise ProofCheckError("Unexpected end of input while parsing term")
     if token == "(":
         stream.consume("(")
         inner = parse_term(stream)
@@ -311,13 +519,16 @@ def parse_term_atom(stream: TokenStream) -> Term:
         stream.consume("\\")
         param = stream.consume()
         stream.consume("=>")
-        body = parse_term(stream)
-        return Lambda(param=param, body=body)
+        return Lambda(param=param, body=parse_term(stream))
+    if token is None:
+        raise stream.error("Unexpected end of input while parsing term")
     if token in TERM_CONSTS:
         return Const(name=stream.consume())
+    if is_nat_literal(token):
+        return NatLit(int(stream.consume()))
     if token.isidentifier():
         return Var(name=stream.consume())
-    raise ProofCheckError(f"Unexpected token '{token}' in term")
+    raise stream.error(f"Unexpected token '{token}' in term")
 
 
 def flatten_arrow(type_expr: TypeExpr) -> Tuple[List[TypeExpr], TypeExpr]:
@@ -334,48 +545,219 @@ def flatten_arrow(type_expr: TypeExpr) -> Tuple[List[TypeExpr], TypeExpr]:
 # -----------------------------
 
 
-def normalize_signature(signature: Signature) -> Signature:
-    type_var_map: Dict[str, str] = {}
-    term_var_map: Dict[str, str] = {}
+class _Renamer:
+    """Renaming rules shared by `normalize_signature` and `goal_key`.
+
+    Type variables and lambda binders are renamed to `<prefix><n>`. Free term variables are
+    either numbered too (`free_prefix`) or looked up in the scope and otherwise kept.
+    """
+
+    __slots__ = ("type_names", "type_prefix", "bound_prefix", "free_prefix", "rename_heads")
+
+    def __init__(self, type_prefix: str, bound_prefix: str, free_prefix: Optional[str], rename_heads: bool):
+        self.type_names: Dict[str, str] = {}
+        self.type_prefix = type_prefix
+        self.bound_prefix = bound_prefix
+        self.free_prefix = free_prefix
+        self.rename_heads = rename_heads
+
+    def type_var(self, name: str) -> str:
+        return self.type_names.setdefault(name, f"{self.type_prefix}{len(self.type_names)}")
+
+    def var(self, name: str, scope: Dict[str, str]) -> str:
+        if self.free_prefix is None:
+            return scope.get(name, name)
+        return scope.setdefault(name, f"{self.free_prefix}{len(scope)}")
+
+    def head(self, name: str, scope: Dict[str, str]) -> str:
+        return scope.get(name, name) if self.rename_heads else name
+
+
+# Build instructions for `_rename`; each pops its children's results off the value stack.
+_BUILD_APP, _BUILD_TYPE_APP, _BUILD_EQUALITY, _BUILD_ARROW, _BUILD_LAMBDA = range(5)
+
+
+def _closed_numeral(term: Term) -> Optional[int]:
+    """Return the value of `term` if it is `Z` or a literal."""
+    if type(term) is NatLit:
+        return term.value
+    if type(term) is Const and term.name == "Z":
+        return 0
+    return None
+
+
+def _rename(root: Node, scope: Dict[str, str], renamer: _Renamer) -> Node:
+    """Rebuild a type or term bottom-up with `renamer`, using an explicit stack.
+
+    Children are visited left to right, exactly like a recursive walk, so names are
+    numbered in the same order; scopes are copied when entering a lambda, as before.
+    Closed numerals (`Z`, `S` chains ending in `Z` or a literal) become `NatLit`s, so
+    `2` and `S (S Z)` normalize alike.
+    """
+    results: List[Node] = []
+    stack: List[tuple] = [(root, scope)]
+    while stack:
+        task = stack.pop()
+        node = task[0]
+        if type(node) is int:
+            _, data, arity = task
+            start = len(results) - arity
+            children = results[start:]
+            del results[start:]
+            if node == _BUILD_APP:
+                results.append(App(data, tuple(children)))
+            elif node == _BUILD_TYPE_APP:
+                results.append(TypeApp(data, tuple(children)))
+            elif node == _BUILD_EQUALITY:
+                results.append(Equality(children[0], children[1]))
+            elif node == _BUILD_ARROW:
+                results.append(Arrow(children[0], children[1]))
+            else:
+                results.append(Lambda(data, children[0]))
+            continue
+        current = task[1]
+        kind = type(node)
+        if kind is App and node.name == "S" and len(node.args) == 1 and renamer.head("S", current) == "S":
+            # Walk the whole run of S once: fold it if it ends in a numeral, else rebuild it.
+            run = 0
+            base = node
+            while type(base) is App and base.name == "S" and len(base.args) == 1:
+                run += 1
+                base = base.args[0]
+            value = _closed_numeral(base)
+            if value is not None:
+                results.append(NatLit(value + run))
+                continue
+            stack.extend([(_BUILD_APP, "S", 1)] * run)
+            stack.append((base, current))
+            continue
+        if kind is Const and node.name == "Z":
+            results.append(NatLit(0))
+        elif kind is Const or kind is TypeConst or kind is NatLit:
+            results.append(node)
+        elif kind is Var:
+            results.append(Var(renamer.var(node.name, current)))
+        elif kind is App:
+            stack.append((_BUILD_APP, renamer.head(node.name, current), len(node.args)))
+            stack.extend((arg, current) for arg in reversed(node.args))
+        elif kind is Lambda:
+            inner = dict(current)
+            inner[node.param] = f"{renamer.bound_prefix}{len(current)}"
+            stack.append((_BUILD_LAMBDA, inner[node.param], 1))
+            stack.append((node.body, inner))
+        elif kind is TypeVar:
+            results.append(TypeVar(renamer.type_var(node.name)))
+        elif kind is TypeApp:
+            stack.append((_BUILD_TYPE_APP, node.name, len(node.args)))
+            stack.extend((arg, current) for arg in reversed(node.args))
+        elif kind is Equality:
+            stack.append((_BUILD_EQUALITY, None, 2))
+            stack.append((node.right, current))
+            stack.append((node.left, current))
+        elif kind is Arrow:
+            stack.append((_BUILD_ARROW, None, 2))
+            stack.append((node.right, current))
+            stack.append((node.left, current))
+        elif isinstance(node, Term):
+            raise ProofCheckError(f"Unknown term: {node}")
+        else:
+            raise ProofCheckError(f"Unknown type expression: {node}")
+    return results[0]
 
-    def normalize_type(type_expr: TypeExpr) -> TypeExpr:
-        if isinstance(type_expr, TypeConst):
-            return type_expr
-        if isinstance(type_expr, TypeVar):
-            name = type_var_map.setdefault(type_expr.name, f"t{len(type_var_map)}")
-            return TypeVar(name=name)
-        if isinstance(type_expr, TypeApp):
-            return TypeApp(name=type_expr.name, args=tuple(normalize_type(arg) for arg in type_expr.args))
-        if isinstance(type_expr, Equality):
-            return Equality(
-                left=normalize_term(type_expr.left, term_var_map),
-                right=normalize_term(type_expr.right, term_var_map),
-            )
-        if isinstance(type_expr, Arrow):
-            return Arrow(left=normalize_type(type_expr.left), right=normalize_type(type_expr.right))
-        raise ProofCheckError(f"Unknown type expression: {type_expr}")
 
+def normalize_signature(signature: Signature) -> Signature:
+    renamer = _Renamer("t", "v", "v", rename_heads=False)
+    term_var_map: Dict[str, str] = {}
     normalized_params = []
     for param in signature.params:
         term_var_map[param.name] = f"p{len(term_var_map)}"
-        normalized_params.append(Param(name=term_var_map[param.name], type_expr=normalize_type(param.type_expr)))
-    normalized_result = normalize_type(signature.result)
+        normalized_params.append(
+            Param(name=term_var_map[param.name], type_expr=_rename(param.type_expr, term_var_map, renamer))
+        )
+    normalized_result = _rename(signature.result, term_var_map, renamer)
     return Signature(params=tuple(normalized_params), result=normalized_result)
 
 
 def normalize_term(term: Term, var_map: Dict[str, str]) -> Term:
-    if isinstance(term, Const):
-        return term
-    if isinstance(term, Var):
-        name = var_map.setdefault(term.name, f"v{len(var_map)}")
-        return Var(name=name)
-    if isinstance(term, App):
-        return App(name=term.name, args=tuple(normalize_term(arg, var_map) for arg in term.args))
-    if isinstance(term, Lambda):
-        local_map = dict(var_map)
-        local_map[term.param] = f"v{len(var_map)}"
-        return Lambda(param=local_map[term.param], body=normalize_term(term.body, local_map))
-    raise ProofCheckError(f"Unknown term: {term}")
+    return _rename(term, var_map, _Renamer("t", "v", "v", rename_heads=False))
+
+
+def canonical_term(term: Term) -> Term:
+    """Return `term` with closed numerals folded and lambda binders renamed; free names are kept."""
+    return _rename(term, {}, _Renamer("#t", "#b", None, rename_heads=True))
+
+
+def goal_key(signature: Signature, proof_term: Optional[Term] = None) -> Tuple[Signature, Optional[Term]]:
+    """Return a key that is equal for goals identical up to renaming of bound names.
+
+    Unlike `normalize_signature`, free variables (and parameters that shadow a builtin
+    callable) keep their names, so two goals with the same key also evaluate identically
+    under `Refl`. Renamed binders get names that cannot appear in source text.
+    """
+    renamer = _Renamer("#t", "#b", None, rename_heads=True)
+    bound: Dict[str, str] = {}
+    params = []
+    for index, param in enumerate(signature.params):
+        if param.name not in CALLABLES:
+            bound[param.name] = f"#p{index}"
+        params.append(Param(bound.get(param.name, param.name), _rename(param.type_expr, bound, renamer)))
+    key_signature = Signature(tuple(params), _rename(signature.result, bound, renamer))
+    return key_signature, _rename(proof_term, bound, renamer) if proof_term is not None else None
+
+
+def fingerprint_normalized(signature: Signature) -> str:
+    """Return a stable digest of an already normalized signature's structure.
+
+    Two signatures share a fingerprint exactly when their normalized forms are equal, so
+    the digest can key a hash index of lemmas.
+    """
+    parts: List[str] = []
+    stack: List[object] = [param for param in reversed(signature.params)]
+    stack.insert(0, signature.result)
+    stack.append(None)
+    # Prefix serialization with explicit arities; `None` marks the params/result boundary.
+    while stack:
+        node = stack.pop()
+        if node is None:
+            parts.append("|")
+        elif isinstance(node, Param):
+            parts.append(f"P:{node.name}")
+            stack.append(node.type_expr)
+        elif isinstance(node, TypeConst):
+            parts.append(f"C:{node.name}")
+        elif isinstance(node, TypeVar):
+            parts.append(f"V:{node.name}")
+        elif isinstance(node, TypeApp):
+            parts.append(f"A:{node.name}/{len(node.args)}")
+            stack.extend(reversed(node.args))
+        elif isinstance(node, Equality):
+            parts.append("E")
+            stack.append(node.right)
+            stack.append(node.left)
+        elif isinstance(node, Arrow):
+            parts.append(">")
+            stack.append(node.right)
+            stack.append(node.left)
+        elif isinstance(node, Const):
+            parts.append(f"c:{node.name}")
+        elif isinstance(node, Var):
+            parts.append(f"v:{node.name}")
+        elif isinstance(node, App):
+            parts.append(f"a:{node.name}/{len(node.args)}")
+            stack.extend(reversed(node.args))
+        elif isinstance(node, NatLit):
+            parts.append(f"n:{node.value}")
+        elif isinstance(node, Lambda):
+            parts.append(f"l:{node.param}")
+            stack.append(node.body)
+        else:
+            raise ProofCheckError(f"Cannot fingerprint {node!r}")
+    return hashlib.blake2b(" ".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def signature_fingerprint(signature: Signature) -> str:
+    """Return the structural fingerprint of `signature` after alpha-normalization."""
+    return fingerprint_normalized(normalize_signature(signature))
 
 
 # -----------------------------
@@ -383,123 +765,501 @@ def normalize_term(term: Term, var_map: Dict[str, str]) -> Term:
 # -----------------------------
 
 
-@dataclass(frozen=True)
-class Value:
-    kind: str
-    data: object
+# Runtime values are unboxed ints/bools or the list structures from `researchproof.values`.
+Value = RuntimeValue
+# Compiled code maps the values of a term's variable slots to the term's value.
+Code = Callable[[Tuple[Value, ...]], Value]
+
+
+def _truthy(value: Value) -> bool:
+    return values.truthy(value)
+
+
+# `mult` and `pow` check the size of their result before computing it, since one huge
+# product would run as a single native operation that no limit could interrupt.
+def _mult(a: Value, b: Value) -> Value:
+    if type(a) is int and type(b) is int:
+        limits.check_int_bits(a.bit_length() + b.bit_length())
+    return a * b
+
+
+def _pow(a: Value, b: Value) -> Value:
+    if type(a) is int and type(b) is int and a > 1:
+        # `(a - 1).bit_length()` is log2(a) rounded up.
+        limits.check_int_bits(b * (a - 1).bit_length())
+    return a**b
+
+
+# Builtin functions by name, with their arity. `ifThenElse`, `and` and `or` also have lazy
+# forms in the evaluators below; these strict entries serve `apply_function`.
+BUILTINS: Dict[str, Tuple[int, Callable[..., Value]]] = {
+    "S": (1, lambda n: n + 1),
+    "Cons": (2, values.cons),
+    "plus": (2, lambda a, b: a + b),
+    "mult": (2, lambda a, b: _mult(a, b)),
+    "pow": (2, lambda a, b: _pow(a, b)),
+    "pred": (1, lambda n: max(0, n - 1)),
+    "double": (1, lambda n: n * 2),
+    "isZero": (1, lambda n: n == 0),
+    "not": (1, lambda b: not _truthy(b)),
+    "and": (2, lambda a, b: _truthy(a) and _truthy(b)),
+    "or": (2, lambda a, b: _truthy(a) or _truthy(b)),
+    "xor": (2, lambda a, b: _truthy(a) ^ _truthy(b)),
+    "ifThenElse": (3, lambda c, t, e: t if _truthy(c) else e),
+    "leq": (2, lambda a, b: a <= b),
+    "lt": (2, lambda a, b: a < b),
+    "eqNat": (2, lambda a, b: a == b),
+    "min": (2, min),
+    "max": (2, max),
+    "sub": (2, lambda a, b: max(0, a - b)),
+    "even": (1, lambda n: n % 2 == 0),
+    "odd": (1, lambda n: n % 2 == 1),
+    "append": (2, values.append),
+    "length": (1, len),
+    "reverse": (1, values.reverse),
+    "snoc": (2, values.snoc),
+    "concat": (1, values.concat),
+    "replicate": (2, values.replicate),
+    "map": (2, lambda f, xs: values.map_list(f, xs, apply_callable)),
+    "filter": (2, lambda p, xs: values.filter_list(p, xs, apply_callable)),
+}
+LAZY_BUILTINS = {"ifThenElse", "and", "or"}
+
+
+def _reduce_open(name: str, args: Sequence[Value]) -> Value:
+    # Imported here because normalization by evaluation builds on this module.
+    from researchproof.nbe import reduce_open
+
+    return reduce_open(name, args)
+
+
+def apply_function(name: str, args: Sequence[Value]) -> Value:
+    """Apply builtin `name`; names that are not builtins are free function variables."""
+    entry = BUILTINS.get(name)
+    if entry is None:
+        return _reduce_open(name, args)
+    arity, function = entry
+    if len(args) != arity:
+        raise ProofCheckError(f"'{name}' expects {arity} argument(s), got {len(args)}")
+    if any(type(value) in OPEN_TYPES for value in args):
+        return _reduce_open(name, args)
+    try:
+        return function(*args)
+    except Stuck:
+        return _reduce_open(name, args)
+
+
+def apply_callable(func: Value, arg: Value) -> Value:
+    limits.charge()
+    if type(func) is Closure:
+        call = func.call
+        if call is None:
+            call = compile_term(func.term.body, (func.term.param,))
+        return call(func.captured + (arg,))
+    if type(func) is Builtin:
+        return apply_function(func.name, (arg,))
+    if type(func) is Neutral:
+        from researchproof.nbe import apply_neutral
+
+        return apply_neutral(func, arg)
+    if isinstance(func, (int, ListValue)) or type(func) in OPEN_TYPES:
+        raise ProofCheckError("Non-callable value used as function")
+    raise ProofCheckError("Unsupported callable")
+
 
+def _apply_variable(func: Value, args: Sequence[Value]) -> Value:
+    """Apply a function held in a variable, e.g. `g` in `\\g => g 1`, one argument at a time."""
+    for arg in args:
+        func = apply_callable(func, arg)
+    return func
 
-def evaluate(term: Term, env: Dict[str, Value]) -> Value:
+
+def _evaluate_leaf(term: Term, env: Mapping[str, Value]) -> Value:
     if isinstance(term, Const):
         if term.name == "Z":
-            return Value("Nat", 0)
+            return 0
         if term.name == "True":
-            return Value("Bool", True)
+            return True
         if term.name == "False":
-            return Value("Bool", False)
+            return False
         if term.name == "Nil":
-            return Value("List", [])
+            return NIL
         raise ProofCheckError(f"Unknown constant {term.name}")
+    if isinstance(term, NatLit):
+        return term.value
     if isinstance(term, Var):
         if term.name in env:
             return env[term.name]
         if term.name in CALLABLES:
-            return Value("Callable", term.name)
-        return Value("Unknown", term.name)
+            return Builtin(term.name)
+        return Neutral(term)
     if isinstance(term, Lambda):
-        return Value("Lambda", term)
-    if isinstance(term, App):
-        args = [evaluate(arg, env) for arg in term.args]
-        return apply_function(term.name, args)
+        captured = _captured_names(term, env)
+        return Closure(term, compile_term(term.body, captured + (term.param,)), tuple(env[name] for name in captured))
     raise ProofCheckError(f"Unknown term during evaluation: {term}")
 
 
-def apply_function(name: str, args: Sequence[Value]) -> Value:
-    if any(value.kind == "Unknown" for value in args):
-        return Value("Unknown", name)
-
-    if name == "S":
-        return Value("Nat", args[0].data + 1)
-    if name == "Cons":
-        return Value("List", [args[0]] + list(args[1].data))
-    if name == "plus":
-        return Value("Nat", args[0].data + args[1].data)
-    if name == "mult":
-        return Value("Nat", args[0].data * args[1].data)
-    if name == "pow":
-        return Value("Nat", args[0].data ** args[1].data)
-    if name == "pred":
-        return Value("Nat", max(0, args[0].data - 1))
-    if name == "double":
-        return Value("Nat", args[0].data * 2)
-    if name == "isZero":
-        return Value("Bool", args[0].data == 0)
-    if name == "not":
-        return Value("Bool", not args[0].data)
-    if name == "and":
-        return Value("Bool", args[0].data and args[1].data)
-    if name == "or":
-        return Value("Bool", args[0].data or args[1].data)
-    if name == "xor":
-        return Value("Bool", bool(args[0].data) ^ bool(args[1].data))
+def _s_run(term: Term) -> Tuple[int, Term]:
+    """Split `S (S (... t))` into the number of S applications and `t`."""
+    run = 0
+    while type(term) is App and term.name == "S" and len(term.args) == 1:
+        run += 1
+        term = term.args[0]
+    return run, term
+
+
+def _add_successors(value: Value, run: int) -> Value:
+    if type(value) in OPEN_TYPES:
+        from researchproof.nbe import successors
+
+        return successors(value, run)
+    return value + run
+
+
+def _is_lazy(term: App) -> bool:
+    return term.name in LAZY_BUILTINS and len(term.args) == BUILTINS[term.name][0]
+
+
+# Markers on the tree evaluator's stack; see `_evaluate_tree`.
+_APPLY, _SUCCESSORS, _BRANCH, _TRUTH, _CALL = range(5)
+
+
+def _evaluate_tree(term: Term, env: Mapping[str, Value]) -> Value:
+    """Evaluate `term` with an explicit stack, so depth is not limited by Python.
+
+    Used for terms too deep to compile. Arguments are evaluated left to right before their
+    function is applied; `ifThenElse`, `and` and `or` evaluate only the arguments they
+    need, like their compiled forms.
+    """
+    results: List[Value] = []
+    # Terms are expanded in place; tuples are markers that consume evaluated results.
+    stack: List[object] = [term]
+    while stack:
+        item = stack.pop()
+        if type(item) is tuple:
+            tag = item[0]
+            if tag == _APPLY or tag == _CALL:
+                _, name, arity = item
+                start = len(results) - arity
+                args = results[start:]
+                del results[start:]
+                if tag == _APPLY:
+                    results.append(apply_function(name, args))
+                else:
+                    results.append(_apply_variable(env[name], args))
+            elif tag == _SUCCESSORS:
+                results[-1] = _add_successors(results[-1], item[1])
+            elif tag == _BRANCH:
+                # The first argument of a lazy builtin has just been evaluated.
+                app = item[1]
+                first = results[-1]
+                if type(first) in OPEN_TYPES:
+                    # Undecided: evaluate the other arguments and leave the result neutral.
+                    stack.append((_APPLY, app.name, len(app.args)))
+                    stack.extend(reversed(app.args[1:]))
+                    continue
+                results.pop()
+                if app.name == "ifThenElse":
+                    stack.append(app.args[1] if _truthy(first) else app.args[2])
+                elif _truthy(first) == (app.name == "or"):
+                    results.append(app.name == "or")
+                else:
+                    stack.append((_TRUTH, app.name))
+                    stack.append(app.args[1])
+            else:
+                value = results[-1]
+                if type(value) not in OPEN_TYPES:
+                    results[-1] = _truthy(value)
+        elif type(item) is App:
+            if item.name == "S" and len(item.args) == 1:
+                run, base = _s_run(item)
+                stack.append((_SUCCESSORS, run))
+                stack.append(base)
+            elif item.name in env:
+                stack.append((_CALL, item.name, len(item.args)))
+                stack.extend(reversed(item.args))
+            elif _is_lazy(item):
+                stack.append((_BRANCH, item))
+                stack.append(item.args[0])
+            else:
+                stack.append((_APPLY, item.name, len(item.args)))
+                stack.extend(reversed(item.args))
+        else:
+            results.append(_evaluate_leaf(item, env))
+    return results[0]
+
+
+# Deeper terms are evaluated by `_evaluate_tree`: compiled code nests one Python call per
+# level, and runs of `S` count as a single level.
+COMPILE_DEPTH_LIMIT = 200
+COMPILE_CACHE_SIZE = 8192
+# Values of closed terms kept by `EVALUATION_MEMO`.
+EVALUATION_MEMO_SIZE = 65536
+
+
+@dataclass(frozen=True)
+class MemoStats:
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class EvaluationMemo:
+    """Bounded LRU map from closed terms to their values.
+
+    Terms are interned, so a shared subterm such as `mult (S Z) (S Z)` is one key however
+    many goals mention it, and it is evaluated once per run (until evicted). Entries are
+    filled in dependency order because compiled code asks for its subterms' values first.
+    """
+
+    def __init__(self, maxsize: int = EVALUATION_MEMO_SIZE):
+        self.maxsize = maxsize
+        # Each value is stored with the evaluation steps it cost.
+        self._values: "OrderedDict[Term, Tuple[Value, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def value(self, term: Term, code: Code) -> Value:
+        """Return the value of closed `term`, running `code` only if it is not memoized.
+
+        Either way the current budget is charged the steps it took to evaluate `term`.
+        """
+        entries = self._values
+        budget = limits.current_budget()
+        # Locked as well: the LRU update and the counters are read-modify-writes, which
+        # free-threaded builds do not make atomic.
+        with self._lock:
+            found = entries.get(term)
+            if found is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                entries.move_to_end(term)
+        if found is not None:
+            value, cost = found
+            budget.charge(cost)
+            return value
+        budget.charge()
+        before = budget.steps
+        value = code(())
+        if self.maxsize > 0:
+            cost = budget.steps - before + 1
+            with self._lock:
+                entries[term] = (value, cost)
+                while len(entries) > self.maxsize:
+                    entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def stats(self) -> MemoStats:
+        with self._lock:
+            return MemoStats(self.hits, self.misses, self.evictions, len(self._values))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+EVALUATION_MEMO = EvaluationMemo()
+
+
+def _exceeds_depth(term: Term, limit: int) -> bool:
+    stack: List[Tuple[Term, int]] = [(term, 1)]
+    while stack:
+        node, depth = stack.pop()
+        if depth > limit:
+            return True
+        if type(node) is App:
+            _, node = _s_run(node)
+            if type(node) is App:
+                stack.extend((arg, depth + 1) for arg in node.args)
+        elif type(node) is Lambda:
+            stack.append((node.body, depth + 1))
+    return False
+
+
+@functools.lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def compile_term(term: Term, params: Tuple[str, ...] = ()) -> Code:
+    """Compile `term` into a Python closure over the variable slots named by `params`.
+
+    Variables are resolved to slot indexes or constants once, builtins are looked up once,
+    and lambda bodies are compiled (and cached) when the enclosing term is; a lambda's
+    closure captures the values of the enclosing slots its body uses. Because terms are
+    interned, the cache is keyed by identity. Closed terms (no `params`) and subterms that
+    use none of them look their values up in `EVALUATION_MEMO`, so a subterm shared across
+    goals is normalized once.
+    """
+    if _exceeds_depth(term, COMPILE_DEPTH_LIMIT):
+        code: Code = lambda slots: _evaluate_tree(term, dict(zip(params, slots)))
+        return code if params else _memoized(term, code)
+    if not params:
+        return _compile_closed(term)
+    return _compile(term, {name: index for index, name in enumerate(params)})
+
+
+@functools.lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def _compile_closed(term: Term) -> Code:
+    # Callers have checked the depth: the root through `compile_term`, subterms through
+    # their parent, so each closed subterm is compiled (and walked) once.
+    return _memoized(term, _compile(term, {}))
+
+
+@functools.lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def _free_names(term: Term) -> FrozenSet[str]:
+    """Names `term` uses without binding them, as variables or as applied heads."""
+    names: Set[str] = set()
+    stack: List[Tuple[Term, FrozenSet[str]]] = [(term, frozenset())]
+    while stack:
+        node, bound = stack.pop()
+        kind = type(node)
+        if kind is Var or kind is App:
+            if node.name not in bound:
+                names.add(node.name)
+            if kind is App:
+                stack.extend((arg, bound) for arg in node.args)
+        elif kind is Lambda:
+            stack.append((node.body, bound | {node.param}))
+    return frozenset(names)
+
+
+def _captured_names(term: Lambda, scope: Iterable[str]) -> Tuple[str, ...]:
+    """The names in `scope`, in order, that the body of `term` refers to."""
+    free = _free_names(term)
+    return tuple(name for name in scope if name in free)
+
+
+def reset_evaluation_caches() -> None:
+    """Drop compiled code and memoized values, e.g. between benchmark runs."""
+    compile_term.cache_clear()
+    _compile_closed.cache_clear()
+    _free_names.cache_clear()
+    EVALUATION_MEMO.clear()
+
+
+def _constant(value: Value) -> Code:
+    return lambda slots: value
+
+
+def _memoized(term: Term, code: Code) -> Code:
+    return lambda values_: EVALUATION_MEMO.value(term, code)
+
+
+def _compile_child(term: Term, slots: Dict[str, int]) -> Code:
+    # Closed applications go through the cache so that shared subterms share their memo.
+    if type(term) is App and (not slots or slots.keys().isdisjoint(_free_names(term))):
+        return _compile_closed(term)
+    return _compile(term, slots)
+
+
+def _compile(term: Term, slots: Dict[str, int]) -> Code:
+    kind = type(term)
+    if kind is Var:
+        index = slots.get(term.name)
+        if index is not None:
+            return lambda values_: values_[index]
+        return _constant(Builtin(term.name) if term.name in CALLABLES else Neutral(term))
+    if kind is Lambda:
+        # The body's slots are the enclosing binders it uses, then the lambda's own.
+        captured = _captured_names(term, slots)
+        call = compile_term(term.body, captured + (term.param,))
+        if not captured:
+            return _constant(Closure(term, call))
+        indexes = [slots[name] for name in captured]
+        return lambda values_: Closure(term, call, tuple([values_[index] for index in indexes]))
+    if kind is not App:
+        return _constant(_evaluate_leaf(term, {}))
+
+    name = term.name
+    if name == "S" and len(term.args) == 1:
+        run, base = _s_run(term)
+        base_code = _compile_child(base, slots)
+        return lambda values_: _add_successors(base_code(values_), run)
+
+    codes = [_compile_child(arg, slots) for arg in term.args]
+    index = slots.get(name)
+    if index is not None:
+        return lambda values_: _apply_variable(values_[index], [code(values_) for code in codes])
+    if _is_lazy(term):
+        return _compile_lazy(name, codes)
+    entry = BUILTINS.get(name)
+    if entry is None or entry[0] != len(codes):
+        # Free function or wrong arity: `apply_function` builds the neutral term or reports it.
+        return lambda values_: apply_function(name, [code(values_) for code in codes])
+    function = entry[1]
+    if len(codes) == 1:
+        (first,) = codes
+
+        def apply_one(values_: Tuple[Value, ...]) -> Value:
+            a = first(values_)
+            if type(a) not in OPEN_TYPES:
+                try:
+                    return function(a)
+                except Stuck:
+                    pass
+            return _reduce_open(name, (a,))
+
+        return apply_one
+    if len(codes) == 2:
+        first, second = codes
+
+        def apply_two(values_: Tuple[Value, ...]) -> Value:
+            a = first(values_)
+            b = second(values_)
+            if type(a) not in OPEN_TYPES and type(b) not in OPEN_TYPES:
+                try:
+                    return function(a, b)
+                except Stuck:
+                    pass
+            return _reduce_open(name, (a, b))
+
+        return apply_two
+
+    def apply_many(values_: Tuple[Value, ...]) -> Value:
+        args = [code(values_) for code in codes]
+        return apply_function(name, args)
+
+    return apply_many
+
+
+def _compile_lazy(name: str, codes: List[Code]) -> Code:
     if name == "ifThenElse":
-        return args[1] if args[0].data else args[2]
-    if name == "leq":
-        return Value("Bool", args[0].data <= args[1].data)
-    if name == "lt":
-        return Value("Bool", args[0].data < args[1].data)
-    if name == "eqNat":
-        return Value("Bool", args[0].data == args[1].data)
-    if name == "min":
-        return Value("Nat", min(args[0].data, args[1].data))
-    if name == "max":
-        return Value("Nat", max(args[0].data, args[1].data))
-    if name == "sub":
-        return Value("Nat", max(0, args[0].data - args[1].data))
-    if name == "even":
-        return Value("Bool", args[0].data % 2 == 0)
-    if name == "odd":
-        return Value("Bool", args[0].data % 2 == 1)
-    if name == "append":
-        return Value("List", list(args[0].data) + list(args[1].data))
-    if name == "length":
-        return Value("Nat", len(args[0].data))
-    if name == "reverse":
-        return Value("List", list(reversed(args[0].data)))
-    if name == "snoc":
-        return Value("List", list(args[0].data) + [args[1]])
-    if name == "concat":
-        concat_list: List[Value] = []
-        for sublist in args[0].data:
-            concat_list.extend(sublist.data)
-        return Value("List", concat_list)
-    if name == "replicate":
-        return Value("List", [args[1]] * args[0].data)
-    if name == "map":
-        func = args[0]
-        return Value("List", [apply_callable(func, item) for item in args[1].data])
-    if name == "filter":
-        func = args[0]
-        filtered = []
-        for item in args[1].data:
-            predicate = apply_callable(func, item)
-            if predicate.data:
-                filtered.append(item)
-        return Value("List", filtered)
-    raise ProofCheckError(f"Unknown function '{name}' in evaluation")
+        condition, then_code, else_code = codes
 
+        def if_then_else(values_: Tuple[Value, ...]) -> Value:
+            test = condition(values_)
+            if type(test) in OPEN_TYPES:
+                return _reduce_open(name, (test, then_code(values_), else_code(values_)))
+            return then_code(values_) if _truthy(test) else else_code(values_)
+
+        return if_then_else
+
+    first, second = codes
+    # `and` stops at a false first argument, `or` at a true one.
+    stop_on = name == "or"
+
+    def short_circuit(values_: Tuple[Value, ...]) -> Value:
+        a = first(values_)
+        if type(a) in OPEN_TYPES:
+            return _reduce_open(name, (a, second(values_)))
+        if _truthy(a) == stop_on:
+            return stop_on
+        # `and True b = b` and `or False b = b`, also for an open `b`.
+        b = second(values_)
+        return b if type(b) in OPEN_TYPES else _truthy(b)
+
+    return short_circuit
 
-def apply_callable(func: Value, arg: Value) -> Value:
-    if func.kind == "Callable":
-        return apply_function(func.data, [arg])
-    if func.kind == "Lambda":
-        lambda_term: Lambda = func.data
-        return evaluate(lambda_term.body, {lambda_term.param: arg})
-    if func.kind == "Unknown":
-        return Value("Unknown", "callable")
-    if func.kind == "Nat" or func.kind == "Bool" or func.kind == "List":
-        raise ProofCheckError("Non-callable value used as function")
-    raise ProofCheckError("Unsupported callable")
+
+def evaluate(term: Term, env: Mapping[str, Value]) -> Value:
+    """Evaluate `term` with `env` binding free variables, via its cached compiled code."""
+    return compile_term(term, tuple(env))(tuple(env.values()))
 
 
 # -----------------------------
@@ -514,46 +1274,300 @@ def build_lemma_map() -> Dict[str, Signature]:
     return lemmas
 
 
+def _evaluate_open(term: Term, env: Mapping[str, Value]) -> Value:
+    # Binding only the names `term` uses lets goals share compiled code and memoized values.
+    free = _free_names(term)
+    return evaluate(term, {name: value for name, value in env.items() if name in free})
+
+
 def check_refl(signature: Signature) -> None:
     if not isinstance(signature.result, Equality):
         raise ProofCheckError("Refl can only prove equality signatures")
-    left = evaluate(signature.result.left, {})
-    right = evaluate(signature.result.right, {})
-    if left != right:
+    # Each parameter is its own unknown, bound ahead of the builtins it may shadow and
+    # named so that no builtin, lambda binder or free name can stand for it.
+    env = {param.name: Neutral(Var(f"#x{index}")) for index, param in enumerate(signature.params)}
+    left = _evaluate_open(signature.result.left, env)
+    right = _evaluate_open(signature.result.right, env)
+    if not values_equal(left, right):
         raise ProofCheckError(
             f"Refl failed: {signature.result.left} does not normalize to {signature.result.right}"
         )
 
 
-def check_lemma(signature: Signature, lemma_signature: Signature) -> None:
-    normalized_sig = normalize_signature(signature)
-    normalized_lemma = normalize_signature(lemma_signature)
-    if normalized_sig != normalized_lemma:
-        raise ProofCheckError("Theorem signature does not match lemma signature")
+def check_lemma(
+    signature: Signature,
+    lemma_signature: Signature,
+    normalized_lemma: Optional[Signature] = None,
+    normalized_goal: Optional[Signature] = None,
+    name: str = "lemma",
+    args: Sequence[Term] = (),
+) -> None:
+    """Check that the lemma, applied to `args`, proves `signature`.
+
+    A theorem that restates the lemma up to renaming is accepted by one identity check;
+    otherwise the lemma is instantiated with `args` and by matching (`researchproof.matching`).
+    """
+    if not args:
+        if normalized_goal is None:
+            normalized_goal = normalize_signature(signature)
+        if normalized_lemma is None:
+            normalized_lemma = normalize_signature(lemma_signature)
+        # Interned nodes: this is an identity check, not a tree walk.
+        if normalized_goal is normalized_lemma:
+            return
+    # Imported here because lemma matching builds on this module.
+    from researchproof.matching import match_lemma
+
+    match_lemma(name, signature, lemma_signature, args)
+
+
+def check_auto(
+    signature: Signature,
+    lemma_map: Mapping[str, Signature],
+    normalized_goal: Optional[Signature] = None,
+) -> str:
+    """Find a catalog lemma proving `signature` by fingerprint lookup and return its name."""
+    find = getattr(lemma_map, "find", None)
+    if find is None:
+        raise ProofCheckError("'proof auto' requires a LemmaCatalog")
+    if normalized_goal is None:
+        normalized_goal = normalize_signature(signature)
+    for name in find(fingerprint_normalized(normalized_goal)):
+        # Guard against digest collisions before trusting the index.
+        if lemma_map.normalized(name) is normalized_goal:
+            return name
+    raise ProofCheckError("No catalog lemma matches the theorem signature")
+
+
+PROOF_KEYWORDS = {"Refl", "auto", "check", "decide", "ring", "lists"}
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_proof_term(text: str) -> Term:
+    return parse_term(TokenStream.from_text(text))
+
+
+def check_theorem(
+    theorem: Theorem,
+    lemma_map: Mapping[str, Signature],
+    proven: Optional[Set[Hashable]] = None,
+) -> None:
+    """Check one theorem, raising `ProofCheckError` if its proof does not hold.
+
+    `proven` is an optional per-run set of goal keys that already passed against the same
+    `lemma_map`; goals identical up to renaming of bound names are then checked once.
+    Failures are not memoized so that every error message names the theorem's own terms.
+    The check gets a fresh budget of the active `limits.Limits`; going over it raises
+    `ResourceLimitError`.
+    """
+    saved = limits.begin_theorem()
+    try:
+        profiler = _PROFILER
+        if profiler is not None:
+            _check_theorem_profiled(theorem, lemma_map, proven, profiler)
+        else:
+            _check_theorem(theorem, lemma_map, proven)
+    finally:
+        limits.end_theorem(saved)
+
+
+def _check_theorem(theorem: Theorem, lemma_map: Mapping[str, Signature], proven: Optional[Set[Hashable]]) -> None:
+    signature, normalized_goal = parse_normalized_signature(theorem.signature)
+    proof_expr = theorem.proof
+    proof_term = None if proof_expr in PROOF_KEYWORDS else parse_proof_term(proof_expr)
+    key = None
+    if proven is not None:
+        key = (goal_key(signature, proof_term), proof_expr if proof_term is None else None)
+        if key in proven:
+            return
+
+    _check_proof(signature, normalized_goal, proof_expr, proof_term, lemma_map)
+    if key is not None:
+        proven.add(key)
+
+
+# The phase a proof's check is reported under when profiling; lemma names are "lemma".
+PROOF_PHASES = {
+    "Refl": "evaluate",
+    "check": "evaluate",
+    "auto": "lemma",
+    "decide": "decide",
+    "ring": "decide",
+    "lists": "decide",
+}
+
+# The active `profiling.Profiler`, if any. `check_theorem` reads it once per theorem, so
+# profiling costs nothing while it is off.
+_PROFILER = None
+
+
+def set_profiler(profiler):
+    """Install `profiler` (or None) for `check_theorem` and return the previous one.
+
+    Prefer `profiling.profile()`, which also starts and stops `tracemalloc`.
+    """
+    global _PROFILER
+    previous, _PROFILER = _PROFILER, profiler
+    return previous
 
 
-def check_theorem(theorem: Theorem, lemma_map: Dict[str, Signature]) -> None:
-    signature = parse_signature(theorem.signature)
+def active_profiler():
+    return _PROFILER
+
+
+def _check_theorem_profiled(
+    theorem: Theorem,
+    lemma_map: Mapping[str, Signature],
+    proven: Optional[Set[Hashable]],
+    profiler,
+) -> None:
+    # `check_theorem` one phase at a time. The signature cache is bypassed so that every
+    # theorem's tokenize, parse and normalize phases are measured.
+    text = theorem.signature
     proof_expr = theorem.proof
+    with profiler.theorem(theorem):
+        with profiler.phase("tokenize"):
+            tokens, starts = scan(text)
+        with profiler.phase("parse"):
+            signature = _parse_signature_stream(TokenStream(tokens, 0, starts, text))
+            proof_term = None if proof_expr in PROOF_KEYWORDS else parse_proof_term(proof_expr)
+        profiler.sizes(len(tokens), signature)
+        with profiler.phase("normalize"):
+            normalized_goal = normalize_signature(signature)
+            key = None
+            if proven is not None:
+                key = (goal_key(signature, proof_term), proof_expr if proof_term is None else None)
+        if key is not None and key in proven:
+            return
+        with profiler.phase(PROOF_PHASES.get(proof_expr, "lemma")):
+            _check_proof(signature, normalized_goal, proof_expr, proof_term, lemma_map)
+    if key is not None:
+        proven.add(key)
+
+
+def _check_proof(
+    signature: Signature,
+    normalized_goal: Signature,
+    proof_expr: str,
+    proof_term: Optional[Term],
+    lemma_map: Mapping[str, Signature],
+) -> None:
+    # Imported here because the sampler and the decision procedure build on this module.
+    from researchproof import bdd, fuzz
+
+    if proof_expr == "check":
+        fuzz.check_by_sampling(signature)
+        return
+    if proof_expr == "decide":
+        bdd.decide(signature)
+        return
+    try:
+        _check_by_proof(signature, normalized_goal, proof_expr, proof_term, lemma_map)
+    except ResourceLimitError:
+        raise
+    except ProofCheckError as exc:
+        # If asked for, a false goal is reported with a counterexample when a search finds one.
+        samples = limits.active_limits().counterexample_samples
+        hint = fuzz.counterexample_hint(signature, samples) if samples else ""
+        if not hint:
+            raise
+        raise ProofCheckError(f"{exc}{hint}") from None
+
+
+def _check_by_proof(
+    signature: Signature,
+    normalized_goal: Signature,
+    proof_expr: str,
+    proof_term: Optional[Term],
+    lemma_map: Mapping[str, Signature],
+) -> None:
     if proof_expr == "Refl":
         check_refl(signature)
         return
+    if proof_expr == "auto":
+        check_auto(signature, lemma_map, normalized_goal)
+        return
+    if proof_expr == "ring":
+        # Imported here because the normalizers build on this module.
+        from researchproof.ring import check_ring
 
-    proof_term = parse_term(TokenStream(tokenize(proof_expr)))
+        check_ring(signature)
+        return
+    if proof_expr == "lists":
+        from researchproof.lists import check_lists
+
+        check_lists(signature)
+        return
+
+    args: Tuple[Term, ...] = ()
     if isinstance(proof_term, Var):
         lemma_name = proof_term.name
     elif isinstance(proof_term, App):
         lemma_name = proof_term.name
+        args = proof_term.args
     else:
         raise ProofCheckError("Unsupported proof expression; use Refl or a lemma name")
 
     if lemma_name not in lemma_map:
         raise ProofCheckError(f"Unknown lemma '{lemma_name}'")
 
-    check_lemma(signature, lemma_map[lemma_name])
+    # Catalogs keep pre-normalized signatures; plain dicts are normalized on the spot.
+    normalized = getattr(lemma_map, "normalized", None)
+    check_lemma(
+        signature,
+        lemma_map[lemma_name],
+        normalized_lemma=normalized(lemma_name) if normalized is not None else None,
+        normalized_goal=normalized_goal,
+        name=lemma_name,
+        args=args,
+    )
+
+
+@dataclass(frozen=True)
+class TheoremResult:
+    name: str
+    line_number: int
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def iter_verify(
+    theorems: Iterable[Theorem],
+    lemma_map: Optional[Mapping[str, Signature]] = None,
+    keep_going: bool = False,
+) -> Iterator[TheoremResult]:
+    """Check theorems lazily, yielding one result per theorem as soon as it is checked.
+
+    `theorems` is consumed one item at a time (for example from
+    `proof_language.iter_theorems`), so memory use does not grow with the input. Iteration
+    stops after the first failing result unless `keep_going` is set.
+    """
+    if lemma_map is None:
+        from researchproof.catalog import default_catalog
+
+        lemma_map = default_catalog()
+    proven: Set[Hashable] = set()
+    for theorem in theorems:
+        try:
+            check_theorem(theorem, lemma_map, proven)
+        except ProofLanguageError as exc:
+            yield TheoremResult(theorem.name, theorem.line_number, str(exc))
+            if not keep_going:
+                return
+            continue
+        yield TheoremResult(theorem.name, theorem.line_number)
+
 
+def verify_theorems(theorems: Iterable[Theorem], lemma_map: Optional[Mapping[str, Signature]] = None) -> None:
+    """Check every theorem, raising the first failure; `theorems` is consumed lazily."""
+    if lemma_map is None:
+        # Imported lazily: the catalog module builds on the parser defined here.
+        from researchproof.catalog import default_catalog
 
-def verify_theorems(theorems: Iterable[Theorem]) -> None:
-    lemma_map = build_lemma_map()
+        lemma_map = default_catalog()
+    proven: Set[Hashable] = set()
     for theorem in theorems:
-        check_theorem(theorem, lemma_map)
+        check_theorem(theorem, lemma_map, proven)
@@ -1,10 +1,18 @@
 """Parser for the ResearchProof proof script language."""
 
+import gzip
+import io
+import re
 from dataclasses import dataclass
-from typing import Iterable, List
+from pathlib import Path
+from typing import IO, Iterable, Iterator, List, Optional, Tuple, Union
 
 from researchproof.errors import ParseError
 
+GZIP_MAGIC = b"\x1f\x8b"
+IMPORT_PREFIX = "import "
+MODULE_NAME = re.compile(r"[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*\Z")
+
 
 @dataclass(frozen=True)
 class Theorem:
@@ -14,6 +22,18 @@ class Theorem:
     line_number: int
 
 
+@dataclass(frozen=True)
+class Import:
+    """An `import Path.To.Module` directive; see `researchproof.modules`."""
+
+    module: str
+    line_number: int
+
+
+# With recovery enabled, parse errors are yielded in place of the theorems they spoil.
+ParseItem = Union[Theorem, ParseError]
+
+
 def _strip_comment(line: str) -> str:
     if "#" in line:
         return line.split("#", 1)[0]
@@ -24,57 +44,190 @@ def _normalize(line: str) -> str:
     return _strip_comment(line).strip()
 
 
-def parse_lines(lines: Iterable[str]) -> List[Theorem]:
-    theorems: List[Theorem] = []
-    iterator = enumerate(lines, start=1)
+def _parse_header(line: str, normalized: str, line_number: int) -> Tuple[str, str]:
+    if not normalized.startswith("theorem "):
+        raise ParseError(
+            f"Expected 'theorem <name> : <type>' at line {line_number}, got: {line.strip()}",
+            line_number,
+        )
+    header = normalized[len("theorem ") :]
+    name, sep, signature = header.partition(":")
+    if not sep:
+        raise ParseError(
+            f"Missing ':' in theorem declaration on line {line_number}: {line.strip()}",
+            line_number,
+        )
+    name = name.strip()
+    signature = signature.strip()
+    if not name:
+        raise ParseError(
+            f"Missing theorem name on line {line_number}: {line.strip()}",
+            line_number,
+        )
+    if not signature:
+        raise ParseError(
+            f"Missing theorem signature on line {line_number}: {line.strip()}",
+            line_number,
+        )
+    return name, signature
+
 
-    for line_number, line in iterator:
+def _parse_import(line: str, normalized: str, line_number: int) -> Import:
+    module = normalized[len(IMPORT_PREFIX) :].strip()
+    if not MODULE_NAME.match(module):
+        raise ParseError(f"Expected 'import Path.To.Module' at line {line_number}, got: {line.strip()}", line_number)
+    return Import(module, line_number)
+
+
+def iter_parse_lines(lines: Iterable[str], recover: bool = False) -> Iterator[ParseItem]:
+    """Yield theorems one at a time as their proof lines are read.
+
+    Only the current theorem header is held in memory, so arbitrarily long inputs parse
+    in constant space. By default the first malformed line raises `ParseError`; with
+    `recover=True` the error is yielded instead and parsing resumes at the next line that
+    starts a theorem, so one pass reports every malformed declaration. `import` lines
+    are checked and skipped; `read_imports` collects them.
+    """
+    pending: Optional[Tuple[str, str, int]] = None
+    skipping = False
+    seen_theorem = False
+
+    for line_number, line in enumerate(lines, start=1):
         normalized = _normalize(line)
         if not normalized:
             continue
-        if not normalized.startswith("theorem "):
-            raise ParseError(
-                f"Expected 'theorem <name> : <type>' at line {line_number}, got: {line.strip()}"
-            )
-        header = normalized[len("theorem ") :]
-        name, sep, signature = header.partition(":")
-        if not sep:
-            raise ParseError(
-                f"Missing ':' in theorem declaration on line {line_number}: {line.strip()}"
-            )
-        name = name.strip()
-        signature = signature.strip()
-        if not name:
-            raise ParseError(
-                f"Missing theorem name on line {line_number}: {line.strip()}"
-            )
-        if not signature:
-            raise ParseError(
-                f"Missing theorem signature on line {line_number}: {line.strip()}"
-            )
-
-        proof_line = None
-        for proof_line_number, proof_line in iterator:
-            normalized_proof = _normalize(proof_line)
-            if not normalized_proof:
+        if pending is None and not skipping and normalized.split(None, 1)[0] == IMPORT_PREFIX.strip():
+            try:
+                _parse_import(line, normalized, line_number)
+                if seen_theorem:
+                    raise ParseError(f"Imports must come before the first theorem (line {line_number})", line_number)
+            except ParseError as exc:
+                if not recover:
+                    raise
+                yield exc
+            continue
+        if skipping:
+            if not normalized.startswith("theorem "):
                 continue
-            if not normalized_proof.startswith("proof "):
-                raise ParseError(
-                    f"Expected 'proof <expression>' after theorem '{name}' on line {proof_line_number}, "
-                    f"got: {proof_line.strip()}"
+            skipping = False
+
+        if pending is not None:
+            name, signature, header_line = pending
+            if normalized.startswith("proof "):
+                proof = normalized[len("proof ") :].strip()
+                if proof:
+                    pending = None
+                    yield Theorem(name=name, signature=signature, proof=proof, line_number=header_line)
+                    continue
+                error = ParseError(
+                    f"Missing proof expression for theorem '{name}' on line {line_number}",
+                    line_number,
                 )
-            proof_line = (proof_line_number, normalized_proof[len("proof ") :].strip())
-            break
-        if proof_line is None:
-            raise ParseError(f"Missing proof for theorem '{name}' starting at line {line_number}")
-        proof_line_number, proof = proof_line
-        if not proof:
-            raise ParseError(
-                f"Missing proof expression for theorem '{name}' on line {proof_line_number}"
-            )
-        theorems.append(Theorem(name=name, signature=signature, proof=proof, line_number=line_number))
-    return theorems
+            else:
+                error = ParseError(
+                    f"Expected 'proof <expression>' after theorem '{name}' on line {line_number}, "
+                    f"got: {line.strip()}",
+                    line_number,
+                )
+            if not recover:
+                raise error
+            yield error
+            pending = None
+            if not normalized.startswith("theorem "):
+                skipping = True
+                continue
+            # The proof was missing and this line already starts the next theorem.
+
+        try:
+            name, signature = _parse_header(line, normalized, line_number)
+        except ParseError as exc:
+            if not recover:
+                raise
+            yield exc
+            skipping = True
+            continue
+        pending = (name, signature, line_number)
+        seen_theorem = True
+
+    if pending is not None:
+        error = ParseError(
+            f"Missing proof for theorem '{pending[0]}' starting at line {pending[2]}", pending[2]
+        )
+        if not recover:
+            raise error
+        yield error
+
+
+def parse_lines(lines: Iterable[str]) -> List[Theorem]:
+    return list(iter_parse_lines(lines))
 
 
 def parse_text(text: str) -> List[Theorem]:
     return parse_lines(text.splitlines())
+
+
+def parse_imports(lines: Iterable[str]) -> List[Import]:
+    """Return the `import` directives at the top of a script, stopping at its first theorem."""
+    imports: List[Import] = []
+    for line_number, line in enumerate(lines, start=1):
+        normalized = _normalize(line)
+        if not normalized:
+            continue
+        if normalized.split(None, 1)[0] != IMPORT_PREFIX.strip():
+            break
+        imports.append(_parse_import(line, normalized, line_number))
+    return imports
+
+
+def _open_text(handle: IO) -> Tuple[IO[str], List[io.IOBase]]:
+    """Wrap a binary handle as UTF-8 text, transparently decompressing gzip input.
+
+    Returns the text stream and the wrappers created here (outermost first), which the
+    caller detaches so that discarding them never closes `handle`.
+    """
+    if isinstance(handle, io.TextIOBase):
+        return handle, []
+    layers: List[io.IOBase] = []
+    buffered = handle
+    if not hasattr(buffered, "peek"):
+        buffered = io.BufferedReader(handle)
+        layers.append(buffered)
+    raw = buffered
+    if buffered.peek(len(GZIP_MAGIC))[: len(GZIP_MAGIC)] == GZIP_MAGIC:
+        # GzipFile never closes a file object it was handed.
+        raw = gzip.GzipFile(fileobj=buffered, mode="rb")
+    text = io.TextIOWrapper(raw, encoding="utf-8")
+    layers.insert(0, text)
+    return text, layers
+
+
+def iter_theorems(source: Union[str, Path, IO], recover: bool = False) -> Iterator[ParseItem]:
+    """Stream theorems from a path or an open file object.
+
+    Text is read line by line straight from the handle; gzip-compressed input is detected
+    by its magic bytes and decompressed on the fly. Paths are opened and closed here, file
+    objects are left open for the caller. `recover` is passed on to `iter_parse_lines`.
+    """
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as handle:
+            yield from iter_theorems(handle, recover)
+        return
+    stream, layers = _open_text(source)
+    try:
+        yield from iter_parse_lines(stream, recover)
+    finally:
+        for layer in layers:
+            layer.detach()
+
+
+def read_imports(source: Union[str, Path, IO]) -> List[Import]:
+    """Read only the import header of a script at a path or in an open file object."""
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as handle:
+            return read_imports(handle)
+    stream, layers = _open_text(source)
+    try:
+        return parse_imports(stream)
+    finally:
+        for layer in layers:
+            layer.detach()
@@ -0,0 +1,109 @@
+"""Machine-readable reports for keep-going verification runs.
+
+Both writers consume `runner.TheoremRecord`s one at a time and never hold more than the
+current file's records, so they can follow `runner.iter_records` over any corpus size.
+"""
+
+from __future__ import annotations
+
+import json
+import tempfile
+from pathlib import Path
+from typing import IO, Optional
+
+from researchproof.runner import FAILED, TheoremRecord
+
+# JUnit suites are spooled to disk once their buffered test cases pass this many bytes.
+JUNIT_SPOOL_BYTES = 1024 * 1024
+
+# xml.sax.saxutils would do the same, but importing it pulls in urllib on every CLI start.
+_TEXT_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+_ATTR_ESCAPES = str.maketrans(
+    {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "\n": "&#10;", "\r": "&#13;", "\t": "&#9;"}
+)
+
+
+def _escape(text: str) -> str:
+    return text.translate(_TEXT_ESCAPES)
+
+
+def _quoteattr(text: str) -> str:
+    return '"' + text.translate(_ATTR_ESCAPES) + '"'
+
+
+class JsonLinesReport:
+    """Write one JSON object per record, one per line."""
+
+    def __init__(self, handle: IO[str]):
+        self._handle = handle
+
+    def add(self, record: TheoremRecord) -> None:
+        self._handle.write(json.dumps(record.to_json(), separators=(",", ":")) + "\n")
+
+    def close(self) -> None:
+        self._handle.flush()
+
+
+class JUnitReport:
+    """Write a JUnit XML document with one `<testsuite>` per proof script.
+
+    A suite's counts have to precede its test cases, so each suite's cases are buffered in
+    a spooled temporary file and copied out when the next script starts.
+    """
+
+    def __init__(self, handle: IO[str]):
+        self._handle = handle
+        self._handle.write('<?xml version="1.0" encoding="UTF-8"?>\n<testsuites>\n')
+        self._path: Optional[Path] = None
+        self._cases: Optional[IO[str]] = None
+        self._tests = self._failures = self._errors = 0
+        self._time = 0.0
+
+    def add(self, record: TheoremRecord) -> None:
+        if record.path != self._path:
+            self._flush_suite()
+            self._path = record.path
+            self._cases = tempfile.SpooledTemporaryFile(max_size=JUNIT_SPOOL_BYTES, mode="w+", encoding="utf-8")
+        assert self._cases is not None
+        self._tests += 1
+        self._time += record.duration
+        name = record.name if record.name is not None else f"line {record.line_number or 0}"
+        self._cases.write(
+            f"    <testcase classname={_quoteattr(str(record.path))} name={_quoteattr(name)} "
+            f'time="{record.duration:.6f}"'
+        )
+        if record.ok:
+            self._cases.write("/>\n")
+            return
+        if record.status == FAILED:
+            self._failures += 1
+            tag = "failure"
+        else:
+            self._errors += 1
+            tag = "error"
+        message = record.error or record.status
+        self._cases.write(
+            f">\n      <{tag} message={_quoteattr(message)} type={_quoteattr(record.status)}>"
+            f"{_escape(message)}</{tag}>\n    </testcase>\n"
+        )
+
+    def _flush_suite(self) -> None:
+        if self._cases is None:
+            return
+        self._handle.write(
+            f"  <testsuite name={_quoteattr(str(self._path))} tests=\"{self._tests}\" "
+            f'failures="{self._failures}" errors="{self._errors}" time="{self._time:.6f}">\n'
+        )
+        self._cases.seek(0)
+        for line in self._cases:
+            self._handle.write(line)
+        self._handle.write("  </testsuite>\n")
+        self._cases.close()
+        self._cases = None
+        self._tests = self._failures = self._errors = 0
+        self._time = 0.0
+
+    def close(self) -> None:
+        self._flush_suite()
+        self._handle.write("</testsuites>\n")
+        self._handle.flush()
@@ -0,0 +1,190 @@
+"""Commutative-semiring normalization for `proof ring`.
+
+Both sides of a Nat equality built from `Z`, `S`, numerals, `plus`, `mult`, `double` and
+`pow` are normalized to sparse polynomials over the goal's variables, and the goal holds
+when the polynomials are identical. `plusAssoc`, `multDistribLeft`, `powSucc` and every
+other identity of commutative semirings are instances, so none of them needs its own
+catalog entry.
+
+A polynomial is a dict from monomial to integer coefficient. A monomial packs the
+exponent of each variable into a fixed-width field of one int, so multiplying monomials is
+an integer addition and hashing one is cheap. `pow` with a non-constant exponent is kept
+as an opaque factor per exponent monomial, using `pow b (plus m k) = mult (pow b m) (pow b k)`.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Tuple
+
+from researchproof import limits
+from researchproof.proof_checker import (
+    App,
+    Const,
+    Equality,
+    NatLit,
+    ProofCheckError,
+    Signature,
+    Term,
+    Var,
+    flatten_arrow,
+)
+
+Polynomial = Dict[int, int]
+
+# Each variable's exponent lives in a field this wide; the field's top bit flags overflow.
+FIELD_BITS = 32
+_FIELD_MASK = (1 << FIELD_BITS) - 1
+_GUARD_BIT = 1 << (FIELD_BITS - 1)
+
+# Semiring operations accepted by `ring`, with their arity.
+RING_OPERATORS = {"plus": 2, "mult": 2, "pow": 2, "double": 1, "S": 1}
+
+
+class _Ring:
+    """Polynomial arithmetic over variables registered on first use."""
+
+    def __init__(self) -> None:
+        self.names: List[str] = []
+        self._indexes: Dict[object, int] = {}
+        self._guard = 0
+
+    def variable(self, key: object, name: str) -> Polynomial:
+        index = self._indexes.get(key)
+        if index is None:
+            index = self._indexes[key] = len(self.names)
+            self.names.append(name)
+            self._guard |= _GUARD_BIT << (FIELD_BITS * index)
+        return {1 << (FIELD_BITS * index): 1}
+
+    def add(self, left: Polynomial, right: Polynomial) -> Polynomial:
+        if len(left) < len(right):
+            left, right = right, left
+        result = dict(left)
+        for monomial, coefficient in right.items():
+            result[monomial] = result.get(monomial, 0) + coefficient
+        return result
+
+    def multiply(self, left: Polynomial, right: Polynomial) -> Polynomial:
+        limits.charge(len(left) * len(right))
+        result: Polynomial = {}
+        guard = self._guard
+        for left_monomial, left_coefficient in left.items():
+            for right_monomial, right_coefficient in right.items():
+                monomial = left_monomial + right_monomial
+                if monomial & guard:
+                    raise ProofCheckError("ring failed: exponent too large")
+                result[monomial] = result.get(monomial, 0) + left_coefficient * right_coefficient
+        return result
+
+    def power(self, base: Polynomial, exponent: Polynomial) -> Polynomial:
+        constant = exponent.get(0, 0)
+        result = self._constant_power(base, constant)
+        if len(base) == 1 and base.get(0) == 1:
+            return result
+        for monomial, coefficient in exponent.items():
+            if monomial == 0:
+                continue
+            # pow b (c * m) = (pow b m)^c, with pow b m an opaque factor.
+            key = ("pow", tuple(sorted(base.items())), monomial)
+            factor = self.variable(key, f"pow ({self.render(base)}) ({self.render({monomial: 1})})")
+            result = self.multiply(result, self._constant_power(factor, coefficient))
+        return result
+
+    def _constant_power(self, base: Polynomial, exponent: int) -> Polynomial:
+        # Coefficients of the result are at most the sum of the base's, raised to `exponent`.
+        limits.check_int_bits(exponent * max(sum(base.values()) - 1, 0).bit_length())
+        result: Polynomial = {0: 1}
+        while exponent:
+            if exponent & 1:
+                result = self.multiply(result, base)
+            exponent >>= 1
+            if exponent:
+                base = self.multiply(base, base)
+        return result
+
+    def render_monomial(self, monomial: int) -> str:
+        factors = []
+        for index, name in enumerate(self.names):
+            exponent = (monomial >> (FIELD_BITS * index)) & _FIELD_MASK
+            if exponent:
+                factor = f"({name})" if " " in name else name
+                factors.append(factor if exponent == 1 else f"{factor}^{exponent}")
+        return "*".join(factors) or "1"
+
+    def render(self, polynomial: Polynomial) -> str:
+        terms = []
+        for monomial in sorted(polynomial):
+            coefficient = polynomial[monomial]
+            if monomial == 0:
+                terms.append(str(coefficient))
+            elif coefficient == 1:
+                terms.append(self.render_monomial(monomial))
+            else:
+                terms.append(f"{coefficient}*{self.render_monomial(monomial)}")
+        return " + ".join(terms) or "0"
+
+
+def _normalize(ring: _Ring, term: Term) -> Polynomial:
+    """Translate a Nat term, iteratively, into a polynomial."""
+    results: List[Polynomial] = []
+    stack: List[object] = [term]
+    while stack:
+        item = stack.pop()
+        if type(item) is tuple:
+            name, arity = item
+            start = len(results) - arity
+            args = results[start:]
+            del results[start:]
+            if name == "plus":
+                results.append(ring.add(args[0], args[1]))
+            elif name == "mult":
+                results.append(ring.multiply(args[0], args[1]))
+            elif name == "pow":
+                results.append(ring.power(args[0], args[1]))
+            elif name == "double":
+                results.append({monomial: 2 * coefficient for monomial, coefficient in args[0].items()})
+            else:
+                results.append(ring.add(args[0], {0: 1}))
+            continue
+        kind = type(item)
+        if kind is Const and item.name == "Z":
+            results.append({})
+        elif kind is NatLit:
+            results.append({0: item.value} if item.value else {})
+        elif kind is Var:
+            results.append(ring.variable(item.name, item.name))
+        elif kind is App and RING_OPERATORS.get(item.name) == len(item.args):
+            stack.append((item.name, len(item.args)))
+            stack.extend(reversed(item.args))
+        elif kind is App:
+            raise ProofCheckError(f"ring only handles plus/mult/pow/double/S terms, not '{item.name}'")
+        else:
+            raise ProofCheckError("ring only handles Nat terms")
+    return results[0]
+
+
+def _first_difference(left: Polynomial, right: Polynomial) -> Tuple[int, int, int]:
+    for monomial in sorted(set(left) | set(right)):
+        if left.get(monomial, 0) != right.get(monomial, 0):
+            return monomial, left.get(monomial, 0), right.get(monomial, 0)
+    raise AssertionError("polynomials are equal")
+
+
+def check_ring(signature: Signature) -> None:
+    """Check a Nat equality by polynomial normalization, raising `ProofCheckError` if it fails.
+
+    Hypotheses are not used: a goal that holds as a polynomial identity holds under any.
+    """
+    _, conclusion = flatten_arrow(signature.result)
+    if not isinstance(conclusion, Equality):
+        raise ProofCheckError("ring only proves equalities")
+    ring = _Ring()
+    left = _normalize(ring, conclusion.left)
+    right = _normalize(ring, conclusion.right)
+    if left == right:
+        return
+    monomial, left_coefficient, right_coefficient = _first_difference(left, right)
+    raise ProofCheckError(
+        f"ring failed: the coefficient of {ring.render_monomial(monomial)} is {left_coefficient} "
+        f"on the left and {right_coefficient} on the right"
+    )
@@ -0,0 +1,704 @@
+"""Batch verification of many proof scripts, optionally across a process pool.
+
+Scripts are streamed theorem by theorem (see `proof_language.iter_theorems`), so memory
+stays flat however large a script is. Small scripts are verified whole by a worker; large
+scripts are read by the parent and their theorems are handed out in chunks, with a bounded
+number of chunks in flight, so a single big file still spreads across workers. The lemma
+catalog and a snapshot of the verification cache are published through module globals
+before the pool starts, which lets forked workers inherit them instead of rebuilding them.
+Reports come back in input order and only depend on the inputs, never on how many workers
+ran.
+
+`iter_records` is the keep-going counterpart of `verify_paths`: instead of stopping at the
+first failure it checks every theorem, resynchronises after malformed lines, and streams
+one `TheoremRecord` per theorem in input order.
+
+Scripts that `import` others (see `researchproof.modules`) are checked after the modules
+they import. Those modules are built first, in dependency order, with independent ones
+running on the pool at the same time; each one is loaded from its interface file when
+that is still valid and otherwise verified, which writes a fresh interface.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass, field, replace
+from itertools import islice
+from pathlib import Path
+from typing import (
+    IO,
+    AbstractSet,
+    Deque,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from researchproof import limits
+from researchproof.cache import CacheView, VerificationCache
+from researchproof.errors import ParseError, ProofLanguageError
+from researchproof.modules import (
+    ImportedCatalog,
+    Imports,
+    Interface,
+    ModuleGraph,
+    catalog_fingerprint,
+    imports_salt,
+    load_interface,
+    write_interface,
+)
+from researchproof.pool import WorkerPool, heartbeat
+from researchproof.proof_checker import Signature, check_theorem
+from researchproof.profiling import note_file
+from researchproof.proof_language import ParseItem, Theorem, iter_theorems
+
+DEFAULT_CHUNK_SIZE = 256
+# Scripts above this size are split into theorem chunks instead of one task per file.
+CHUNK_FILE_BYTES = 64 * 1024
+PROOF_SUFFIXES = ("*.rp", "*.rp.gz")
+# Seconds past the per-theorem timeout after which a pool worker is killed.
+KILL_GRACE = 2.0
+
+PathLike = Union[str, Path]
+
+
+@dataclass(frozen=True)
+class FileReport:
+    path: Path
+    theorem_count: int
+    error: Optional[str] = None
+    cached: int = 0
+    # Cache keys of theorems that passed (fresh or cached), recorded by the parent.
+    verified_keys: Tuple[str, ...] = field(default=(), repr=False, compare=False)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+PASSED = "passed"
+CACHED = "cached"
+FAILED = "failed"
+PARSE_ERROR = "parse-error"
+READ_ERROR = "read-error"
+IMPORT_ERROR = "import-error"
+
+
+@dataclass(frozen=True)
+class TheoremRecord:
+    """Outcome of one theorem (or one malformed declaration) in keep-going mode."""
+
+    path: Path
+    name: Optional[str]
+    line_number: Optional[int]
+    status: str
+    error: Optional[str] = None
+    duration: float = field(default=0.0, compare=False)
+    cache_key: Optional[str] = field(default=None, repr=False, compare=False)
+
+    @property
+    def ok(self) -> bool:
+        return self.status in (PASSED, CACHED)
+
+    def to_json(self) -> dict:
+        return {
+            "file": str(self.path),
+            "name": self.name,
+            "line_number": self.line_number,
+            "status": self.status,
+            "error": self.error,
+            "duration": round(self.duration, 6),
+        }
+
+
+def collect_proof_files(paths: Iterable[PathLike]) -> List[Path]:
+    """Expand directories to the `.rp`/`.rp.gz` files below them, keeping the given order."""
+    files: List[Path] = []
+    seen = set()
+    for raw in paths:
+        path = Path(raw)
+        if path.is_dir():
+            candidates = sorted(found for pattern in PROOF_SUFFIXES for found in path.rglob(pattern))
+        else:
+            candidates = [path]
+        for candidate in candidates:
+            key = candidate.resolve()
+            if key not in seen:
+                seen.add(key)
+                files.append(candidate)
+    return files
+
+
+def describe_failure(theorem: Theorem, exc: Exception) -> str:
+    return f"theorem '{theorem.name}' (line {theorem.line_number}): {exc}"
+
+
+@dataclass(frozen=True)
+class ChunkOutcome:
+    start: int
+    size: int
+    failure: Optional[Tuple[int, str]]
+    cached: int
+    verified_keys: Tuple[str, ...]
+
+
+def check_chunk(
+    theorems: Iterable[Theorem],
+    lemma_map: Mapping[str, Signature],
+    start: int = 0,
+    cache: Optional[CacheView] = None,
+    proven: Optional[Set[Hashable]] = None,
+    imports: Imports = (),
+    timed_out: AbstractSet[int] = frozenset(),
+) -> ChunkOutcome:
+    """Check `theorems` in order, stopping at the first failure.
+
+    Theorems whose cache key is already known are skipped; `proven` is passed through to
+    `check_theorem` to share goal deduplication across chunks. `theorems` may be a lazy
+    iterator; an error it raises while reading ends the chunk as a failure. The lemmas of
+    `imports` are available to every proof. The theorems at the chunk offsets in
+    `timed_out` (see `pool.WorkerPool`) fail with a timeout without being checked.
+    """
+    try:
+        lemma_map, cache, proven = _with_imports(lemma_map, cache, proven, imports)
+    except ParseError as exc:
+        return ChunkOutcome(start, 0, (start, str(exc)), 0, ())
+    cached = 0
+    keys: List[str] = []
+    iterator = iter(theorems)
+    offset = 0
+    while True:
+        try:
+            theorem = next(iterator)
+        except StopIteration:
+            break
+        except (OSError, ProofLanguageError) as exc:
+            # A read or parse error counts as a failure right after the last theorem read.
+            return ChunkOutcome(start, offset, (start + offset, str(exc)), cached, tuple(keys))
+        heartbeat(offset)
+        offset += 1
+        key = cache.key(theorem) if cache is not None else None
+        if key is not None and key in cache:
+            cached += 1
+            keys.append(key)
+            continue
+        try:
+            if offset - 1 in timed_out:
+                raise limits.timeout_error(limits.active_limits().timeout)
+            check_theorem(theorem, lemma_map, proven)
+        except ProofLanguageError as exc:
+            failure = (start + offset - 1, describe_failure(theorem, exc))
+            return ChunkOutcome(start, offset, failure, cached, tuple(keys))
+        if key is not None:
+            keys.append(key)
+    return ChunkOutcome(start, offset, None, cached, tuple(keys))
+
+
+def _merge(
+    path: Path, outcomes: Sequence[ChunkOutcome], parse_error: Optional[Tuple[int, str]] = None
+) -> FileReport:
+    """Fold chunk outcomes into a report that is independent of chunking and scheduling.
+
+    Chunks after the first failure (a failing theorem, or a parse error following the
+    theorems read) are disregarded, as in a serial fail-fast run.
+    """
+    failures = [outcome.failure for outcome in outcomes if outcome.failure is not None]
+    if parse_error is not None:
+        failures.append(parse_error)
+    first = min(failures) if failures else None
+    counted = [outcome for outcome in outcomes if first is None or outcome.start <= first[0]]
+    return FileReport(
+        path,
+        sum(outcome.size for outcome in counted),
+        first[1] if first else None,
+        cached=sum(outcome.cached for outcome in counted),
+        verified_keys=tuple(key for outcome in counted for key in outcome.verified_keys),
+    )
+
+
+def _with_imports(
+    lemma_map: Mapping[str, Signature],
+    cache: Optional[CacheView],
+    proven: Optional[Set[Hashable]],
+    imports: Imports,
+) -> Tuple[Mapping[str, Signature], Optional[CacheView], Optional[Set[Hashable]]]:
+    """The lemma map, cache view and proven goals to check a script importing `imports` with.
+
+    Results that depend on imported lemmas are cached under their own keys, and goals
+    proven with them are not shared with scripts that lack those lemmas.
+    """
+    if not imports:
+        return lemma_map, cache, proven
+    salted = cache.salted(imports_salt(imports)) if cache is not None else None
+    return ImportedCatalog(lemma_map, imports), salted, set()
+
+
+class _Counted:
+    """Iterator wrapper that remembers how many theorems it has produced."""
+
+    def __init__(self, theorems: Iterator[Theorem]):
+        self._theorems = theorems
+        self.count = 0
+
+    def __iter__(self) -> "_Counted":
+        return self
+
+    def __next__(self) -> Theorem:
+        theorem = next(self._theorems)
+        self.count += 1
+        return theorem
+
+
+def verify_file(
+    path: Path,
+    lemma_map: Mapping[str, Signature],
+    cache: Optional[CacheView] = None,
+    proven: Optional[Set[Hashable]] = None,
+    imports: Imports = (),
+    timed_out: AbstractSet[int] = frozenset(),
+) -> FileReport:
+    """Stream and check one script, stopping at the first failure."""
+    note_file(path)
+    outcome = check_chunk(iter_theorems(path), lemma_map, 0, cache, proven, imports, timed_out)
+    return _merge(path, [outcome])
+
+
+def verify_module(
+    path: Path,
+    lemma_map: Mapping[str, Signature],
+    cache: Optional[CacheView] = None,
+    proven: Optional[Set[Hashable]] = None,
+    imports: Imports = (),
+    timed_out: AbstractSet[int] = frozenset(),
+) -> Tuple[FileReport, Optional[Interface]]:
+    """Verify an imported script and, if it passes, write and return its interface."""
+    report = verify_file(path, lemma_map, cache, proven, imports, timed_out)
+    if not report.ok:
+        return report, None
+    return report, write_interface(path, imports, catalog_fingerprint(lemma_map))
+
+
+def check_records(
+    items: Iterable[ParseItem],
+    path: Path,
+    lemma_map: Mapping[str, Signature],
+    cache: Optional[CacheView] = None,
+    proven: Optional[Set[Hashable]] = None,
+    imports: Imports = (),
+    timed_out: AbstractSet[int] = frozenset(),
+) -> List[TheoremRecord]:
+    """Check every theorem in `items`, turning failures and parse errors into records.
+
+    The theorems at the positions in `timed_out` fail with a timeout without being checked.
+    """
+    note_file(path)
+    try:
+        lemma_map, cache, proven = _with_imports(lemma_map, cache, proven, imports)
+    except ParseError as exc:
+        return [TheoremRecord(path, None, None, IMPORT_ERROR, str(exc))]
+    records: List[TheoremRecord] = []
+    for index, item in enumerate(items):
+        heartbeat(index)
+        if isinstance(item, ParseError):
+            status = PARSE_ERROR if item.line_number is not None else READ_ERROR
+            records.append(TheoremRecord(path, None, item.line_number, status, str(item)))
+            continue
+        key = cache.key(item) if cache is not None else None
+        if key is not None and key in cache:
+            records.append(TheoremRecord(path, item.name, item.line_number, CACHED, cache_key=key))
+            continue
+        began = time.perf_counter()
+        try:
+            if index in timed_out:
+                raise limits.timeout_error(limits.active_limits().timeout)
+            check_theorem(item, lemma_map, proven)
+        except ProofLanguageError as exc:
+            elapsed = time.perf_counter() - began
+            records.append(TheoremRecord(path, item.name, item.line_number, FAILED, str(exc), elapsed))
+            continue
+        elapsed = time.perf_counter() - began
+        records.append(TheoremRecord(path, item.name, item.line_number, PASSED, None, elapsed, key))
+    return records
+
+
+def read_items(source: Union[PathLike, IO]) -> Iterator[ParseItem]:
+    """Recovering theorem stream for `source`; an unreadable file ends with a read error."""
+    try:
+        yield from iter_theorems(source, recover=True)
+    except (OSError, EOFError, UnicodeDecodeError) as exc:
+        yield ParseError(f"Cannot read {source}: {exc}")
+
+
+def _item_chunks(path: Path, chunk_size: int) -> Iterator[List[ParseItem]]:
+    items = read_items(path)
+    while True:
+        chunk = list(islice(items, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# -----------------------------
+# Worker side
+# -----------------------------
+
+_WORKER_LEMMA_MAP: Optional[Mapping[str, Signature]] = None
+_WORKER_CACHE: Optional[CacheView] = None
+_WORKER_PROVEN: Set[Hashable] = set()
+
+
+def _init_worker(
+    lemma_map: Mapping[str, Signature], cache: Optional[CacheView], worker_limits: limits.Limits
+) -> None:
+    global _WORKER_LEMMA_MAP, _WORKER_CACHE, _WORKER_PROVEN
+    _WORKER_LEMMA_MAP = lemma_map
+    _WORKER_CACHE = cache
+    _WORKER_PROVEN = set()
+    limits.set_limits(worker_limits)
+
+
+# Tasks may run again after a stuck worker is killed; see `pool.WorkerPool`.
+
+
+def _verify_file_task(path: Path, imports: Imports = (), timed_out: FrozenSet[int] = frozenset()) -> FileReport:
+    return verify_file(path, _WORKER_LEMMA_MAP, _WORKER_CACHE, _WORKER_PROVEN, imports, timed_out)
+
+
+def _verify_module_task(
+    path: Path, imports: Imports, timed_out: FrozenSet[int] = frozenset()
+) -> Tuple[FileReport, Optional[Interface]]:
+    return verify_module(path, _WORKER_LEMMA_MAP, _WORKER_CACHE, _WORKER_PROVEN, imports, timed_out)
+
+
+def _check_chunk_task(
+    theorems: List[Theorem], start: int, imports: Imports = (), timed_out: FrozenSet[int] = frozenset()
+) -> ChunkOutcome:
+    return check_chunk(theorems, _WORKER_LEMMA_MAP, start, _WORKER_CACHE, _WORKER_PROVEN, imports, timed_out)
+
+
+def _check_records_task(
+    items: List[ParseItem], path: Path, imports: Imports = (), timed_out: FrozenSet[int] = frozenset()
+) -> List[TheoremRecord]:
+    return check_records(items, path, _WORKER_LEMMA_MAP, _WORKER_CACHE, _WORKER_PROVEN, imports, timed_out)
+
+
+# -----------------------------
+# Parent side
+# -----------------------------
+
+
+def make_pool(jobs: int, lemma_map: Mapping[str, Signature], cache: Optional[CacheView]) -> WorkerPool:
+    """A pool whose workers check against `lemma_map` and `cache` under the current limits.
+
+    With a timeout, a worker still busy with one theorem `KILL_GRACE` seconds after its
+    time limit (so stuck where neither the step budget nor `SIGALRM` reaches) is killed.
+    """
+    worker_limits = limits.active_limits()
+    timeout = worker_limits.timeout
+    kill_after = None if timeout is None else timeout + KILL_GRACE
+    if "fork" in multiprocessing.get_all_start_methods():
+        _init_worker(lemma_map, cache, worker_limits)
+        return WorkerPool(jobs, multiprocessing.get_context("fork"), kill_after=kill_after)
+    return WorkerPool(
+        jobs, initializer=_init_worker, initargs=(lemma_map, cache, worker_limits), kill_after=kill_after
+    )
+
+
+def submit_records(pool: WorkerPool, items: List[ParseItem], path: Path, imports: Imports = ()) -> Future:
+    """Run `check_records` for `items` on a worker of a `make_pool` pool."""
+    return pool.submit(_check_records_task, items, path, imports)
+
+
+def _is_large(path: Path) -> bool:
+    try:
+        return path.stat().st_size > CHUNK_FILE_BYTES
+    except OSError:
+        return False
+
+
+def _verify_chunked(
+    pool: WorkerPool, path: Path, jobs: int, chunk_size: int, imports: Imports = ()
+) -> FileReport:
+    """Stream a large script into chunk tasks, keeping at most `2 * jobs` in flight."""
+    theorems = _Counted(iter_theorems(path))
+    in_flight: Deque[Future] = deque()
+    outcomes: List[ChunkOutcome] = []
+    parse_error: Optional[Tuple[int, str]] = None
+    start = 0
+    # Chunks are submitted in order, so once any outcome fails, no later chunk can hold
+    # the first failure and reading stops.
+    while not any(outcome.failure for outcome in outcomes):
+        chunk: List[Theorem] = []
+        try:
+            chunk.extend(islice(theorems, chunk_size))
+        except (OSError, ProofLanguageError) as exc:
+            parse_error = (theorems.count, str(exc))
+        if chunk:
+            in_flight.append(pool.submit(_check_chunk_task, chunk, start, imports))
+            start += len(chunk)
+        if parse_error is not None:
+            # Theorems read before the error are in the last submitted chunk.
+            break
+        if not chunk:
+            break
+        while len(in_flight) >= 2 * jobs:
+            outcomes.append(in_flight.popleft().result())
+    outcomes.extend(future.result() for future in in_flight)
+    return _merge(path, outcomes, parse_error)
+
+
+@dataclass
+class _Modules:
+    """The modules imported by a run, built before the scripts that import them."""
+
+    graph: ModuleGraph
+    interfaces: Dict[Path, Interface] = field(default_factory=dict)
+    # Why a module cannot be imported, by script.
+    failed: Dict[Path, str] = field(default_factory=dict)
+    # Reports of the modules verified by this run; those loaded from interfaces have none.
+    reports: Dict[Path, FileReport] = field(default_factory=dict)
+
+    def failure(self, key: Path) -> Optional[str]:
+        return self.graph.failure(key, self.failed)
+
+    def imports(self, key: Path) -> Imports:
+        return self.graph.imported_by(key, self.interfaces)
+
+    def settled(self, path: Path, key: Path) -> Optional[FileReport]:
+        """The report of a script that needs no further checking, if `path` is one."""
+        report = self.reports.get(key)
+        if report is not None:
+            return replace(report, path=path)
+        failure = self.failure(key)
+        return FileReport(path, 0, failure) if failure is not None else None
+
+
+def _build_modules(
+    graph: ModuleGraph,
+    lemma_map: Mapping[str, Signature],
+    view: Optional[CacheView],
+    cache: Optional[VerificationCache],
+    pool: Optional[WorkerPool],
+) -> _Modules:
+    """Load or verify every imported script, each once the modules it imports are ready.
+
+    Scripts whose imports are all settled are verified concurrently on `pool` (in turn
+    without one). Theorems verified here are recorded in `cache`.
+    """
+    modules = _Modules(graph)
+    catalog = catalog_fingerprint(lemma_map)
+    # Unbuilt modules and the imports they still wait for; a script with a graph error
+    # (such as the one closing an import cycle) fails without waiting.
+    waiting: Dict[Path, Set[Path]] = {
+        script: set() if script in graph.errors else {dependency for _, dependency in graph.imports[script]}
+        for script in graph.order
+        if script in graph.modules
+    }
+    running: Dict[Future, Path] = {}
+
+    def settle(script: Path, failure: Optional[str]) -> None:
+        if failure is not None:
+            modules.failed[script] = failure
+        for dependencies in waiting.values():
+            dependencies.discard(script)
+
+    def finish(script: Path, report: FileReport, interface: Optional[Interface]) -> None:
+        modules.reports[script] = report
+        if cache is not None:
+            cache.record(report.verified_keys)
+        if interface is not None:
+            modules.interfaces[script] = interface
+        settle(script, report.error)
+
+    while waiting or running:
+        ready = [script for script, dependencies in waiting.items() if not dependencies]
+        for script in ready:
+            del waiting[script]
+            failure = modules.failure(script)
+            if failure is not None:
+                settle(script, failure)
+                continue
+            imports = modules.imports(script)
+            interface = load_interface(script, imports, catalog)
+            if interface is not None:
+                modules.interfaces[script] = interface
+                settle(script, None)
+            elif pool is None:
+                finish(script, *verify_module(script, lemma_map, view, None, imports))
+            else:
+                running[pool.submit(_verify_module_task, script, imports)] = script
+        if ready:
+            continue
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            finish(running.pop(future), *future.result())
+    return modules
+
+
+def verify_paths(
+    paths: Iterable[PathLike],
+    lemma_map: Mapping[str, Signature],
+    jobs: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    cache: Optional[VerificationCache] = None,
+    module_path: Sequence[PathLike] = (),
+) -> List[FileReport]:
+    """Verify every proof script under `paths` and return one report per file, in order.
+
+    With a `cache`, known-good theorems are skipped and newly verified ones are saved.
+    Imported modules are looked up next to their importers and then in `module_path`.
+    """
+    reports = _verify_all(collect_proof_files(paths), lemma_map, jobs, chunk_size, cache, module_path)
+    if cache is not None:
+        for report in reports:
+            cache.record(report.verified_keys)
+        cache.save()
+    return reports
+
+
+def _verify_all(
+    files: List[Path],
+    lemma_map: Mapping[str, Signature],
+    jobs: int,
+    chunk_size: int,
+    cache: Optional[VerificationCache],
+    module_path: Sequence[PathLike] = (),
+) -> List[FileReport]:
+    view = cache.view() if cache is not None else None
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    graph = ModuleGraph(module_path)
+    keys = [graph.add(path) for path in files]
+    if jobs <= 1:
+        modules = _build_modules(graph, lemma_map, view, cache, None)
+        proven: Set[Hashable] = set()
+        return [
+            modules.settled(path, key) or verify_file(path, lemma_map, view, proven, modules.imports(key))
+            for path, key in zip(files, keys)
+        ]
+
+    with make_pool(jobs, lemma_map, view) as pool:
+        modules = _build_modules(graph, lemma_map, view, cache, pool)
+        # Small files go to the pool up front; large ones are streamed when reached.
+        pending: List[Union[FileReport, Future, None]] = []
+        for path, key in zip(files, keys):
+            settled = modules.settled(path, key)
+            if settled is not None:
+                pending.append(settled)
+            else:
+                pending.append(None if _is_large(path) else pool.submit(_verify_file_task, path, modules.imports(key)))
+        reports: List[FileReport] = []
+        for path, key, item in zip(files, keys, pending):
+            if isinstance(item, Future):
+                item = item.result()
+            elif item is None:
+                item = _verify_chunked(pool, path, jobs, chunk_size, modules.imports(key))
+            reports.append(item)
+        return reports
+
+
+def check_files(
+    files: Sequence[Path],
+    lemma_map: Mapping[str, Signature],
+    view: Optional[CacheView] = None,
+    cache: Optional[VerificationCache] = None,
+    proven: Optional[Set[Hashable]] = None,
+    module_path: Sequence[PathLike] = (),
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[TheoremRecord]:
+    """Check every theorem of `files` in this process, yielding records as `iter_records` does.
+
+    The modules the scripts import are loaded or verified first, exactly as by `verify`;
+    theorems verified while building them are recorded in `cache`. Scripts are checked
+    against `view` and share `proven`.
+    """
+    graph = ModuleGraph(module_path)
+    keys = [graph.add(path) for path in files]
+    modules = _build_modules(graph, lemma_map, view, cache, None)
+    if proven is None:
+        proven = set()
+    for path, key in zip(files, keys):
+        failure = modules.failure(key)
+        if failure is not None:
+            yield TheoremRecord(path, None, None, IMPORT_ERROR, failure)
+            continue
+        imports = modules.imports(key)
+        for chunk in _item_chunks(path, chunk_size):
+            yield from check_records(chunk, path, lemma_map, view, proven, imports)
+
+
+def iter_records(
+    paths: Iterable[PathLike],
+    lemma_map: Mapping[str, Signature],
+    jobs: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    cache: Optional[VerificationCache] = None,
+    module_path: Sequence[PathLike] = (),
+) -> Iterator[TheoremRecord]:
+    """Check every theorem under `paths`, yielding one record each in input order.
+
+    Nothing stops at a failure: malformed declarations become `parse-error` records and
+    parsing resumes at the next `theorem` line. Scripts are streamed in chunks of
+    `chunk_size` items with at most `2 * jobs` chunks in flight, so memory stays bounded
+    on any corpus size. A script whose imports cannot be resolved or do not verify gets a
+    single `import-error` record. Passing theorems are recorded in `cache`, which is
+    saved when the iteration finishes or is closed.
+    """
+    files = collect_proof_files(paths)
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    try:
+        for record in _iter_records(files, lemma_map, jobs, chunk_size, cache, module_path):
+            if cache is not None and record.cache_key is not None:
+                cache.record((record.cache_key,))
+            yield record
+    finally:
+        if cache is not None:
+            cache.save()
+
+
+def _iter_records(
+    files: List[Path],
+    lemma_map: Mapping[str, Signature],
+    jobs: int,
+    chunk_size: int,
+    cache: Optional[VerificationCache],
+    module_path: Sequence[PathLike],
+) -> Iterator[TheoremRecord]:
+    view = cache.view() if cache is not None else None
+    if jobs <= 1:
+        yield from check_files(files, lemma_map, view, cache, module_path=module_path, chunk_size=chunk_size)
+        return
+
+    graph = ModuleGraph(module_path)
+    keys = [graph.add(path) for path in files]
+    with make_pool(jobs, lemma_map, view) as pool:
+        modules = _build_modules(graph, lemma_map, view, cache, pool)
+        in_flight: Deque[Future] = deque()
+        for path, key in zip(files, keys):
+            failure = modules.failure(key)
+            if failure is not None:
+                settled: Future = Future()
+                settled.set_result([TheoremRecord(path, None, None, IMPORT_ERROR, failure)])
+                in_flight.append(settled)
+                continue
+            imports = modules.imports(key)
+            for chunk in _item_chunks(path, chunk_size):
+                in_flight.append(submit_records(pool, chunk, path, imports))
+                while len(in_flight) >= 2 * jobs:
+                    yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
@@ -0,0 +1,318 @@
+"""Long-running verification service behind `researchproof serve`.
+
+A server keeps the lemma catalog, the parse/compile/evaluation caches and the on-disk
+verification cache warm across requests, so editor integrations and hooks pay start-up
+once. Requests and responses are JSON objects, one per line, over stdin/stdout or a Unix
+socket:
+
+    {"id": 1, "method": "verify", "paths": ["proofs/", "extra.rp"]}
+    {"id": 2, "method": "verify", "text": "theorem t : plus Z Z = Z\\nproof Refl\\n"}
+    {"id": 3, "method": "stats"}
+    {"id": 4, "method": "shutdown"}
+
+Every response echoes the request's `id`. A verify response carries one record per
+theorem (the fields of `verify --report-jsonl`) and a summary; a stats response carries
+latency percentiles per method. Malformed requests get an `error` field instead.
+Requests run concurrently on a thread pool, so responses may arrive out of order.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import socketserver
+import stat
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import IO, Callable, Deque, Dict, Hashable, Iterable, List, Optional, Sequence, Set
+
+from researchproof.cache import VerificationCache
+from researchproof.catalog import LemmaCatalog
+from researchproof.proof_checker import EVALUATION_MEMO
+from researchproof.runner import PathLike, TheoremRecord, check_files, check_records, collect_proof_files, read_items
+
+DEFAULT_WORKERS = 4
+# Latencies kept per method for the percentiles reported by `stats`.
+LATENCY_WINDOW = 10_000
+# New cache entries are written to disk at most this often (and at shutdown).
+CACHE_SAVE_INTERVAL = 30.0
+INLINE_PATH = "<inline>"
+PERCENTILES = (50, 90, 99)
+
+
+class RequestError(ValueError):
+    """A request that cannot be served; reported in the response's `error` field."""
+
+
+class LatencyStats:
+    """Sliding window of request latencies per method."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, method: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(method)
+            if samples is None:
+                samples = self._samples[method] = deque(maxlen=self._window)
+            samples.append(seconds)
+            self._counts[method] = self._counts.get(method, 0) + 1
+
+    def summary(self) -> Dict[str, dict]:
+        """Request count and latency percentiles (nearest rank, in milliseconds) per method."""
+        with self._lock:
+            snapshot = {method: sorted(samples) for method, samples in self._samples.items()}
+            counts = dict(self._counts)
+        result = {}
+        for method, samples in snapshot.items():
+            entry: dict = {"count": counts[method]}
+            for percentile in PERCENTILES:
+                rank = max(1, -(-percentile * len(samples) // 100))
+                entry[f"p{percentile}_ms"] = round(samples[rank - 1] * 1000, 3)
+            entry["max_ms"] = round(samples[-1] * 1000, 3)
+            result[method] = entry
+        return result
+
+
+class VerificationServer:
+    """Serves verify and stats requests against one warm catalog and cache."""
+
+    def __init__(
+        self,
+        catalog: LemmaCatalog,
+        cache: Optional[VerificationCache] = None,
+        workers: int = DEFAULT_WORKERS,
+        module_path: Sequence[PathLike] = (),
+    ):
+        self.catalog = catalog
+        self.cache = cache
+        self.module_path = list(module_path)
+        self.latency = LatencyStats()
+        self.started = time.monotonic()
+        self.stopped = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="researchproof-serve")
+        self._cache_lock = threading.Lock()
+        self._last_save = time.monotonic()
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+        self._methods: Dict[str, Callable[[dict], dict]] = {
+            "verify": self._verify,
+            "stats": self._stats,
+            "shutdown": self._shutdown,
+        }
+
+    # -- requests -------------------------------------------------------------------------
+
+    def handle(self, request: object) -> dict:
+        """Serve one decoded request and return its response object."""
+        began = time.perf_counter()
+        request_id = request.get("id") if isinstance(request, dict) else None
+        method = request.get("method") if isinstance(request, dict) else None
+        handler = self._methods.get(method) if isinstance(method, str) else None
+        with self._in_flight_lock:
+            self._in_flight += 1
+        try:
+            if isinstance(request, RequestError):
+                raise request
+            if handler is None:
+                raise RequestError(f"unknown method {method!r}; expected one of {sorted(self._methods)}")
+            response = {"id": request_id, **handler(request)}
+        except RequestError as exc:
+            response = {"id": request_id, "error": str(exc)}
+        except Exception as exc:  # One bad request must not take the server down.
+            response = {"id": request_id, "error": f"internal error: {type(exc).__name__}: {exc}"}
+        finally:
+            with self._in_flight_lock:
+                self._in_flight -= 1
+        self.latency.record(method if handler is not None else "invalid", time.perf_counter() - began)
+        return response
+
+    def handle_line(self, line: str) -> str:
+        """Serve one JSON-encoded request line and return the encoded response line."""
+        return _encode(self.handle(_decode(line)))
+
+    def _verify(self, request: dict) -> dict:
+        paths = request.get("paths")
+        text = request.get("text")
+        if (paths is None) == (text is None):
+            raise RequestError("verify needs exactly one of 'paths' (a list) or 'text' (a string)")
+        began = time.perf_counter()
+        view = None
+        if self.cache is not None:
+            with self._cache_lock:
+                view = self.cache.view()
+        proven: Set[Hashable] = set()
+        records: List[TheoremRecord] = []
+        if text is not None:
+            if not isinstance(text, str):
+                raise RequestError("'text' must be a string")
+            name = request.get("name", INLINE_PATH)
+            records.extend(check_records(read_items(io.StringIO(text)), Path(str(name)), self.catalog, view, proven))
+        else:
+            if not isinstance(paths, list) or not all(isinstance(path, str) for path in paths):
+                raise RequestError("'paths' must be a list of strings")
+            files = collect_proof_files(paths)
+            if not files:
+                raise RequestError("no .rp proof scripts found")
+            # Imports are resolved and built as by `verify`.
+            records.extend(check_files(files, self.catalog, view, None, proven, self.module_path))
+        self._record_verified(record.cache_key for record in records if record.cache_key is not None)
+        failed = sum(1 for record in records if not record.ok)
+        return {
+            "ok": not failed,
+            "results": [record.to_json() for record in records],
+            "summary": {
+                "theorems": sum(1 for record in records if record.name is not None),
+                "failed": failed,
+                "cached": sum(1 for record in records if record.status == "cached"),
+                "seconds": round(time.perf_counter() - began, 6),
+            },
+        }
+
+    def _stats(self, request: dict) -> dict:
+        memo = EVALUATION_MEMO.stats()
+        with self._in_flight_lock:
+            in_flight = self._in_flight - 1  # Not counting this request.
+        return {
+            "ok": True,
+            "stats": {
+                "uptime": round(time.monotonic() - self.started, 3),
+                "in_flight": in_flight,
+                "requests": self.latency.summary(),
+                "evaluation_memo": {
+                    "hits": memo.hits,
+                    "misses": memo.misses,
+                    "hit_rate": round(memo.hit_rate, 4),
+                    "size": memo.size,
+                },
+            },
+        }
+
+    def _shutdown(self, request: dict) -> dict:
+        self.stopped.set()
+        return {"ok": True}
+
+    # -- cache ----------------------------------------------------------------------------
+
+    def _record_verified(self, keys: Iterable[str]) -> None:
+        if self.cache is None:
+            return
+        with self._cache_lock:
+            self.cache.record(keys)
+            if time.monotonic() - self._last_save >= CACHE_SAVE_INTERVAL:
+                self.cache.save()
+                self._last_save = time.monotonic()
+
+    def close(self) -> None:
+        """Wait for running requests and write new cache entries to disk."""
+        self._executor.shutdown(wait=True)
+        if self.cache is not None:
+            with self._cache_lock:
+                self.cache.save()
+
+    # -- transports -----------------------------------------------------------------------
+
+    def serve_lines(self, lines: Iterable[str], write: Callable[[str], None]) -> None:
+        """Serve request lines concurrently, writing each response as soon as it is ready.
+
+        Returns once `lines` is exhausted (or a shutdown request was read) and every
+        response has been written.
+        """
+        write_lock = threading.Lock()
+        pending: Set[Future] = set()
+
+        def respond(future: Future) -> None:
+            with write_lock:
+                write(_encode(future.result()))
+            pending.discard(future)
+
+        for line in lines:
+            if not line.strip():
+                continue
+            request = _decode(line)
+            if isinstance(request, dict) and request.get("method") == "shutdown":
+                # Answer everything read so far first, then acknowledge and stop reading.
+                for future in list(pending):
+                    future.result()
+                with write_lock:
+                    write(_encode(self.handle(request)))
+                break
+            future = self._executor.submit(self.handle, request)
+            pending.add(future)
+            future.add_done_callback(respond)
+        for future in list(pending):
+            future.result()
+
+
+def _decode(line: str) -> object:
+    try:
+        return json.loads(line)
+    except ValueError as exc:
+        # `handle` answers it with an error response.
+        return RequestError(f"invalid JSON: {exc}")
+
+
+def _encode(response: dict) -> str:
+    return json.dumps(response, separators=(",", ":")) + "\n"
+
+
+def serve_stdio(server: VerificationServer, stdin: IO[str] = sys.stdin, stdout: IO[str] = sys.stdout) -> None:
+    def write(text: str) -> None:
+        stdout.write(text)
+        stdout.flush()
+
+    try:
+        server.serve_lines(stdin, write)
+    finally:
+        server.close()
+
+
+def _remove_socket(socket_path: str) -> None:
+    """Remove a stale socket at `socket_path`; refuse to remove anything else."""
+    try:
+        mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{socket_path} exists and is not a socket; refusing to replace it")
+    os.unlink(socket_path)
+
+
+def serve_unix(server: VerificationServer, socket_path: str) -> None:
+    """Accept connections on a Unix socket until a shutdown request arrives.
+
+    A socket left at `socket_path` by an earlier server is replaced; any other file there
+    raises `FileExistsError`.
+    """
+    if not hasattr(socketserver, "ThreadingUnixStreamServer"):
+        raise RuntimeError("Unix sockets are not supported on this platform; use stdin/stdout")
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            lines = (raw.decode("utf-8") for raw in self.rfile)
+
+            def write(text: str) -> None:
+                self.wfile.write(text.encode("utf-8"))
+                self.wfile.flush()
+
+            server.serve_lines(lines, write)
+            if server.stopped.is_set():
+                threading.Thread(target=listener.shutdown, daemon=True).start()
+
+    _remove_socket(socket_path)
+    listener = socketserver.ThreadingUnixStreamServer(socket_path, Handler)
+    listener.daemon_threads = True
+    try:
+        listener.serve_forever()
+    finally:
+        listener.server_close()
+        server.close()
+        _remove_socket(socket_path)
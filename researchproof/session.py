@@ -0,0 +1,215 @@
+"""A long-lived checking session for Python programs that embed the checker.
+
+`verify_theorems` rebuilds its state on every call and reports the first failure by
+raising. A `Checker` keeps the lemma catalog, the set of proven goals and, optionally, a
+`VerificationCache` for as long as it lives, and returns one `TheoremRecord` per theorem:
+
+    with Checker() as checker:
+        record = checker.check(Theorem("t", "plus Z Z = Z", "Refl", 1))
+        records = checker.check_many(iter_theorems("proofs/big.rp"))
+        records = checker.check_paths(["proofs/"])
+        record = await checker.check_async(theorem)
+        async for record in checker.stream(iter_theorems("proofs/big.rp")):
+            ...
+
+`check` and `check_paths` run in the calling thread; `check_paths` resolves and builds
+the scripts' imports as `verify` does. The batch and async entry points hand theorems out
+in chunks to a pool the session owns: a thread pool by default, or with `processes=True`
+a `pool.WorkerPool` whose workers inherit the catalog, which is what spreads CPU-bound
+checks over cores while CPython has a GIL. Results come back in input order.
+
+One `Checker` may serve any number of threads and event loops. The caches checking relies
+on (interned terms, the evaluation memo, parsed signatures) are locked or use only
+single atomic operations, the session's own state is behind a lock, and resource budgets
+are per thread (see `limits`), so none of it depends on the GIL. The limits themselves are
+process-wide: set them with `limits.set_limits`.
+
+Cancelling `check_async`, or leaving a `stream` early, drops the theorems no worker has
+started. In a thread pool a theorem being checked also stops, within
+`limits.CLOCK_INTERVAL` evaluation steps; process workers finish their current chunk.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import AsyncIterator, Deque, Hashable, Iterable, Iterator, List, Mapping, Optional, Sequence, Set, Union
+
+from researchproof import limits
+from researchproof.cache import VerificationCache
+from researchproof.catalog import default_catalog
+from researchproof.errors import CheckCancelled
+from researchproof.pool import WorkerPool
+from researchproof.proof_checker import Signature
+from researchproof.proof_language import Theorem
+from researchproof.runner import (
+    PathLike,
+    TheoremRecord,
+    check_files,
+    check_records,
+    collect_proof_files,
+    make_pool,
+    submit_records,
+)
+
+# Theorems per task handed to the pool; small, so a few theorems still spread out.
+DEFAULT_CHUNK_SIZE = 32
+# The path recorded for theorems that did not come from a file.
+INLINE_PATH = Path("<inline>")
+
+
+class Checker:
+    """A reusable, thread-safe proof checking session."""
+
+    def __init__(
+        self,
+        lemma_map: Optional[Mapping[str, Signature]] = None,
+        cache: Optional[VerificationCache] = None,
+        workers: Optional[int] = None,
+        processes: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        module_path: Sequence[PathLike] = (),
+    ):
+        self.lemma_map = lemma_map if lemma_map is not None else default_catalog()
+        self.cache = cache
+        self.workers = workers or os.cpu_count() or 1
+        self.processes = processes
+        self.chunk_size = chunk_size
+        self.module_path = list(module_path)
+        # Goals already proven against `lemma_map`; set operations are atomic.
+        self._proven: Set[Hashable] = set()
+        self._lock = threading.Lock()
+        self._pool: Optional[Union[ThreadPoolExecutor, WorkerPool]] = None
+        self._closed = False
+
+    # -- checking -------------------------------------------------------------------------
+
+    def check(self, theorem: Theorem, path: Path = INLINE_PATH) -> TheoremRecord:
+        """Check one theorem in the calling thread."""
+        records = check_records([theorem], path, self.lemma_map, self.cache, self._proven)
+        self._record(records)
+        return records[0]
+
+    def check_many(self, theorems: Iterable[Theorem], path: Path = INLINE_PATH) -> List[TheoremRecord]:
+        """Check every theorem on the session's pool; `theorems` is consumed lazily."""
+        cancel = threading.Event()
+        in_flight: Deque[Future] = deque()
+        records: List[TheoremRecord] = []
+        try:
+            for chunk in self._chunks(theorems):
+                in_flight.append(self._submit(chunk, path, cancel))
+                while len(in_flight) >= 2 * self.workers:
+                    records.extend(self._collect(in_flight.popleft().result()))
+            while in_flight:
+                records.extend(self._collect(in_flight.popleft().result()))
+        finally:
+            # Only has work to stop if the caller was interrupted.
+            cancel.set()
+            for future in in_flight:
+                future.cancel()
+        return records
+
+    def check_paths(self, paths: Iterable[PathLike]) -> List[TheoremRecord]:
+        """Check every script under `paths` in the calling thread, with their imports."""
+        view = None
+        if self.cache is not None:
+            with self._lock:
+                view = self.cache.view()
+        files = collect_proof_files(paths)
+        return self._collect(list(check_files(files, self.lemma_map, view, None, self._proven, self.module_path)))
+
+    async def check_async(self, theorem: Theorem, path: Path = INLINE_PATH) -> TheoremRecord:
+        """Check one theorem on the session's pool without blocking the event loop."""
+        cancel = threading.Event()
+        try:
+            records = await asyncio.wrap_future(self._submit([theorem], path, cancel))
+        except asyncio.CancelledError:
+            cancel.set()
+            raise
+        return self._collect(records)[0]
+
+    async def stream(self, theorems: Iterable[Theorem], path: Path = INLINE_PATH) -> AsyncIterator[TheoremRecord]:
+        """Yield a record per theorem, in input order, as the session's pool checks them."""
+        cancel = threading.Event()
+        in_flight: Deque[asyncio.Future] = deque()
+        try:
+            for chunk in self._chunks(theorems):
+                in_flight.append(asyncio.wrap_future(self._submit(chunk, path, cancel)))
+                while len(in_flight) >= 2 * self.workers:
+                    for record in self._collect(await in_flight.popleft()):
+                        yield record
+            while in_flight:
+                for record in self._collect(await in_flight.popleft()):
+                    yield record
+        finally:
+            cancel.set()
+            for future in in_flight:
+                future.cancel()
+
+    def _chunks(self, theorems: Iterable[Theorem]) -> Iterator[List[Theorem]]:
+        iterator = iter(theorems)
+        while True:
+            chunk = list(islice(iterator, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def _submit(self, chunk: List[Theorem], path: Path, cancel: threading.Event) -> Future:
+        pool = self._executor()
+        if isinstance(pool, WorkerPool):
+            return submit_records(pool, chunk, path)
+        return pool.submit(self._check_chunk, chunk, path, cancel)
+
+    def _check_chunk(self, chunk: List[Theorem], path: Path, cancel: threading.Event) -> List[TheoremRecord]:
+        if cancel.is_set():
+            raise CheckCancelled("The check was cancelled")
+        with limits.cancel_on(cancel):
+            return check_records(chunk, path, self.lemma_map, self.cache, self._proven)
+
+    def _executor(self) -> Union[ThreadPoolExecutor, WorkerPool]:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("This Checker has been closed")
+            if self._pool is None:
+                if self.processes:
+                    view = self.cache.view() if self.cache is not None else None
+                    self._pool = make_pool(self.workers, self.lemma_map, view)
+                else:
+                    self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="researchproof-check")
+            return self._pool
+
+    # -- cache ----------------------------------------------------------------------------
+
+    def _collect(self, records: List[TheoremRecord]) -> List[TheoremRecord]:
+        self._record(records)
+        return records
+
+    def _record(self, records: Iterable[TheoremRecord]) -> None:
+        if self.cache is None:
+            return
+        keys = [record.cache_key for record in records if record.cache_key is not None]
+        if keys:
+            with self._lock:
+                self.cache.record(keys)
+
+    def close(self) -> None:
+        """Shut the pool down and write new cache entries to disk."""
+        with self._lock:
+            self._closed = True
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+        if self.cache is not None:
+            with self._lock:
+                self.cache.save()
+
+    def __enter__(self) -> "Checker":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
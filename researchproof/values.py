@@ -0,0 +1,514 @@
+"""Runtime values produced by the `Refl` evaluator.
+
+Naturals and booleans are unboxed Python `int`/`bool`. Lists are immutable trees that
+share structure instead of copying: `Cons` allocates one cell, `append` and `snoc` one
+concatenation node, `replicate` a run-length node, and `reverse`/`map` lazy views. Flat
+runs of elements are stored in a `Leaf`, which uses an `array` when every element is a
+machine-sized natural. `values_equal` compares two values without recursion and skips any
+sub-list that both sides share, so goals over very large closed lists stay cheap.
+"""
+
+from __future__ import annotations
+
+from array import array
+from itertools import repeat
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from researchproof import limits
+
+_ARRAY_MIN = -(2**63)
+_ARRAY_MAX = 2**63 - 1
+_PREVIEW_ITEMS = 8
+
+
+class Stuck(Exception):
+    """Raised when an operation needs to look inside a neutral value."""
+
+
+class Neutral:
+    """A computation stuck on a free variable: `successors` applications of `S` to `term`.
+
+    `term` is the stuck part's normal form, an interned term, so two neutral values are
+    equal exactly when their normal forms are identical.
+    """
+
+    __slots__ = ("term", "successors")
+
+    def __init__(self, term: object, successors: int = 0):
+        self.term = term
+        self.successors = successors
+
+    def __eq__(self, other: object) -> bool:
+        return type(other) is Neutral and other.term is self.term and other.successors == self.successors
+
+    def __hash__(self) -> int:
+        return hash((Neutral, id(self.term), self.successors))
+
+    def __repr__(self) -> str:
+        return f"Neutral({self.term!r}, {self.successors})" if self.successors else f"Neutral({self.term!r})"
+
+
+class OpenList:
+    """`Cons items[0] (... (Cons items[-1] rest))` for a list that ends in a neutral `rest`."""
+
+    __slots__ = ("items", "rest")
+
+    def __init__(self, items: Tuple["RuntimeValue", ...], rest: Neutral):
+        self.items = items
+        self.rest = rest
+
+    def __eq__(self, other: object) -> bool:
+        return values_equal(self, other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"OpenList({list(self.items)!r}, {self.rest!r})"
+
+
+class Builtin:
+    """A builtin function used as a value, e.g. `even` in `filter even xs`."""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Builtin) and other.name == self.name
+
+    def __hash__(self) -> int:
+        return hash((Builtin, self.name))
+
+    def __repr__(self) -> str:
+        return f"Builtin({self.name!r})"
+
+
+class Closure:
+    """A lambda used as a value, with the values of the enclosing binders its body uses.
+
+    `captured` holds those values in the order of the body's slots, and `call`, when set,
+    is the body's compiled code taking `captured + (argument,)`. Equal closures share the
+    same (interned) term and equal captured values.
+    """
+
+    __slots__ = ("term", "call", "captured")
+
+    def __init__(
+        self, term: object, call: Optional[Callable[[tuple], object]] = None, captured: Tuple[object, ...] = ()
+    ):
+        self.term = term
+        self.call = call
+        self.captured = captured
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Closure) and values_equal(self, other)
+
+    def __hash__(self) -> int:
+        return hash((Closure, id(self.term)))
+
+    def __repr__(self) -> str:
+        return f"Closure({self.term!r}, {self.captured!r})" if self.captured else f"Closure({self.term!r})"
+
+
+RuntimeValue = Union[int, bool, Neutral, OpenList, Builtin, Closure, "ListValue"]
+# Values that are not fully known; builtins given one fall back to `nbe.reduce_open`.
+OPEN_TYPES = frozenset((Neutral, OpenList))
+
+
+# -----------------------------
+# Lists
+# -----------------------------
+
+
+class ListValue:
+    """Base class of the immutable list representations."""
+
+    __slots__ = ("length",)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __iter__(self) -> Iterator[RuntimeValue]:
+        return iter_elements(self)
+
+    def __eq__(self, other: object) -> bool:
+        return values_equal(self, other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        preview = []
+        for index, item in enumerate(self):
+            if index == _PREVIEW_ITEMS:
+                preview.append(f"... {self.length - index} more")
+                break
+            preview.append(repr(item))
+        return f"List([{', '.join(preview)}])"
+
+
+class Leaf(ListValue):
+    __slots__ = ("items",)
+
+    def __init__(self, items: Sequence[RuntimeValue]):
+        self.items = items
+        self.length = len(items)
+
+
+class Cell(ListValue):
+    __slots__ = ("head", "tail")
+
+    def __init__(self, head: RuntimeValue, tail: ListValue):
+        self.head = head
+        self.tail = tail
+        self.length = tail.length + 1
+
+
+class Concat(ListValue):
+    __slots__ = ("left", "right")
+
+    def __init__(self, left: ListValue, right: ListValue):
+        self.left = left
+        self.right = right
+        self.length = left.length + right.length
+
+
+class Repeat(ListValue):
+    __slots__ = ("item", "count")
+
+    def __init__(self, item: RuntimeValue, count: int):
+        self.item = item
+        self.count = count
+        self.length = count
+
+
+class Reverse(ListValue):
+    __slots__ = ("inner",)
+
+    def __init__(self, inner: ListValue):
+        self.inner = inner
+        self.length = inner.length
+
+
+class Mapped(ListValue):
+    """`map func inner`, applied element by element the first time it is inspected."""
+
+    __slots__ = ("func", "inner", "apply", "_forced")
+
+    def __init__(self, func: RuntimeValue, inner: ListValue, apply: Callable[[RuntimeValue, RuntimeValue], RuntimeValue]):
+        self.func = func
+        self.inner = inner
+        self.apply = apply
+        self.length = inner.length
+        self._forced: Optional[Leaf] = None
+
+    def force(self) -> "Leaf":
+        if self._forced is None:
+            # Force nested maps innermost first, so that no forcing ever recurses.
+            for node in _unforced_maps(self):
+                func, apply = node.func, node.apply
+                node._forced = make_leaf([apply(func, item) for item in iter_elements(node.inner)])
+        return self._forced
+
+
+def _unforced_maps(root: ListValue) -> List[Mapped]:
+    """Unforced `Mapped` nodes reachable from `root`, each listed after its descendants."""
+    found: List[Mapped] = []
+    seen = set()
+    # Iterative post-order walk; (node, True) marks a node whose children are done.
+    stack: List[Tuple[ListValue, bool]] = [(root, False)]
+    while stack:
+        node, done = stack.pop()
+        if done:
+            found.append(node)
+            continue
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        if isinstance(node, Mapped):
+            if node._forced is None:
+                stack.append((node, True))
+                stack.append((node.inner, False))
+        elif isinstance(node, Cell):
+            stack.append((node.tail, False))
+        elif isinstance(node, Concat):
+            stack.append((node.right, False))
+            stack.append((node.left, False))
+        elif isinstance(node, Reverse):
+            stack.append((node.inner, False))
+    return found
+
+
+NIL = Leaf(())
+
+
+def make_leaf(items: List[RuntimeValue]) -> Leaf:
+    """Store `items` flat, in an `array` when they are all machine-sized naturals."""
+    if items and all(type(item) is int and _ARRAY_MIN <= item <= _ARRAY_MAX for item in items):
+        return Leaf(array("q", items))
+    return Leaf(tuple(items))
+
+
+def _require_list(value: object, function: str) -> ListValue:
+    if not isinstance(value, ListValue):
+        if type(value) in OPEN_TYPES:
+            raise Stuck(function)
+        raise TypeError(f"{function} expects a list, got {value!r}")
+    return value
+
+
+def cons(head: RuntimeValue, tail: RuntimeValue) -> ListValue:
+    return Cell(head, _require_list(tail, "Cons"))
+
+
+def append(left: RuntimeValue, right: RuntimeValue) -> ListValue:
+    left = _require_list(left, "append")
+    right = _require_list(right, "append")
+    if not left.length:
+        return right
+    if not right.length:
+        return left
+    limits.check_list_length(left.length + right.length)
+    return Concat(left, right)
+
+
+def snoc(items: RuntimeValue, item: RuntimeValue) -> ListValue:
+    return append(items, Leaf((item,)))
+
+
+def reverse(items: RuntimeValue) -> ListValue:
+    items = _require_list(items, "reverse")
+    if isinstance(items, Reverse):
+        return items.inner
+    if items.length <= 1 or isinstance(items, Repeat):
+        return items
+    return Reverse(items)
+
+
+def replicate(count: int, item: RuntimeValue) -> ListValue:
+    count = int(count)
+    if count <= 0:
+        return NIL
+    limits.check_list_length(count)
+    return Repeat(item, count)
+
+
+def concat(lists: RuntimeValue) -> ListValue:
+    result: ListValue = NIL
+    for items in iter_elements(_require_list(lists, "concat")):
+        result = append(result, items)
+    return result
+
+
+def map_list(
+    func: RuntimeValue, items: RuntimeValue, apply: Callable[[RuntimeValue, RuntimeValue], RuntimeValue]
+) -> ListValue:
+    items = _require_list(items, "map")
+    if not items.length:
+        return NIL
+    if isinstance(items, Repeat):
+        return Repeat(apply(func, items.item), items.count)
+    if isinstance(items, Reverse):
+        return Reverse(map_list(func, items.inner, apply))
+    return Mapped(func, items, apply)
+
+
+def filter_list(
+    predicate: RuntimeValue, items: RuntimeValue, apply: Callable[[RuntimeValue, RuntimeValue], RuntimeValue]
+) -> ListValue:
+    items = _require_list(items, "filter")
+    if isinstance(items, Repeat):
+        return items if truthy(apply(predicate, items.item)) else NIL
+    return make_leaf([item for item in iter_elements(items) if truthy(apply(predicate, item))])
+
+
+def truthy(value: RuntimeValue) -> bool:
+    """Truth value used by `filter` and `ifThenElse`; non-data values count as true."""
+    if isinstance(value, ListValue):
+        return value.length > 0
+    if type(value) in OPEN_TYPES:
+        raise Stuck("truth value")
+    if isinstance(value, (Builtin, Closure)):
+        return True
+    return bool(value)
+
+
+def iter_elements(items: ListValue) -> Iterator[RuntimeValue]:
+    """Yield the elements of a list in order, walking its tree with an explicit stack."""
+    # Entries are (node, reversed) pairs, or (None, element) for a single pending element.
+    stack: List[Tuple[Optional[ListValue], object]] = [(items, False)]
+    while stack:
+        node, flag = stack.pop()
+        if node is None:
+            yield flag
+        elif isinstance(node, Leaf):
+            yield from (reversed(node.items) if flag else node.items)
+        elif isinstance(node, Cell):
+            if flag:
+                stack.append((None, node.head))
+                stack.append((node.tail, True))
+            else:
+                stack.append((node.tail, False))
+                stack.append((None, node.head))
+        elif isinstance(node, Concat):
+            first, second = (node.right, node.left) if flag else (node.left, node.right)
+            stack.append((second, flag))
+            stack.append((first, flag))
+        elif isinstance(node, Repeat):
+            yield from repeat(node.item, node.count)
+        elif isinstance(node, Reverse):
+            stack.append((node.inner, not flag))
+        elif isinstance(node, Mapped):
+            stack.append((node.force(), flag))
+        else:
+            raise TypeError(f"Unknown list node {node!r}")
+
+
+# -----------------------------
+# Equality
+# -----------------------------
+
+
+def values_equal(left: object, right: object) -> bool:
+    """Structural equality of runtime values.
+
+    Naturals and booleans never compare equal to each other (unlike Python's `1 == True`),
+    closures compare by term and captured values, and nested lists are compared with a
+    work list rather than recursion.
+    """
+    pending: List[Tuple[object, object]] = [(left, right)]
+    while pending:
+        a, b = pending.pop()
+        if a is b:
+            continue
+        if isinstance(a, ListValue):
+            if not isinstance(b, ListValue) or a.length != b.length:
+                return False
+            if not _lists_equal(a, b, pending):
+                return False
+            continue
+        if type(a) is not type(b):
+            return False
+        if type(a) is OpenList:
+            if len(a.items) != len(b.items) or a.rest != b.rest:
+                return False
+            pending.extend(zip(a.items, b.items))
+        elif type(a) is Closure:
+            if a.term is not b.term:
+                return False
+            pending.extend(zip(a.captured, b.captured))
+        elif a != b:
+            return False
+    return True
+
+
+def _element_equal(a: object, b: object, pending: List[Tuple[object, object]]) -> bool:
+    """Compare scalars now; defer pairs of lists to the caller's work list."""
+    if a is b:
+        return True
+    if isinstance(a, ListValue) or isinstance(b, ListValue) or type(a) is OpenList:
+        pending.append((a, b))
+        return True
+    return type(a) is type(b) and a == b
+
+
+# A cursor's stack holds unexpanded nodes as (node, reversed) and flat segments as
+# (_SEGMENT, items, reversed, lo, hi) or (_RUN, item, remaining).
+_SEGMENT = 0
+_RUN = 1
+
+
+def _expand(stack: List[tuple]) -> None:
+    node, flag = stack.pop()
+    if isinstance(node, Leaf):
+        if node.length:
+            stack.append((_SEGMENT, node.items, flag, 0, node.length))
+    elif isinstance(node, Cell):
+        if flag:
+            stack.append((_RUN, node.head, 1))
+            stack.append((node.tail, True))
+        else:
+            stack.append((node.tail, False))
+            stack.append((_RUN, node.head, 1))
+    elif isinstance(node, Concat):
+        first, second = (node.right, node.left) if flag else (node.left, node.right)
+        stack.append((second, flag))
+        stack.append((first, flag))
+    elif isinstance(node, Repeat):
+        stack.append((_RUN, node.item, node.count))
+    elif isinstance(node, Reverse):
+        stack.append((node.inner, not flag))
+    elif isinstance(node, Mapped):
+        stack.append((node.force(), flag))
+    else:
+        raise TypeError(f"Unknown list node {node!r}")
+
+
+def _take(stack: List[tuple], count: int) -> Sequence[object]:
+    """Remove the next `count` elements from a segment on top of `stack`."""
+    _, items, flag, lo, hi = stack.pop()
+    if flag:
+        taken = items[hi - count : hi][::-1]
+        hi -= count
+    else:
+        taken = items[lo : lo + count]
+        lo += count
+    if lo < hi:
+        stack.append((_SEGMENT, items, flag, lo, hi))
+    return taken
+
+
+def _consume_run(stack: List[tuple], count: int) -> None:
+    _, item, remaining = stack.pop()
+    if remaining > count:
+        stack.append((_RUN, item, remaining - count))
+
+
+def _remaining(frame: tuple) -> int:
+    return frame[4] - frame[3] if frame[0] == _SEGMENT else frame[2]
+
+
+def _lists_equal(a: ListValue, b: ListValue, pending: List[Tuple[object, object]]) -> bool:
+    """Walk two equally long lists in step, skipping nodes both sides share."""
+    left: List[tuple] = [(a, False)]
+    right: List[tuple] = [(b, False)]
+    while left and right:
+        top_a, top_b = left[-1], right[-1]
+        a_is_node = isinstance(top_a[0], ListValue)
+        b_is_node = isinstance(top_b[0], ListValue)
+        if a_is_node and b_is_node and top_a[0] is top_b[0] and top_a[1] == top_b[1]:
+            left.pop()
+            right.pop()
+            continue
+        if a_is_node or b_is_node:
+            if a_is_node:
+                _expand(left)
+            if b_is_node:
+                _expand(right)
+            continue
+
+        count = min(_remaining(top_a), _remaining(top_b))
+        if top_a[0] == _RUN and top_b[0] == _RUN:
+            if not _element_equal(top_a[1], top_b[1], pending):
+                return False
+            _consume_run(left, count)
+            _consume_run(right, count)
+        elif top_a[0] == _RUN or top_b[0] == _RUN:
+            run_stack, segment_stack = (left, right) if top_a[0] == _RUN else (right, left)
+            item = run_stack[-1][1]
+            _consume_run(run_stack, count)
+            for other in _take(segment_stack, count):
+                if not _element_equal(item, other, pending):
+                    return False
+        else:
+            items_a = _take(left, count)
+            items_b = _take(right, count)
+            if type(items_a) is array and type(items_b) is array:
+                if items_a != items_b:
+                    return False
+                continue
+            for x, y in zip(items_a, items_b):
+                if not _element_equal(x, y, pending):
+                    return False
+    # Both lists have the same length, so whatever remains on either side is empty.
+    return True
@@ -8,6 +8,6 @@ chmod +x "${REPO_ROOT}/build/build.sh"
 
 python3 -m unittest discover -s "${REPO_ROOT}/tests_python"
 
-python3 -m researchproof.cli verify "${REPO_ROOT}/examples/quickstart.rp"
-python3 -m researchproof.cli verify "${REPO_ROOT}/examples/nat_properties.rp"
-python3 -m researchproof.cli verify "${REPO_ROOT}/examples/extended_catalog.rp"
+python3 -m researchproof.cli verify --no-cache "${REPO_ROOT}/examples/quickstart.rp"
+python3 -m researchproof.cli verify --no-cache "${REPO_ROOT}/examples/nat_properties.rp"
+python3 -m researchproof.cli verify --no-cache "${REPO_ROOT}/examples/extended_catalog.rp"
@@ -0,0 +1,73 @@
+import time
+import unittest
+
+from researchproof.bdd import BDD, FALSE, TRUE, decide
+from researchproof.proof_checker import ProofCheckError, build_lemma_map, check_theorem, parse_signature
+from researchproof.proof_language import Theorem
+
+
+def chain(operator: str, items: list) -> str:
+    text = items[-1]
+    for item in reversed(items[:-1]):
+        text = f"{operator} {item} ({text})"
+    return text
+
+
+class BDDTests(unittest.TestCase):
+    def test_nodes_are_canonical(self) -> None:
+        bdd = BDD()
+        a, b = bdd.variable(0), bdd.variable(1)
+        self.assertEqual(bdd.conjoin(a, b), bdd.negate(bdd.disjoin(bdd.negate(a), bdd.negate(b))))
+        self.assertEqual(bdd.exclusive(a, a), FALSE)
+        self.assertEqual(bdd.implies(bdd.conjoin(a, b), a), TRUE)
+        self.assertEqual(bdd.falsifying(bdd.disjoin(a, b)), {0: False, 1: False})
+
+    def test_decides_bool_equalities(self) -> None:
+        for signature in [
+            "(a : Bool) -> (b : Bool) -> not (or a b) = and (not a) (not b)",
+            "(a : Bool) -> (b : Bool) -> (c : Bool) -> xor a (xor b c) = xor (xor a b) c",
+            "(c : Bool) -> (a : Bool) -> ifThenElse c a a = a",
+            "(a : Bool) -> (b : Bool) -> (p : and a b = True) -> or b False = True",
+        ]:
+            with self.subTest(signature=signature):
+                decide(parse_signature(signature))
+
+    def test_decides_propositions(self) -> None:
+        for signature in [
+            "And a (Or b c) -> Or (And a b) (And a c)",
+            "Iff a b -> Iff b c -> Iff a c",
+            "(a : Type) -> (b : Type) -> And a b -> Iff (Or a b) (And b a)",
+        ]:
+            with self.subTest(signature=signature):
+                decide(parse_signature(signature))
+
+    def test_reports_a_counterexample(self) -> None:
+        with self.assertRaisesRegex(ProofCheckError, "counterexample a = False, b = True"):
+            decide(parse_signature("(a : Bool) -> (b : Bool) -> or a b = and a b"))
+        with self.assertRaisesRegex(ProofCheckError, "counterexample a = False, b = True"):
+            decide(parse_signature("Or a b -> And a b"))
+        with self.assertRaisesRegex(ProofCheckError, "only handles Bool parameters, not 'n'"):
+            decide(parse_signature("(n : Nat) -> plus n Z = n"))
+
+    def test_goals_with_many_variables_decide_quickly(self) -> None:
+        names = [f"a{index}" for index in range(40)]
+        params = "".join(f"({name} : Bool) -> " for name in names)
+        pairs = [f"(or {names[index]} {names[index + 20]})" for index in range(20)]
+        goals = [
+            params + chain("xor", names) + " = " + chain("xor", names[::-1]),
+            params + chain("and", pairs) + " = " + chain("and", pairs[::-1]),
+        ]
+        started = time.perf_counter()
+        for goal in goals:
+            decide(parse_signature(goal))
+        self.assertLess(time.perf_counter() - started, 1.0)
+
+    def test_proof_decide_in_scripts(self) -> None:
+        lemma_map = build_lemma_map()
+        check_theorem(Theorem("dm", "(a : Bool) -> (b : Bool) -> not (and a b) = or (not a) (not b)", "decide", 1), lemma_map)
+        with self.assertRaises(ProofCheckError):
+            check_theorem(Theorem("bad", "(a : Bool) -> not a = a", "decide", 1), lemma_map)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+from researchproof.bench import (
+    PHASES,
+    BaselineError,
+    CorpusSpec,
+    PhaseResult,
+    compare,
+    generate_corpus,
+    report_json,
+    run_phases,
+)
+from researchproof.proof_checker import verify_theorems
+from researchproof.proof_language import parse_text
+
+
+class BenchTests(unittest.TestCase):
+    def test_generated_corpora_verify_and_are_reproducible(self) -> None:
+        for spec in [
+            CorpusSpec(theorems=60),
+            CorpusSpec(theorems=60, depth=1, binders=0, list_size=0, seed=3),
+            CorpusSpec(theorems=60, depth=40, binders=1, list_size=30, lemma_ratio=1.0, seed=5),
+        ]:
+            with self.subTest(spec=spec):
+                text = generate_corpus(spec)
+                theorems = parse_text(text)
+                self.assertEqual(len(theorems), spec.theorems)
+                verify_theorems(theorems)
+                self.assertEqual(generate_corpus(spec), text)
+        self.assertNotEqual(generate_corpus(CorpusSpec(seed=1)), generate_corpus(CorpusSpec(seed=2)))
+
+    def test_run_phases_reports_every_phase(self) -> None:
+        results = run_phases(generate_corpus(CorpusSpec(theorems=5)), repeat=1)
+        self.assertEqual(tuple(result.name for result in results), PHASES)
+        self.assertTrue(all(result.seconds > 0 and result.peak_bytes > 0 for result in results))
+
+    def test_compare_flags_regressions_beyond_thresholds(self) -> None:
+        spec = CorpusSpec(theorems=5)
+        baseline = report_json(spec, [PhaseResult("parse_signature", 1.0, 1000), PhaseResult("tokenize", 0.001, 1000)])
+        current = [
+            PhaseResult("parse_signature", 1.2, 1500),
+            # Too fast to gate on time, but memory is still compared.
+            PhaseResult("tokenize", 0.004, 1000),
+            PhaseResult("evaluate", 9.0, 9000),
+        ]
+        regressions = compare(spec, current, baseline, max_slowdown=0.25, max_memory_growth=0.25)
+        self.assertEqual([(item.phase, item.metric) for item in regressions], [("parse_signature", "peak_bytes")])
+        self.assertEqual(len(compare(spec, current, baseline, max_slowdown=0.1)), 2)
+        with self.assertRaises(BaselineError):
+            compare(CorpusSpec(theorems=6), current, baseline)
+
+
+if __name__ == "__main__":
+    unittest.main()
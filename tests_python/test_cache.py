@@ -0,0 +1,76 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from researchproof.cache import VerificationCache
+from researchproof.catalog import default_catalog
+from researchproof.proof_language import Theorem
+from researchproof.runner import verify_paths
+
+
+class VerificationCacheTests(unittest.TestCase):
+    def test_second_run_skips_verified_theorems(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            script = root / "proofs.rp"
+            script.write_text(
+                "theorem ok : plus (S Z) Z = S Z\nproof Refl\n"
+                "theorem bad : plus (S Z) Z = Z\nproof Refl\n",
+                encoding="utf-8",
+            )
+            fingerprint = default_catalog().content_fingerprint()
+            first = verify_paths([script], default_catalog(), cache=VerificationCache(root / "cache", fingerprint))
+            self.assertEqual(first[0].cached, 0)
+            self.assertFalse(first[0].ok)
+
+            second = verify_paths([script], default_catalog(), cache=VerificationCache(root / "cache", fingerprint))
+            self.assertEqual(second[0].cached, 1)
+            self.assertFalse(second[0].ok)
+
+            other_catalog = VerificationCache(root / "cache", "different-catalog")
+            self.assertNotIn(other_catalog.key(Theorem("ok", "plus (S Z) Z = S Z", "Refl", 1)), other_catalog)
+
+    def test_evicts_oldest_entries_past_the_cap(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = VerificationCache(tmp, "catalog", max_entries=2)
+            cache.record(["a"])
+            cache.save()
+            cache.record(["b", "c"])
+            cache.save()
+            reloaded = VerificationCache(tmp, "catalog", max_entries=2)
+            self.assertEqual(len(reloaded), 2)
+            self.assertNotIn("a", reloaded)
+
+
+    def test_saves_append_only_new_entries(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            first = VerificationCache(tmp, "catalog")
+            first.record(["a", "b"])
+            first.save()
+            written = first.path.read_bytes()
+            # Another run recording an old key and a new one appends just the new one.
+            second = VerificationCache(tmp, "catalog")
+            second.record(["a", "c"])
+            second.save()
+            log = first.path.read_bytes()
+            self.assertTrue(log.startswith(written))
+            self.assertEqual(log[len(written) :].split()[0], b"c")
+            # The first run picks up what the second appended when it saves again.
+            first.record(["d"])
+            first.save()
+            self.assertEqual(len(first), 4)
+            self.assertEqual(len(first.path.read_bytes().splitlines()), 4)
+
+    def test_compacts_the_log_once_it_grows_past_the_cap(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = VerificationCache(tmp, "catalog", max_entries=2)
+            for key in "abcde":
+                cache.record([key])
+                cache.save()
+                self.assertLessEqual(len(cache.path.read_bytes().splitlines()), 4)
+            reloaded = VerificationCache(tmp, "catalog", max_entries=2)
+            self.assertEqual([key in reloaded for key in "abcde"], [False, False, False, True, True])
+
+
+if __name__ == "__main__":
+    unittest.main()
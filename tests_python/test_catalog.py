@@ -0,0 +1,63 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from researchproof.catalog import INDEX_SUFFIX, CatalogFile, LemmaCatalog
+from researchproof.lemma_catalog import LEMMA_CATALOG
+from researchproof.proof_checker import ProofCheckError, parse_signature, verify_theorems
+from researchproof.proof_language import Theorem
+
+
+class LemmaCatalogTests(unittest.TestCase):
+    def test_parses_only_referenced_lemmas(self) -> None:
+        catalog = LemmaCatalog(LEMMA_CATALOG)
+        theorem = Theorem(
+            name="plus_zero_right",
+            signature="(k : Nat) -> plus k Z = k",
+            proof="plusZeroRight k",
+            line_number=1,
+        )
+        verify_theorems([theorem], catalog)
+        self.assertEqual(set(catalog._parsed), {"plusZeroRight"})
+        self.assertEqual(len(catalog), len(LEMMA_CATALOG))
+
+    def test_external_catalog_index_is_rebuilt_on_change(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "extra.rpl"
+            path.write_text("# extra lemmas\nlemma plusOneRight : (n : Nat) -> plus n (S Z) = S n\n", encoding="utf-8")
+            first = CatalogFile.open(path)
+            self.assertTrue(path.with_name(path.name + INDEX_SUFFIX).exists())
+            self.assertIn("plusOneRight", first.entries)
+
+            path.write_text("lemma timesTwo : (n : Nat) -> mult n (S (S Z)) = double n\n", encoding="utf-8")
+            second = CatalogFile.open(path)
+            self.assertNotEqual(first.content_hash, second.content_hash)
+            self.assertEqual(list(second.entries), ["timesTwo"])
+
+            catalog = LemmaCatalog.from_paths([path])
+            theorem = Theorem(
+                name="times_two",
+                signature="(m : Nat) -> mult m (S (S Z)) = double m",
+                proof="timesTwo m",
+                line_number=1,
+            )
+            verify_theorems([theorem], catalog)
+            with self.assertRaises(ProofCheckError):
+                verify_theorems([Theorem("bad", "(m : Nat) -> mult m Z = m", "timesTwo m", 1)], catalog)
+
+    def test_proof_auto_finds_lemma_by_fingerprint(self) -> None:
+        catalog = LemmaCatalog(LEMMA_CATALOG)
+        theorem = Theorem(
+            name="add_comm",
+            signature="(a : Nat) -> (b : Nat) -> plus a b = plus b a",
+            proof="auto",
+            line_number=1,
+        )
+        verify_theorems([theorem], catalog)
+        self.assertEqual(catalog.search(parse_signature(theorem.signature)), ["plusComm"])
+        with self.assertRaises(ProofCheckError):
+            verify_theorems([Theorem("no_match", "(a : Nat) -> plus a a = a", "auto", 1)], catalog)
+
+
+if __name__ == "__main__":
+    unittest.main()
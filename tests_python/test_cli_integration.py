@@ -9,7 +9,7 @@ class CliIntegrationTests(unittest.TestCase):
         repo_root = Path(__file__).resolve().parents[1]
         proof_path = repo_root / "examples" / "quickstart.rp"
         result = subprocess.run(
-            [sys.executable, "-m", "researchproof.cli", "verify", str(proof_path)],
+            [sys.executable, "-m", "researchproof.cli", "verify", "--no-cache", str(proof_path)],
             capture_output=True,
             text=True,
             check=False,
@@ -21,6 +21,34 @@ class CliIntegrationTests(unittest.TestCase):
                 f"stderr:\n{result.stderr}"
             )
 
+    def test_startup_imports_only_what_verify_needs(self) -> None:
+        result = subprocess.run(
+            [sys.executable, "-c", "import sys, researchproof.cli; print(' '.join(sorted(sys.modules)))"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        loaded = set(result.stdout.split())
+        for module in ["researchproof.bench", "researchproof.fuzz", "researchproof.reports", "researchproof.server", "xml.sax"]:
+            with self.subTest(module=module):
+                self.assertNotIn(module, loaded)
+
+    def test_help_states_the_lazily_imported_defaults(self) -> None:
+        from researchproof import bench, fuzz, server
+        from researchproof.cli import build_parser
+
+        subparsers = build_parser()._subparsers._group_actions[0].choices
+        for command, option, default in [
+            ("fuzz", "--samples", fuzz.DEFAULT_SAMPLES),
+            ("serve", "--workers", server.DEFAULT_WORKERS),
+            ("bench", "--repeat", bench.DEFAULT_REPEAT),
+            ("bench", "--max-slowdown", bench.DEFAULT_MAX_SLOWDOWN),
+            ("bench", "--max-memory-growth", bench.DEFAULT_MAX_MEMORY_GROWTH),
+        ]:
+            with self.subTest(option=option):
+                action = next(a for a in subparsers[command]._actions if option in a.option_strings)
+                self.assertIn(f"(default: {default})", action.help)
+
 
 if __name__ == "__main__":
     unittest.main()
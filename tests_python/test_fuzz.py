@@ -0,0 +1,66 @@
+import unittest
+
+from researchproof import limits
+from researchproof.fuzz import UnsupportedGoal, find_counterexample
+from researchproof.proof_checker import ProofCheckError, build_lemma_map, check_theorem, parse_signature
+from researchproof.proof_language import Theorem
+
+
+def search(signature: str, samples: int = 5000):
+    return find_counterexample(parse_signature(signature), samples, seed=1)
+
+
+class FuzzTests(unittest.TestCase):
+    def test_true_goals_have_no_counterexample(self) -> None:
+        for signature in [
+            "(x : Nat) -> (y : Nat) -> plus x y = plus y x",
+            "(xs : List Nat) -> (ys : List Nat) -> length (append xs ys) = plus (length xs) (length ys)",
+            "(b : Bool) -> ifThenElse b True False = b",
+            "(f : Nat -> Nat) -> (xs : List Nat) -> length (map f xs) = length xs",
+            "(x : Nat) -> (y : Nat) -> (p : leq x y = True) -> plus (sub y x) x = y",
+        ]:
+            with self.subTest(signature=signature):
+                result = search(signature)
+                self.assertIsNone(result.counterexample)
+                self.assertGreater(result.samples, 0)
+
+    def test_reports_the_smallest_counterexample(self) -> None:
+        result = search("(x : Nat) -> (y : Nat) -> sub x y = sub y x")
+        self.assertEqual(result.counterexample.bindings, (("x", "0"), ("y", "1")))
+        self.assertEqual((result.counterexample.left, result.counterexample.right), ("0", "1"))
+
+        result = search("(x : Nat) -> lt x 500 = True")
+        self.assertEqual(result.counterexample.bindings, (("x", "500"),))
+
+        result = search("(xs : List Nat) -> reverse xs = xs")
+        self.assertEqual(result.counterexample.bindings, (("xs", "[0, 1]"),))
+
+    def test_samples_function_parameters(self) -> None:
+        result = search("(f : Nat -> Nat) -> (x : Nat) -> f (f x) = f x")
+        self.assertEqual(result.counterexample.bindings, (("f", "S"), ("x", "0")))
+
+    def test_rejects_goals_it_cannot_sample(self) -> None:
+        for signature in ["(n : Nat) -> plus n m = n", "And a b -> And b a"]:
+            with self.assertRaises(UnsupportedGoal):
+                search(signature)
+
+    def test_proof_check_and_failure_hints(self) -> None:
+        lemma_map = build_lemma_map()
+        # Sampling is never a proof, even when it finds nothing.
+        with self.assertRaisesRegex(ProofCheckError, r"no counterexample in \d+ samples \(not a proof\)"):
+            check_theorem(Theorem("comm", "(x : Nat) -> (y : Nat) -> mult x y = mult y x", "check", 1), lemma_map)
+        with self.assertRaisesRegex(ProofCheckError, "not a proof"):
+            check_theorem(Theorem("sneaky", "(n : Nat) -> eqNat n 987654 = False", "check", 1), lemma_map)
+        with self.assertRaisesRegex(ProofCheckError, "check failed: counterexample x = 0, y = 1"):
+            check_theorem(Theorem("bad", "(x : Nat) -> (y : Nat) -> sub x y = sub y x", "check", 1), lemma_map)
+        wrong = Theorem("bad", "(x : Nat) -> (y : Nat) -> sub x y = sub y x", "plusComm x y", 1)
+        with self.assertRaises(ProofCheckError) as raised:
+            check_theorem(wrong, lemma_map)
+        self.assertNotIn("counterexample", str(raised.exception))
+        self.addCleanup(limits.set_limits, limits.set_limits(limits.Limits(counterexample_samples=2000)))
+        with self.assertRaisesRegex(ProofCheckError, "does not match.*; counterexample: x = 0, y = 1"):
+            check_theorem(wrong, lemma_map)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import signal
+import time
+import unittest
+from pathlib import Path
+
+from researchproof import limits, pool
+from researchproof.catalog import default_catalog
+from researchproof.errors import ResourceLimitError
+from researchproof.proof_checker import check_theorem
+from researchproof.proof_language import Theorem
+from researchproof.runner import FAILED, PASSED, check_records
+
+FILTERED = "length (filter (\\x => isZero x) (append (replicate 100000000 Z) (Cons 1 Nil))) = Z"
+
+
+def _checks(stuck: int, count: int, timed_out: frozenset = frozenset()) -> list:
+    # Stands in for a worker stuck in native code: SIGALRM is blocked, so only a kill helps.
+    signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+    outcomes = []
+    for index in range(count):
+        pool.heartbeat(index)
+        if index in timed_out:
+            outcomes.append("timeout")
+        elif index == stuck:
+            time.sleep(60)
+        else:
+            outcomes.append("ok")
+    return outcomes
+
+
+class LimitTests(unittest.TestCase):
+    def _limit(self, **bounds: object) -> None:
+        self.addCleanup(limits.set_limits, limits.set_limits(limits.Limits(**bounds)))
+
+    def test_each_limit_fails_only_its_theorem(self) -> None:
+        cases = {
+            "int_bits": "pow 2 (pow 2 40) = 0",
+            "list_length": "length (append (replicate 1000000000000 1) (replicate 1000000000000 1)) = 0",
+            "steps": FILTERED,
+        }
+        self._limit(steps=100_000)
+        for limit, signature in cases.items():
+            with self.subTest(limit):
+                items = [Theorem("runaway", signature, "Refl", 1), Theorem("next", "plus 1 1 = 2", "Refl", 3)]
+                records = check_records(items, Path("limits.rp"), default_catalog())
+                self.assertEqual([record.status for record in records], [FAILED, PASSED])
+                self.assertIn("exceeds the limit" if limit != "steps" else "evaluation steps", records[0].error)
+                with self.assertRaises(ResourceLimitError) as raised:
+                    check_theorem(items[0], default_catalog())
+                self.assertEqual(raised.exception.limit, limit)
+
+    def test_timeout(self) -> None:
+        self._limit(steps=None, timeout=0.2)
+        began = time.monotonic()
+        with self.assertRaisesRegex(ResourceLimitError, "time limit of 0.2 s"):
+            check_theorem(Theorem("slow", FILTERED, "Refl", 1), default_catalog())
+        self.assertLess(time.monotonic() - began, 5)
+        check_theorem(Theorem("quick", "plus 1 1 = 2", "Refl", 2), default_catalog())
+
+    @unittest.skipUnless(hasattr(signal, "setitimer"), "needs interval timers")
+    def test_callers_alarm_is_restored(self) -> None:
+        fired = []
+        previous = signal.signal(signal.SIGALRM, lambda signum, frame: fired.append(signum))
+        self.addCleanup(signal.signal, signal.SIGALRM, previous)
+        self.addCleanup(signal.setitimer, signal.ITIMER_REAL, 0)
+        self._limit(timeout=5)
+        signal.setitimer(signal.ITIMER_REAL, 0.3)
+        check_theorem(Theorem("quick", "plus 1 1 = 2", "Refl", 1), default_catalog())
+        self.assertNotEqual(signal.getsignal(signal.SIGALRM), limits._on_alarm)
+        self.assertGreater(signal.getitimer(signal.ITIMER_REAL)[0], 0)
+        deadline = time.monotonic() + 5
+        while not fired and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(fired, [signal.SIGALRM])
+
+    @unittest.skipUnless(hasattr(os, "fork") and hasattr(signal, "pthread_sigmask"), "needs fork and signal masks")
+    def test_stuck_workers_are_killed_and_their_tasks_rerun(self) -> None:
+        with pool.WorkerPool(2, kill_after=0.3) as workers:
+            futures = [workers.submit(_checks, stuck, 3) for stuck in (-1, 1, -1, -1)]
+            outcomes = [future.result(timeout=30) for future in futures]
+        self.assertEqual(outcomes[1], ["ok", "timeout", "ok"])
+        self.assertEqual([outcomes[i] for i in (0, 2, 3)], [["ok"] * 3] * 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+from researchproof.lemma_catalog import LEMMA_CATALOG
+from researchproof.lists import check_lists
+from researchproof.proof_checker import ProofCheckError, build_lemma_map, check_theorem, parse_signature
+from researchproof.proof_language import Theorem
+
+
+class ListsTests(unittest.TestCase):
+    def test_proves_catalog_list_lemmas(self) -> None:
+        names = [
+            "appendNilRight",
+            "appendNilLeft",
+            "appendAssoc",
+            "lengthAppend",
+            "lengthSnoc",
+            "lengthReplicate",
+            "mapIdentity",
+            "mapCompose",
+            "reverseAppend",
+            "reverseInvolutive",
+        ]
+        signatures = {lemma.name: lemma.signature for lemma in LEMMA_CATALOG}
+        for name in names:
+            with self.subTest(lemma=name):
+                check_lists(parse_signature(signatures[name]))
+
+    def test_other_shapes(self) -> None:
+        for signature in [
+            "(xs : List Nat) -> (x : Nat) -> reverse (snoc xs x) = Cons x (reverse xs)",
+            "(f : Nat -> Nat) -> (x : Nat) -> (xs : List Nat) -> map f (Cons x xs) = Cons (f x) (map f xs)",
+            "(f : Nat -> Nat) -> (xs : List Nat) -> reverse (map f xs) = map f (reverse xs)",
+            "(xs : List Nat) -> (ys : List Nat) -> length (append xs ys) = length (append ys (reverse xs))",
+            "(xs : List Nat) -> length (append xs xs) = double (length xs)",
+        ]:
+            with self.subTest(signature=signature):
+                check_lists(parse_signature(signature))
+
+    def test_reports_where_the_sides_differ(self) -> None:
+        with self.assertRaisesRegex(ProofCheckError, "first differ at piece 1 \\(xs on the left, ys on the right\\)"):
+            check_lists(parse_signature("(xs : List Nat) -> (ys : List Nat) -> append xs ys = append ys xs"))
+        with self.assertRaisesRegex(ProofCheckError, "the constant counts 0 time\\(s\\) on the left and 1"):
+            check_lists(parse_signature("(xs : List Nat) -> length xs = S (length xs)"))
+
+    def test_binder_shadowing_a_mapped_function(self) -> None:
+        for signature in [
+            "(g : (Nat -> Nat) -> Nat) -> (h : Nat -> Nat) -> (xs : List (Nat -> Nat)) -> "
+            "map (\\h => h (g h)) xs = map (\\y => h (g y)) xs",
+            "(xs : List (Nat -> Nat)) -> map (\\S => S (double S)) xs = map (\\y => S (double y)) xs",
+            "(xs : List (Nat -> Nat)) -> map (\\S => S S) xs = map S xs",
+        ]:
+            with self.subTest(signature=signature), self.assertRaises(ProofCheckError):
+                check_lists(parse_signature(signature))
+
+    def test_deeply_nested_appends(self) -> None:
+        count = 20000
+        left = "xs0"
+        for index in range(1, count):
+            left = f"append ({left}) xs{index % 3}"
+        right = f"xs{(count - 1) % 3}"
+        for index in reversed(range(count - 1)):
+            right = f"append xs{index % 3} ({right})"
+        params = "".join(f"(xs{index} : List Nat) -> " for index in range(3))
+        check_lists(parse_signature(f"{params}reverse (reverse ({left})) = {right}"))
+
+    def test_proof_lists_in_scripts(self) -> None:
+        lemma_map = build_lemma_map()
+        check_theorem(
+            Theorem("rev", "(xs : List Nat) -> (ys : List Nat) -> reverse (append xs (reverse ys)) = append ys (reverse xs)", "lists", 1),
+            lemma_map,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+from researchproof.catalog import default_catalog
+from researchproof.matching import lemma_pattern, match_lemma
+from researchproof.proof_checker import ProofCheckError, check_theorem, parse_proof_term, parse_signature
+from researchproof.proof_language import Theorem
+
+
+def args(text: str) -> tuple:
+    return parse_proof_term(text).args
+
+
+class MatchingTests(unittest.TestCase):
+    def test_lemma_pattern_splits_parameters_and_hypotheses(self) -> None:
+        params, hypotheses, _ = lemma_pattern(parse_signature("(x : Nat) -> (h : x = Z) -> (y : Nat) -> plus x y = y"))
+        self.assertEqual(params, ("x", "y"))
+        self.assertEqual(len(hypotheses), 1)
+
+    def test_arguments_are_substituted(self) -> None:
+        comm = parse_signature("(x : Nat) -> (y : Nat) -> plus x y = plus y x")
+        goal = parse_signature("(n : Nat) -> (m : Nat) -> plus (S n) m = plus m (S n)")
+        match_lemma("plusComm", goal, comm, args("plusComm (S n) m"))
+        match_lemma("plusComm", goal, comm, args("plusComm _ m"))
+        match_lemma("plusComm", goal, comm)
+        with self.assertRaisesRegex(ProofCheckError, "applied to 2 argument"):
+            match_lemma("plusComm", goal, comm, args("plusComm m (S n)"))
+        with self.assertRaisesRegex(ProofCheckError, "takes 2 argument"):
+            match_lemma("plusComm", goal, comm, args("plusComm n m n"))
+
+    def test_repeated_parameters_must_agree(self) -> None:
+        lemma = parse_signature("(n : Nat) -> sub n n = Z")
+        match_lemma("subSelf", parse_signature("(k : Nat) -> sub (double k) (double k) = 0"), lemma)
+        with self.assertRaises(ProofCheckError):
+            match_lemma("subSelf", parse_signature("(k : Nat) -> sub (double k) k = 0"), lemma)
+
+    def test_numerals_lambdas_and_propositions(self) -> None:
+        catalog = default_catalog()
+        for signature, proof in [
+            ("(k : Nat) -> plus k 3 = S (plus k 2)", "plusSuccRight k 2"),
+            ("(xs : List Nat) -> map S (map double xs) = map (\\y => S (double y)) xs", "mapCompose"),
+            ("And (Or p q) r -> And r (Or p q)", "andComm"),
+            ("Iff x y -> Iff y z -> Iff x z", "iffTrans"),
+        ]:
+            with self.subTest(signature=signature):
+                check_theorem(Theorem("t", signature, proof, 1), catalog)
+        for signature, proof in [
+            ("(n : Nat) -> (m : Nat) -> mult n m = mult n m", "plusComm"),
+            ("Iff x y -> Iff x z", "iffTrans"),
+        ]:
+            with self.subTest(signature=signature), self.assertRaises(ProofCheckError):
+                check_theorem(Theorem("t", signature, proof, 1), catalog)
+
+
+if __name__ == "__main__":
+    unittest.main()
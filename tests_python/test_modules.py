@@ -0,0 +1,85 @@
+import io
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from researchproof import modules, runner
+from researchproof.catalog import default_catalog
+from researchproof.errors import ParseError
+from researchproof.proof_language import parse_lines, read_imports
+
+
+BASICS = "theorem plus_one : (n : Nat) -> plus (S Z) n = S n\nproof Refl\n"
+EXTRA = "import Nat.Basics\ntheorem plus_one_again : (m : Nat) -> plus (S Z) m = S m\nproof plus_one m\n"
+MAIN = (
+    "# Imports come first.\nimport Nat.Basics\nimport Extra\n\n"
+    "theorem use : plus (S Z) (S Z) = S (S Z)\nproof plus_one (S Z)\n"
+    "theorem found : (k : Nat) -> plus (S Z) k = S k\nproof auto\n"
+)
+
+
+class ModuleTests(unittest.TestCase):
+    def _write_tree(self, root: Path) -> None:
+        (root / "Nat").mkdir()
+        (root / "lib").mkdir()
+        (root / "Nat" / "Basics.rp").write_text(BASICS, encoding="utf-8")
+        (root / "lib" / "Extra.rp").write_text(EXTRA, encoding="utf-8")
+        (root / "main.rp").write_text(MAIN, encoding="utf-8")
+
+    def test_import_directives(self) -> None:
+        imports = read_imports(io.BytesIO(MAIN.encode("utf-8")))
+        self.assertEqual([(item.module, item.line_number) for item in imports], [("Nat.Basics", 2), ("Extra", 3)])
+        theorems = parse_lines(MAIN.splitlines())
+        self.assertEqual([theorem.name for theorem in theorems], ["use", "found"])
+        with self.assertRaises(ParseError):
+            parse_lines(["import Nat..Basics"])
+        with self.assertRaises(ParseError):
+            parse_lines(BASICS.splitlines() + ["import Extra"])
+
+    def test_importers_are_checked_after_their_modules(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            self._write_tree(root)
+            search = [root, root / "lib"]
+            serial = runner.verify_paths([root / "main.rp"], default_catalog(), module_path=search)
+            self.assertTrue(serial[0].ok, serial[0].error)
+            self.assertEqual(serial[0].theorem_count, 2)
+            interface = modules.interface_path(root / "lib" / "Extra.rp")
+            self.assertTrue(interface.exists())
+            self.assertFalse(modules.interface_path(root / "main.rp").exists())
+
+            # Fresh interfaces are loaded instead of checking the modules again.
+            with mock.patch.object(runner, "verify_module") as verify_module:
+                again = runner.verify_paths([root / "main.rp"], default_catalog(), module_path=search)
+            verify_module.assert_not_called()
+            self.assertEqual(again, serial)
+
+            # Editing a proof rewrites the interface but keeps its content hash.
+            catalog = modules.catalog_fingerprint(default_catalog())
+            before = modules.load_interface(root / "Nat" / "Basics.rp", (), catalog)
+            (root / "Nat" / "Basics.rp").write_text(BASICS.replace("Refl", "plusOneLeft n"), encoding="utf-8")
+            parallel = runner.verify_paths([root / "main.rp"], default_catalog(), jobs=2, module_path=search)
+            self.assertFalse(parallel[0].ok)
+            self.assertIn("imported module 'Nat.Basics' did not verify", parallel[0].error)
+            (root / "Nat" / "Basics.rp").write_text("\n" + BASICS, encoding="utf-8")
+            parallel = runner.verify_paths([root / "main.rp"], default_catalog(), jobs=2, module_path=search)
+            self.assertEqual(parallel, serial)
+            after = modules.load_interface(root / "Nat" / "Basics.rp", (), catalog)
+            self.assertEqual(after.content_hash, before.content_hash)
+
+    def test_unresolvable_imports_are_reported(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            self._write_tree(root)
+            (root / "a.rp").write_text("import b\n" + BASICS, encoding="utf-8")
+            (root / "b.rp").write_text("import a\n" + BASICS, encoding="utf-8")
+            records = list(runner.iter_records([root / "a.rp", root / "main.rp"], default_catalog(), jobs=2))
+
+        self.assertEqual([record.status for record in records], [runner.IMPORT_ERROR] * 2)
+        self.assertIn("Import cycle", records[0].error)
+        self.assertIn("Cannot find module 'Extra'", records[1].error)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+from researchproof.errors import ProofLanguageError
+from researchproof.proof_checker import active_profiler, parse_signature, verify_theorems
+from researchproof.proof_language import Theorem
+from researchproof.profiling import count_nodes, profile
+
+
+class ProfilingTests(unittest.TestCase):
+    def test_theorems_are_profiled_by_phase(self) -> None:
+        theorems = [
+            Theorem("refl", "plus (S Z) 2 = 3", "Refl", 1),
+            Theorem("lemma", "(n : Nat) -> plus n Z = n", "plusZeroRight n", 3),
+            Theorem("bad", "plus Z Z = S Z", "Refl", 5),
+        ]
+        with profile() as profiler:
+            self.assertIs(active_profiler(), profiler)
+            with self.assertRaises(ProofLanguageError):
+                verify_theorems(theorems)
+        self.assertIsNone(active_profiler())
+
+        refl, lemma, bad = profiler.theorems
+        self.assertEqual([phase.name for phase in refl.phases], ["tokenize", "parse", "normalize", "evaluate"])
+        self.assertEqual(lemma.phases[-1].name, "lemma")
+        self.assertEqual((refl.tokens, refl.nodes), (8, count_nodes(parse_signature("plus (S Z) 2 = 3"))))
+        self.assertIsNone(refl.error)
+        self.assertIn("Refl failed", bad.error)
+        self.assertTrue(all(theorem.peak_bytes > 0 for theorem in profiler.theorems))
+        self.assertEqual(len(profiler.slowest(2)), 2)
+
+    def test_exports(self) -> None:
+        with profile(memory=False) as profiler:
+            verify_theorems([Theorem("t", "plus 1 1 = 2", "Refl", 1)])
+        self.assertIsNone(profiler.theorems[0].peak_bytes)
+        events = profiler.chrome_trace()["traceEvents"]
+        self.assertEqual([event["cat"] for event in events], ["theorem"] + ["phase"] * 4)
+        theorem = events[0]
+        self.assertTrue(all(theorem["ts"] <= event["ts"] and event["ph"] == "X" for event in events))
+        metrics = profiler.openmetrics()
+        self.assertIn('researchproof_theorems_total{status="passed"} 1\n', metrics)
+        self.assertIn('researchproof_theorem_seconds_bucket{le="+Inf"} 1\n', metrics)
+        self.assertNotIn("peak_bytes", metrics)
+        self.assertTrue(metrics.endswith("# EOF\n"))
+        self.assertIn("Slowest 1 of 1 theorem(s)", profiler.format_top())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,28 @@
+import pickle
 import unittest
 
-from researchproof.proof_checker import ProofCheckError, parse_signature, verify_theorems
+from researchproof.catalog import default_catalog
+from researchproof.proof_checker import (
+    App,
+    EVALUATION_MEMO,
+    Const,
+    EvaluationMemo,
+    Equality,
+    Lambda,
+    NatLit,
+    ProofCheckError,
+    Signature,
+    Var,
+    check_refl,
+    check_theorem,
+    compile_term,
+    evaluate,
+    goal_key,
+    iter_verify,
+    normalize_signature,
+    parse_signature,
+    verify_theorems,
+)
 from researchproof.proof_language import Theorem
 
 
@@ -28,6 +50,146 @@ class ProofCheckerTests(unittest.TestCase):
         signature = parse_signature("(n : Nat) -> plus n Z = n")
         self.assertEqual(len(signature.params), 1)
 
+    def test_equal_structures_are_the_same_object(self) -> None:
+        first = parse_signature("(n : Nat) -> plus n (S (S Z)) = S (S n)")
+        second = parse_signature("(n : Nat) -> plus n (S (S Z)) = S (S n)")
+        self.assertIs(first, second)
+        self.assertIs(App("S", (Const("Z"),)), App(name="S", args=(Const(name="Z"),)))
+        self.assertIs(pickle.loads(pickle.dumps(first)), first)
+
+    def test_alpha_equivalent_goals_share_a_key(self) -> None:
+        left = goal_key(parse_signature("(n : Nat) -> plus n Z = n"))
+        right = goal_key(parse_signature("(k : Nat) -> plus k Z = k"))
+        self.assertEqual(left, right)
+        # Free names are significant for Refl, so they are not renamed.
+        self.assertNotEqual(
+            goal_key(parse_signature("map even Nil = Nil")),
+            goal_key(parse_signature("map odd Nil = Nil")),
+        )
+
+    def test_duplicate_goals_are_checked_once(self) -> None:
+        proven = set()
+        check_theorem(Theorem("a", "(n : Nat) -> plus n Z = n", "plusZeroRight n", 1), default_catalog(), proven)
+        check_theorem(Theorem("b", "(m : Nat) -> plus m Z = m", "plusZeroRight m", 3), default_catalog(), proven)
+        self.assertEqual(len(proven), 1)
+
+    def test_parse_errors_report_columns(self) -> None:
+        with self.assertRaises(ProofCheckError) as ctx:
+            parse_signature("(n : Nat) -> plus n $ = n")
+        self.assertEqual(ctx.exception.column, 21)
+
+    def test_deep_signatures_parse_without_recursion(self) -> None:
+        depth = 20000
+        signature = parse_signature("(x : Nat) -> " + "S (" * depth + "x" + ")" * depth + " = x")
+        self.assertEqual(signature.result.right, Var("x"))
+        arrows = parse_signature(" -> ".join(["Nat"] * depth))
+        self.assertEqual(len(arrows.params), depth - 1)
+
+    def test_deep_terms_evaluate_and_normalize_without_recursion(self) -> None:
+        depth = 30_000
+        chain = Const("Z")
+        mapped = App("Cons", (Const("Z"), Const("Nil")))
+        for _ in range(depth):
+            chain = App("S", (chain,))
+            mapped = App("map", (Lambda("x", App("S", (Var("x"),))), mapped))
+        check_refl(Signature((), Equality(App("plus", (chain, Const("Z"))), chain)))
+        self.assertEqual(next(iter(evaluate(mapped, {}))), depth)
+        normalized = normalize_signature(Signature((), Equality(mapped, chain)))
+        self.assertIs(normalized.result.right, NatLit(depth))
+        self.assertEqual(repr(chain).count("App(name='S'"), depth)
+
+    def test_numeric_literals_match_successor_chains(self) -> None:
+        literal = parse_signature("(n : Nat) -> plus n 2 = S (S n)")
+        unary = parse_signature("(m : Nat) -> plus m (S (S Z)) = S (S m)")
+        self.assertIs(normalize_signature(literal), normalize_signature(unary))
+        self.assertEqual(evaluate(parse_signature("mult 1000 1000 = Z").result.left, {}), 1_000_000)
+        check_theorem(Theorem("big", "pow 10 30 = mult 1000000000000000 1000000000000000", "Refl", 1), default_catalog())
+        with self.assertRaises(ProofCheckError):
+            parse_signature("plus 2x Z = Z")
+
+    def test_compiled_evaluation_is_cached_and_lazy(self) -> None:
+        goal = parse_signature("ifThenElse (even 2) (length (map (\\x => S x) (Cons 1 Nil))) (plus Nil 1) = 1")
+        self.assertIs(compile_term(goal.result.left), compile_term(goal.result.left))
+        check_refl(goal)
+        check_refl(parse_signature("and False (frobnicate Z) = False"))
+        with self.assertRaises(ProofCheckError):
+            check_refl(parse_signature("plus 1 2 3 = 3"))
+
+    def test_refl_normalizes_open_terms(self) -> None:
+        for signature in [
+            "(n : Nat) -> plus Z n = n",
+            "(n : Nat) -> plus 2 n = S (S n)",
+            "(b : Bool) -> and True b = b",
+            "(x : Nat) -> (xs : List Nat) -> length (append (Cons x Nil) xs) = S (length xs)",
+            "(f : Nat -> Nat) -> (xs : List Nat) -> map f (Cons 1 xs) = Cons (f 1) (map f xs)",
+        ]:
+            with self.subTest(signature=signature):
+                check_refl(parse_signature(signature))
+        for signature in [
+            "(n : Nat) -> plus n Z = n",
+            "(xs : List Nat) -> append xs Nil = xs",
+            # Lambda-bound functions are applied, not treated as unknown.
+            "map (\\h => h 1) (Cons S Nil) = map (\\h => h 1) (Cons pred Nil)",
+        ]:
+            with self.subTest(signature=signature), self.assertRaises(ProofCheckError):
+                check_refl(parse_signature(signature))
+
+    def test_parameters_are_unknowns_distinct_from_every_other_name(self) -> None:
+        for signature in [
+            # A lambda's `x` escaping its closure is not the parameter `x`.
+            "(x : Nat) -> map (\\x => map (\\y => plus y x) (Cons 0 Nil)) (Cons 5 Nil) = Cons (Cons x Nil) Nil",
+            # A parameter shadows the builtin it is named after, also in unfolded builtins.
+            "(plus : Nat -> Nat -> Nat) -> plus 1 1 = 2",
+            "(plus : Nat -> Nat -> Nat) -> (n : Nat) -> (m : Nat) -> mult (S n) m = plus m (mult n m)",
+        ]:
+            with self.subTest(signature=signature), self.assertRaises(ProofCheckError):
+                check_refl(parse_signature(signature))
+        check_refl(parse_signature("(plus : Nat -> Nat -> Nat) -> (n : Nat) -> plus n 1 = plus n (S Z)"))
+
+    def test_lambdas_see_enclosing_binders(self) -> None:
+        for signature in [
+            "map (\\z => map (\\y => plus y z) (Cons 0 Nil)) (Cons 5 Nil) = Cons (Cons 5 Nil) Nil",
+            "(xs : List Nat) -> map (\\a => map (\\b => plus b a) xs) (Cons 1 Nil) = Cons (map (\\b => plus b 1) xs) Nil",
+        ]:
+            with self.subTest(signature=signature):
+                check_refl(parse_signature(signature))
+        with self.assertRaises(ProofCheckError):
+            check_refl(
+                parse_signature(
+                    "(xs : List Nat) -> map (\\a => map (\\b => plus b a) xs) (Cons 1 Nil) = Cons (map (\\b => plus b 2) xs) Nil"
+                )
+            )
+
+    def test_evaluation_memo_shares_closed_subterms(self) -> None:
+        shared = parse_signature("mult (pow 7 3) (S (S Z)) = 686").result.left
+        memo = EvaluationMemo(maxsize=2)
+        calls = []
+        for _ in range(3):
+            self.assertEqual(memo.value(shared, lambda slots: calls.append(1) or 686), 686)
+        self.assertEqual(len(calls), 1)
+        memo.value(Const("Z"), lambda slots: 0)
+        memo.value(NatLit(5), lambda slots: 5)
+        stats = memo.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.evictions, stats.size), (2, 3, 1, 2))
+        self.assertAlmostEqual(stats.hit_rate, 0.4)
+        # A subterm shared by two goals is evaluated for the first and looked up for the second.
+        check_refl(parse_signature("plus (mult (pow 7 3) (S (S Z))) 1 = 687"))
+        hits = EVALUATION_MEMO.stats().hits
+        check_refl(parse_signature("plus 1 (mult (pow 7 3) (S (S Z))) = 687"))
+        self.assertGreater(EVALUATION_MEMO.stats().hits, hits)
+
+    def test_iter_verify_yields_results_until_first_failure(self) -> None:
+        theorems = iter(
+            [
+                Theorem("ok", "plus Z Z = Z", "Refl", 1),
+                Theorem("bad", "plus Z Z = S Z", "Refl", 3),
+                Theorem("never", "plus Z Z = Z", "Refl", 5),
+            ]
+        )
+        results = list(iter_verify(theorems))
+        self.assertEqual([result.ok for result in results], [True, False])
+        self.assertEqual(next(theorems).name, "never")
+
 
 if __name__ == "__main__":
     unittest.main()
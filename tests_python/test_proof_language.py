@@ -1,7 +1,9 @@
+import gzip
+import io
 import unittest
 
 from researchproof.errors import ParseError
-from researchproof.proof_language import parse_text
+from researchproof.proof_language import iter_parse_lines, iter_theorems, parse_text
 
 
 class ProofLanguageParserTests(unittest.TestCase):
@@ -30,6 +32,34 @@ class ProofLanguageParserTests(unittest.TestCase):
         with self.assertRaises(ParseError):
             parse_text(text)
 
+    def test_streams_gzip_file_objects_lazily(self) -> None:
+        text = "theorem a : Z = Z\nproof Refl\ntheorem b : Z = Z\nproof Refl\nbroken\n"
+        handle = io.BytesIO(gzip.compress(text.encode("utf-8")))
+        theorems = iter_theorems(handle)
+        self.assertEqual(next(theorems).name, "a")
+        self.assertEqual(next(theorems).name, "b")
+        with self.assertRaises(ParseError):
+            next(theorems)
+        self.assertFalse(handle.closed)
+
+    def test_recover_mode_resumes_at_next_theorem(self) -> None:
+        lines = [
+            "theorem a Z = Z",
+            "proof Refl",
+            "theorem b : Z = Z",
+            "theorem c : Z = Z",
+            "proof Refl",
+            "theorem d : Z = Z",
+        ]
+        items = list(iter_parse_lines(lines, recover=True))
+        self.assertIsInstance(items[0], ParseError)
+        self.assertEqual(items[0].line_number, 1)
+        self.assertIsInstance(items[1], ParseError)
+        self.assertEqual(items[1].line_number, 4)
+        self.assertEqual(items[2].name, "c")
+        self.assertIsInstance(items[3], ParseError)
+        self.assertEqual(len(items), 4)
+
 
 if __name__ == "__main__":
     unittest.main()
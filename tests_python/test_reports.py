@@ -0,0 +1,44 @@
+import io
+import json
+import unittest
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from researchproof.reports import JsonLinesReport, JUnitReport
+from researchproof.runner import FAILED, PARSE_ERROR, PASSED, TheoremRecord
+
+
+RECORDS = [
+    TheoremRecord(Path("a.rp"), "ok", 1, PASSED, duration=0.5),
+    TheoremRecord(Path("a.rp"), "bad", 3, FAILED, "Refl failed: <mismatch>", 0.25),
+    TheoremRecord(Path("b.rp"), None, 7, PARSE_ERROR, "Missing ':'"),
+]
+
+
+class ReportTests(unittest.TestCase):
+    def test_json_lines_has_one_record_per_line(self) -> None:
+        handle = io.StringIO()
+        report = JsonLinesReport(handle)
+        for record in RECORDS:
+            report.add(record)
+        report.close()
+        rows = [json.loads(line) for line in handle.getvalue().splitlines()]
+        self.assertEqual([row["status"] for row in rows], ["passed", "failed", "parse-error"])
+        self.assertEqual(rows[1]["line_number"], 3)
+        self.assertIsNone(rows[2]["name"])
+
+    def test_junit_groups_records_by_file(self) -> None:
+        handle = io.StringIO()
+        report = JUnitReport(handle)
+        for record in RECORDS:
+            report.add(record)
+        report.close()
+        suites = ET.fromstring(handle.getvalue()).findall("testsuite")
+        self.assertEqual([suite.get("name") for suite in suites], ["a.rp", "b.rp"])
+        self.assertEqual((suites[0].get("tests"), suites[0].get("failures")), ("2", "1"))
+        self.assertEqual(suites[0].find("testcase/failure").get("message"), "Refl failed: <mismatch>")
+        self.assertEqual(suites[1].get("errors"), "1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import time
+import unittest
+
+from researchproof.lemma_catalog import LEMMA_CATALOG
+from researchproof.proof_checker import ProofCheckError, build_lemma_map, check_theorem, parse_signature
+from researchproof.proof_language import Theorem
+from researchproof.ring import check_ring
+
+
+class RingTests(unittest.TestCase):
+    def test_proves_catalog_semiring_lemmas(self) -> None:
+        names = ["plusAssoc", "plusComm", "multDistribLeft", "multAssoc", "powSucc", "powTwo", "doubleIsPlus", "doubleSucc"]
+        signatures = {lemma.name: lemma.signature for lemma in LEMMA_CATALOG}
+        for name in names:
+            with self.subTest(lemma=name):
+                check_ring(parse_signature(signatures[name]))
+
+    def test_variable_exponents(self) -> None:
+        check_ring(parse_signature("(b : Nat) -> (m : Nat) -> (k : Nat) -> pow b (plus m k) = mult (pow b k) (pow b m)"))
+        check_ring(parse_signature("(b : Nat) -> (m : Nat) -> pow b (mult 2 m) = mult (pow b m) (pow b m)"))
+
+    def test_reports_the_first_differing_monomial(self) -> None:
+        with self.assertRaisesRegex(ProofCheckError, "coefficient of a\\*b is 2 on the left and 0 on the right"):
+            check_ring(parse_signature("(a : Nat) -> (b : Nat) -> pow (plus a b) 2 = plus (mult a a) (mult b b)"))
+        with self.assertRaisesRegex(ProofCheckError, "not 'pred'"):
+            check_ring(parse_signature("(n : Nat) -> plus (pred n) 1 = n"))
+
+    def test_hundreds_of_monomials(self) -> None:
+        params = "".join(f"({name} : Nat) -> " for name in "abcdef")
+        total = "plus a (plus b (plus c (plus d (plus e f))))"
+        goal = f"pow ({total}) 6 = mult ({total}) (mult (pow ({total}) 2) (pow ({total}) 3))"
+        started = time.perf_counter()
+        check_ring(parse_signature(params + goal))
+        self.assertLess(time.perf_counter() - started, 1.0)
+
+    def test_proof_ring_in_scripts(self) -> None:
+        lemma_map = build_lemma_map()
+        check_theorem(Theorem("sq", "(x : Nat) -> mult (S x) (S x) = plus (mult x x) (S (double x))", "ring", 1), lemma_map)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import gzip
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from researchproof import runner
+from researchproof.catalog import default_catalog
+
+
+GOOD = "theorem t{i} : plus (S Z) Z = S Z\nproof Refl\n"
+BAD = "theorem broken{i} : plus (S Z) Z = Z\nproof Refl\n"
+
+
+class RunnerTests(unittest.TestCase):
+    def _write_corpus(self, root: Path) -> None:
+        (root / "nested").mkdir()
+        (root / "a.rp").write_text("".join(GOOD.format(i=i) for i in range(3)), encoding="utf-8")
+        big = [GOOD.format(i=i) for i in range(40)]
+        big[17] = BAD.format(i=17)
+        big[33] = BAD.format(i=33)
+        (root / "nested" / "big.rp").write_text("".join(big), encoding="utf-8")
+        (root / "nested" / "ignored.txt").write_text("not a proof script", encoding="utf-8")
+        truncated = [GOOD.format(i=i) for i in range(30)] + ["theorem dangling : Z = Z\n", "bad line\n"]
+        (root / "nested" / "truncated.rp").write_text("".join(truncated), encoding="utf-8")
+        (root / "packed.rp.gz").write_bytes(gzip.compress(GOOD.format(i=0).encode("utf-8")))
+
+    def test_reports_are_identical_across_job_counts(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            self._write_corpus(root)
+            serial = runner.verify_paths([root], default_catalog(), jobs=1)
+            with mock.patch.object(runner, "CHUNK_FILE_BYTES", 0):
+                parallel = runner.verify_paths([root], default_catalog(), jobs=3, chunk_size=4)
+
+        self.assertEqual(serial, parallel)
+        names = [report.path.name for report in serial]
+        self.assertEqual(names, ["a.rp", "big.rp", "truncated.rp", "packed.rp.gz"])
+        self.assertTrue(serial[0].ok)
+        # Checking stops at the first failure, so later theorems are never read.
+        self.assertEqual(serial[1].theorem_count, 18)
+        self.assertIn("broken17", serial[1].error)
+        self.assertEqual(serial[2].theorem_count, 30)
+        self.assertIn("Expected 'proof <expression>'", serial[2].error)
+        self.assertTrue(serial[3].ok)
+
+    def test_keep_going_records_every_failure_in_order(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            self._write_corpus(root)
+            serial = list(runner.iter_records([root], default_catalog(), jobs=1, chunk_size=4))
+            parallel = list(runner.iter_records([root], default_catalog(), jobs=3, chunk_size=4))
+
+        self.assertEqual(serial, parallel)
+        failures = [(record.path.name, record.status, record.line_number) for record in serial if not record.ok]
+        self.assertEqual(
+            failures,
+            [
+                ("big.rp", runner.FAILED, 35),
+                ("big.rp", runner.FAILED, 67),
+                ("truncated.rp", runner.PARSE_ERROR, 62),
+            ],
+        )
+        self.assertEqual(sum(1 for record in serial if record.name is not None), 3 + 40 + 30 + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
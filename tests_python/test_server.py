@@ -0,0 +1,100 @@
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from researchproof.catalog import default_catalog
+from researchproof.server import LatencyStats, VerificationServer, serve_unix
+
+EXAMPLES = Path(__file__).resolve().parents[1] / "examples"
+SCRIPT = "theorem a : plus Z Z = Z\nproof Refl\ntheorem b : plus Z Z = S Z\nproof Refl\n"
+
+
+class ServerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = VerificationServer(default_catalog())
+        self.addCleanup(self.server.close)
+
+    def test_verify_reports_each_theorem(self) -> None:
+        response = self.server.handle({"id": 1, "method": "verify", "text": SCRIPT})
+        self.assertEqual(response["id"], 1)
+        self.assertFalse(response["ok"])
+        self.assertEqual([record["status"] for record in response["results"]], ["passed", "failed"])
+        response = self.server.handle({"id": 2, "method": "verify", "paths": [str(EXAMPLES / "quickstart.rp")]})
+        self.assertTrue(response["ok"])
+        self.assertEqual(response["summary"]["theorems"], 3)
+
+    def test_imports_are_resolved_as_by_verify(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "Nat").mkdir()
+            (root / "Nat" / "Basics.rp").write_text(
+                "theorem myLemma : (n : Nat) -> plus (S Z) n = S n\nproof Refl\n", encoding="utf-8"
+            )
+            (root / "main.rp").write_text(
+                "import Nat.Basics\ntheorem use : plus (S Z) (S Z) = S (S Z)\nproof myLemma (S Z)\n", encoding="utf-8"
+            )
+            response = self.server.handle({"id": 1, "method": "verify", "paths": [str(root / "main.rp")]})
+        self.assertTrue(response["ok"], response["results"])
+        self.assertEqual([record["name"] for record in response["results"]], ["use"])
+
+    def test_bad_requests_get_errors(self) -> None:
+        self.assertIn("unknown method", self.server.handle({"id": 1, "method": "prove"})["error"])
+        self.assertIn("exactly one", self.server.handle({"id": 2, "method": "verify"})["error"])
+        self.assertIn("invalid JSON", json.loads(self.server.handle_line("{nope"))["error"])
+
+    def test_lines_are_served_concurrently_until_shutdown(self) -> None:
+        requests = [json.dumps({"id": index, "method": "verify", "text": SCRIPT}) for index in range(20)]
+        requests += ['{"id": "s", "method": "stats"}', '{"id": "x", "method": "shutdown"}', '{"id": "late"}']
+        written = []
+        self.server.serve_lines(iter(requests), written.append)
+        responses = [json.loads(line) for line in written]
+        self.assertEqual({response["id"] for response in responses}, set(range(20)) | {"s", "x"})
+        self.assertEqual(responses[-1], {"id": "x", "ok": True})
+        stats = next(response["stats"] for response in responses if response["id"] == "s")
+        self.assertIn("p99_ms", stats["requests"]["verify"])
+
+    def test_latency_percentiles(self) -> None:
+        stats = LatencyStats(window=100)
+        for milliseconds in range(1, 101):
+            stats.record("verify", milliseconds / 1000)
+        summary = stats.summary()["verify"]
+        self.assertEqual((summary["p50_ms"], summary["p90_ms"], summary["p99_ms"]), (50.0, 90.0, 99.0))
+
+    @unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix sockets are not available")
+    def test_unix_socket(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "serve.sock")
+        thread = threading.Thread(target=serve_unix, args=(self.server, path), daemon=True)
+        thread.start()
+        deadline = time.monotonic() + 5
+        while not os.path.exists(path) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(path)
+            stream = client.makefile("rw", encoding="utf-8")
+            stream.write(json.dumps({"id": 1, "method": "verify", "text": SCRIPT}) + "\n")
+            stream.write('{"id": 2, "method": "shutdown"}\n')
+            stream.flush()
+            responses = [json.loads(stream.readline()) for _ in range(2)]
+        self.assertEqual([response["id"] for response in responses], [1, 2])
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+
+    @unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix sockets are not available")
+    def test_unix_socket_never_replaces_a_regular_file(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "notes.txt"
+            path.write_text("keep me", encoding="utf-8")
+            with self.assertRaisesRegex(FileExistsError, "not a socket"):
+                serve_unix(self.server, str(path))
+            self.assertEqual(path.read_text(encoding="utf-8"), "keep me")
+
+
+if __name__ == "__main__":
+    unittest.main()
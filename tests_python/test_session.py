@@ -0,0 +1,92 @@
+import asyncio
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from researchproof import limits
+from researchproof.cache import VerificationCache
+from researchproof.proof_language import Theorem
+from researchproof.runner import CACHED, FAILED, PASSED
+from researchproof.session import Checker
+
+SLOW = "length (filter (\\x => isZero x) (append (replicate 100000000 Z) (Cons 1 Nil))) = Z"
+
+
+def _theorems(count: int) -> list:
+    return [
+        Theorem(f"t{i}", f"plus {i} 1 = {i + 1 if i % 7 else i}", "Refl", 2 * i + 1) for i in range(count)
+    ]
+
+
+class CheckerTests(unittest.TestCase):
+    def test_check_reports_instead_of_raising(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = VerificationCache(tmp, "test")
+            with Checker(cache=cache) as checker:
+                passed = checker.check(Theorem("good", "plus 1 1 = 2", "Refl", 1))
+                failed = checker.check(Theorem("bad", "plus 1 1 = 3", "Refl", 3))
+                again = checker.check(Theorem("good", "plus 1 1 = 2", "Refl", 1))
+            self.assertEqual([passed.status, failed.status, again.status], [PASSED, FAILED, CACHED])
+            self.assertIn("Refl failed", failed.error)
+            self.assertIn(passed.cache_key, VerificationCache(tmp, "test"))
+
+    def test_batches_match_serial_checks(self) -> None:
+        theorems = _theorems(100)
+        with Checker() as checker:
+            expected = [checker.check(theorem) for theorem in theorems]
+        self.assertEqual([record.status for record in expected].count(FAILED), 15)
+        for processes in (False, True):
+            with self.subTest(processes=processes), Checker(workers=3, processes=processes, chunk_size=8) as checker:
+                self.assertEqual(checker.check_many(iter(theorems)), expected)
+        with Checker(workers=4) as checker, ThreadPoolExecutor(8) as callers:
+            self.assertEqual(list(callers.map(checker.check, theorems)), expected)
+
+    def test_check_paths_resolves_imports(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "lib").mkdir()
+            (root / "lib" / "Basics.rp").write_text(
+                "theorem myLemma : (n : Nat) -> plus (S Z) n = S n\nproof Refl\n", encoding="utf-8"
+            )
+            (root / "main.rp").write_text(
+                "import Basics\ntheorem use : plus (S Z) (S Z) = S (S Z)\nproof myLemma (S Z)\n", encoding="utf-8"
+            )
+            with Checker(module_path=[root / "lib"]) as checker:
+                records = checker.check_paths([root / "main.rp"])
+        self.assertEqual([(record.name, record.status) for record in records], [("use", PASSED)])
+
+    def test_async_entry_points(self) -> None:
+        theorems = _theorems(40)
+
+        async def run(checker: Checker) -> tuple:
+            streamed = [record async for record in checker.stream(theorems)]
+            single = await asyncio.gather(*(checker.check_async(theorem) for theorem in theorems[:5]))
+            return streamed, single
+
+        with Checker(workers=2, chunk_size=4) as checker:
+            streamed, single = asyncio.run(run(checker))
+            self.assertEqual(streamed, checker.check_many(theorems))
+        self.assertEqual(single, streamed[:5])
+
+    def test_cancelling_stops_a_running_check(self) -> None:
+        self.addCleanup(limits.set_limits, limits.set_limits(limits.Limits(steps=None)))
+
+        async def run(checker: Checker) -> float:
+            slow = asyncio.ensure_future(checker.check_async(Theorem("slow", SLOW, "Refl", 1)))
+            await asyncio.sleep(0.2)
+            slow.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await slow
+            began = time.monotonic()
+            record = await checker.check_async(Theorem("quick", "plus 1 1 = 2", "Refl", 3))
+            self.assertEqual(record.status, PASSED)
+            return time.monotonic() - began
+
+        with Checker(workers=1) as checker:
+            self.assertLess(asyncio.run(run(checker)), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
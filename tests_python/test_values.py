@@ -0,0 +1,52 @@
+import tracemalloc
+import unittest
+from array import array
+
+from researchproof import values
+from researchproof.proof_checker import ProofCheckError, check_refl, evaluate, parse_signature, parse_term, TokenStream
+
+
+def _eval(text: str):
+    return evaluate(parse_term(TokenStream.from_text(text)), {})
+
+
+class RuntimeValueTests(unittest.TestCase):
+    def test_naturals_and_booleans_are_unboxed_but_distinct(self) -> None:
+        self.assertIs(_eval("plus 2 3"), 5)
+        self.assertIs(_eval("even 4"), True)
+        self.assertFalse(values.values_equal(1, True))
+        with self.assertRaises(ProofCheckError):
+            check_refl(parse_signature("S Z = True"))
+
+    def test_large_closed_list_goals_use_constant_memory(self) -> None:
+        goals = [
+            "length (replicate 1000000000 5) = 1000000000",
+            "reverse (replicate 1000000000 7) = replicate 1000000000 7",
+            "append (replicate 1000000000 1) (replicate 1000000000 1) = replicate 2000000000 1",
+            "map S (replicate 1000000000 1) = replicate 1000000000 2",
+        ]
+        tracemalloc.start()
+        try:
+            for goal in goals:
+                check_refl(parse_signature(goal))
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak, 1024 * 1024)
+
+    def test_equality_skips_shared_structure_and_compares_elements(self) -> None:
+        shared = values.replicate(10**12, 3)
+        left = values.append(values.cons(1, values.NIL), shared)
+        right = values.append(values.snoc(values.NIL, 1), shared)
+        self.assertTrue(values.values_equal(left, right))
+        self.assertTrue(values.values_equal(_eval("reverse (Cons 1 (Cons 2 Nil))"), _eval("Cons 2 (Cons 1 Nil)")))
+        self.assertFalse(values.values_equal(_eval("Cons (Cons 1 Nil) Nil"), _eval("Cons (Cons 2 Nil) Nil")))
+
+    def test_forced_lists_of_naturals_are_array_backed(self) -> None:
+        mapped = _eval("map double (Cons 1 (Cons 2 Nil))")
+        self.assertEqual(list(mapped), [2, 4])
+        self.assertIsInstance(mapped.force().items, array)
+
+
+if __name__ == "__main__":
+    unittest.main()